@@ -18,15 +18,12 @@ import xbmc
 import xbmcgui
 import xbmcplugin
 import inputstreamhelper
+from resources.lib.cache import WindowCache
 from resources.lib.compat import compat_unicode
 from resources.lib.ui.Dialogs import Dialogs
 from resources.lib.NetflixCommon import Signals
 from resources.lib.utils import get_user_agent
 from resources.lib.UniversalAnalytics import Tracker
-try:
-    import cPickle as pickle
-except:
-    import pickle
 try:
     # Python 2.6-2.7
     from HTMLParser import HTMLParser
@@ -113,28 +110,34 @@ class KodiHelper(object):
         return window.getProperty('main_menu_selection')
 
     def setup_memcache(self):
-        """Sets up the memory cache if not existant"""
+        """Sets up the memory cache (bounded LRU, one window property per
+        entry) & drops the single pickle blob used by former versions"""
         current_window = xbmcgui.getCurrentWindowId()
         window = xbmcgui.Window(current_window)
-        try:
-            cached_items = window.getProperty('memcache')
-            # no cache setup yet, create one
-            if len(cached_items) >= 1:
-                return
-        except (EOFError, UnicodeDecodeError):
-            self.nx_common.log(msg='setup_memcache failed, recreating')
-            pass
-        window.setProperty('memcache', pickle.dumps({}, protocol=0).decode('latin-1'))
+        if window.getProperty('memcache'):
+            window.clearProperty('memcache')
+        self.memcache_size = int(
+            self.nx_common.get_setting('memcache_size') or 16) * 1024 * 1024
+        self.memcache_ttl = int(
+            self.nx_common.get_setting('memcache_ttl') or 60) * 60
+
+    def _get_memcache(self):
+        """Returns the memory cache of the current window
+
+        Returns
+        -------
+        :obj:`WindowCache`
+            Memory cache
+        """
+        current_window = xbmcgui.getCurrentWindowId()
+        return WindowCache(
+            window=xbmcgui.Window(current_window),
+            max_bytes=self.memcache_size,
+            ttl=self.memcache_ttl)
 
     def invalidate_memcache(self):
         """Invalidates the memory cache"""
-        current_window = xbmcgui.getCurrentWindowId()
-        window = xbmcgui.Window(current_window)
-        try:
-            window.setProperty('memcache', pickle.dumps({}, protocol=0).decode('latin-1'))
-        except EOFError:
-            self.nx_common.log(msg='invalidate_memcache failed')
-            pass
+        self._get_memcache().clear()
 
     def get_cached_item(self, cache_id):
         """Returns an item from the in memory cache
@@ -149,18 +152,9 @@ class KodiHelper(object):
         mixed
             Contents of the requested cache item or none
         """
-        ret = None
-        current_window = xbmcgui.getCurrentWindowId()
-        window = xbmcgui.Window(current_window)
-        try:
-            cached_items = pickle.loads(window.getProperty('memcache').encode('latin-1'))
-            ret = cached_items.get(cache_id)
-        except (EOFError, UnicodeDecodeError) as e:
-            self.nx_common.log(msg='memcache: get_cached_items failed' + str(e))
-            ret = None
-        return ret
-
-    def add_cached_item(self, cache_id, contents):
+        return self._get_memcache().get(cache_id)
+
+    def add_cached_item(self, cache_id, contents, ttl=None):
         """Adds an item to the in memory cache
 
         Parameters
@@ -170,16 +164,11 @@ class KodiHelper(object):
 
         contents : mixed
             Cache entry contents
+
+        ttl : :obj:`int`
+            Lifetime of the entry in seconds (defaults to the setting)
         """
-        current_window = xbmcgui.getCurrentWindowId()
-        window = xbmcgui.Window(current_window)
-        try:
-            cached_items = pickle.loads(window.getProperty('memcache').encode('latin-1'))
-            cached_items.update({cache_id: contents})
-            window.setProperty('memcache', pickle.dumps(cached_items, protocol=0).decode('latin-1'))
-        except (EOFError, UnicodeDecodeError) as e:
-            self.nx_common.log(msg='memcache: add_cached_items failed' + str(e))
-            pass
+        self._get_memcache().add(cache_id, contents, ttl=ttl)
 
     def set_custom_view(self, content):
         """Set the view mode
@@ -909,7 +898,7 @@ class KodiHelper(object):
             self.set_custom_view(VIEW_EPISODE)
         return True
 
-    def play_item(self, video_id, start_offset=-1, infoLabels={}, tvshow_video_id=None, timeline_markers={}):
+    def play_item(self, video_id, start_offset=-1, infoLabels={}, tvshow_video_id=None, timeline_markers={}, next_video_id=None):
         """Plays a video
 
         Parameters
@@ -923,6 +912,9 @@ class KodiHelper(object):
         infoLabels : :obj:`str`
             the listitem's infoLabels
 
+        next_video_id : :obj:`str`
+            ID of the episode following the played one (if any)
+
         Returns
         -------
         bool
@@ -987,6 +979,9 @@ class KodiHelper(object):
         if tvshow_video_id is not None:
             signal_data.update({'tvshow_video_id': tvshow_video_id})
 
+        if next_video_id is not None:
+            signal_data.update({'next_video_id': next_video_id})
+
         # check for content in kodi db
         if str(infoLabels) != 'None':
             if infoLabels['mediatype'] == 'episode':
@@ -12,12 +12,50 @@ import xbmcgui
 import xbmcvfs
 import requests
 from resources.lib.utils import noop
+from resources.lib.concurrency import ReadWriteLock, write_locked
+from resources.lib.librarydb import LibraryDB
+from resources.lib.bulkexport import BulkWriter
+from resources.lib.dirindex import DirectoryIndex
+from resources.lib.libraryscan import (
+    exported_movie_year, update_from_exported)
 from resources.lib.KodiHelper import KodiHelper
 try:
     import cPickle as pickle
 except:
     import pickle
 
+# characters removed from titles, before they're used as keys & folder names
+INVALID_TITLE_CHARACTERS = re.compile(r'[?|$|!|:|#]')
+# maximum number of memoized normalized titles
+NORMALIZED_TITLES_SIZE = 4096
+
+_normalized_titles = {}
+
+
+def normalize_title(title):
+    """Removes the characters that are invalid in folder names from a title,
+    the results are memoized as the same titles are normalized over & over
+
+    Parameters
+    ----------
+    title : :obj:`str`
+        Title of a movie or show
+
+    Returns
+    -------
+    :obj:`str`
+        Normalized title (of the same type as `title`)
+    """
+    # bytes & unicode titles are equal in Python 2, the type is kept
+    key = (type(title), title)
+    normalized = _normalized_titles.get(key)
+    if normalized is None:
+        if len(_normalized_titles) >= NORMALIZED_TITLES_SIZE:
+            _normalized_titles.clear()
+        normalized = INVALID_TITLE_CHARACTERS.sub('', title)
+        _normalized_titles[key] = normalized
+    return normalized
+
 
 class Library(object):
     """Exports Netflix shows & movies to a local library folder"""
@@ -34,10 +72,17 @@ class Library(object):
     imagecache_label = 'imagecache'
     """str: Label to identify imagecache"""
 
-    db_filename = 'lib.ndb'
-    """str: (File)Name of the store for the database dump that contains
+    db_filename = 'lib.db'
+    """str: (File)Name of the SQLite database that contains
     all shows/movies added to the library"""
 
+    legacy_db_filename = 'lib.ndb'
+    """str: (File)Name of the former pickled database dump, it's migrated
+    to the SQLite database once"""
+
+    index_filename = 'lib_index.ndb'
+    """str: (File)Name of the index of the exported folders"""
+
     def __init__(self, nx_common):
         """
         Takes the instances & configuration options needed to drive the plugin
@@ -64,7 +109,12 @@ class Library(object):
         self.enable_custom_library_folder = enable_custom_folder
         self.custom_library_folder = nx_common.get_setting('customlibraryfolder')
         self.db_filepath = os.path.join(self.base_data_path, self.db_filename)
+        self.legacy_db_filepath = os.path.join(
+            self.base_data_path, self.legacy_db_filename)
         self.log = nx_common.log
+        # shows may be exported by several threads at once (see
+        # LibraryUpdater), methods changing the db hold the lock for writing
+        self.lock = ReadWriteLock()
 
         # check for local library folder & set up the paths
         if self.enable_custom_library_folder != 'true':
@@ -84,8 +134,14 @@ class Library(object):
             self.imagecache_label: self.imagecache_path
         })
 
-        # load the local db
-        self.db = self._load_local_db(filename=self.db_filepath)
+        # open the local db
+        self.db = LibraryDB(path=self.db_filepath)
+        self._migrate_legacy_db(filename=self.legacy_db_filepath)
+        # listings of the exported folders, rescans only list changed ones
+        self.index = DirectoryIndex(
+            filename=os.path.join(self.base_data_path, self.index_filename),
+            listdir=xbmcvfs.listdir,
+            mtime=lambda path: xbmcvfs.Stat(path).st_mtime())
 
     def set_kodi_helper(self, kodi_helper):
         self.kodi_helper = kodi_helper
@@ -206,54 +262,36 @@ class Library(object):
             f.write(bytearray(pickle.dumps(content, protocol=2)))
             f.close()
 
-    def _load_local_db(self, filename):
-        """Loads the local db file and parses it, creates one if not existent
+    def _migrate_legacy_db(self, filename):
+        """Imports the former pickled db file into the SQLite db,
+        the file is renamed afterwards, so this only happens once
 
         Parameters
         ----------
         filename : :obj:`str`
-            Filepath of db file
+            Filepath of the pickled db file
 
         Returns
         -------
-        :obj:`dict`
-            Parsed contents of the db file
+        bool
+            The pickled db has been migrated
         """
-        # if the db doesn't exist, create it
         if not os.path.isfile(filename):
-            data = {self.movies_label: {}, self.series_label: {}}
-            self.log('Setup local library DB')
-            self._update_local_db(filename=filename, db=data)
-            return data
-
+            return False
         with open(filename, 'rb') as f:
             data = pickle.load(f)
-            if data:
-                return data
-            else:
-                return {}
-
-    def _update_local_db(self, filename, db):
-        """Updates the local db file with new data
-
-        Parameters
-        ----------
-        filename : :obj:`str`
-            Filepath of db file
-
-        db : :obj:`dict`
-            Database contents
-
-        Returns
-        -------
-        bool
-            Update has been successfully executed
-        """
-        if not os.path.isdir(os.path.dirname(filename)):
+        self.db.import_dump(
+            dump=data or {},
+            movies_label=self.movies_label,
+            series_label=self.series_label)
+        try:
+            os.rename(filename, filename + '.migrated')
+        except OSError:
+            # migrated by another instance of the addon at the same time,
+            # the import doesn't overwrite existing entries
             return False
-        with open(filename, 'wb') as f:
-            f.truncate()
-            pickle.dump(db, f, protocol=2)
+        self.log('Migrated local library DB {} to {}'
+                 .format(filename, self.db_filepath), xbmc.LOGNOTICE)
         return True
 
     def movie_exists(self, title, year):
@@ -272,9 +310,9 @@ class Library(object):
         bool
             Movie exists in DB
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
         movie_meta = '%s (%d)' % (title, year)
-        return movie_meta in self.db[self.movies_label]
+        return self.db.movie_exists(movie_meta)
 
     def show_exists(self, title):
         """Checks if a show is present in the local DB
@@ -289,9 +327,9 @@ class Library(object):
         bool
             Show exists in DB
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
         show_meta = '%s' % (title)
-        return show_meta in self.db[self.series_label]
+        return self.db.show_exists(show_meta)
 
     def season_exists(self, title, season):
         """Checks if a season is present in the local DB
@@ -309,11 +347,8 @@ class Library(object):
         bool
             Season of show exists in DB
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
-        if self.show_exists(title) is False:
-            return False
-        show_entry = self.db[self.series_label][title]
-        return season in show_entry['seasons']
+        title = normalize_title(title)
+        return self.db.season_exists(title, season)
 
     def episode_exists(self, title, season, episode):
         """Checks if an episode if a show is present in the local DB
@@ -334,13 +369,10 @@ class Library(object):
         bool
             Episode of show exists in DB
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
-        if self.show_exists(title) is False:
-            return False
-        show_entry = self.db[self.series_label][title]
-        episode_entry = 'S%02dE%02d' % (season, episode)
-        return episode_entry in show_entry['episodes']
+        title = normalize_title(title)
+        return self.db.episode_exists(title, season, episode)
 
+    @write_locked
     def add_movie(self, title, alt_title, year, video_id, build_url):
         """Adds a movie to the local db, generates & persists the strm file
 
@@ -361,9 +393,9 @@ class Library(object):
         build_url : :obj:`fn`
             Function to generate the stream url
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
         movie_meta = '%s (%d)' % (title, year)
-        folder = re.sub(r'[?|$|!|:|#]', r'', alt_title)
+        folder = normalize_title(alt_title)
         dirname = self.nx_common.check_folder_path(
             path=os.path.join(self.movie_path, folder))
         filename = os.path.join(dirname, movie_meta + '.strm')
@@ -375,15 +407,13 @@ class Library(object):
             xbmcvfs.mkdirs(dirname)
         if self.movie_exists(title=title, year=year) is False:
             progress.update(50)
-            time.sleep(0.5)
-            self.db[self.movies_label][movie_meta] = {'alt_title': alt_title}
-            self._update_local_db(filename=self.db_filepath, db=self.db)
+            self.db.add_movie(movie_meta, alt_title)
         url = build_url({'action': 'play_video', 'video_id': video_id})
         self.write_strm_file(path=filename, url=url, title_player=movie_meta)
         progress.update(100)
-        time.sleep(1)
         progress.close()
 
+    @write_locked
     def add_show(self, netflix_id, title, alt_title, episodes, build_url,
                  in_background=False):
         """Adds a show to the local db, generates & persists the strm files
@@ -404,10 +434,16 @@ class Library(object):
 
         build_url : :obj:`fn`
             Function to generate the stream url
+
+        Returns
+        -------
+        :obj:`str`
+            Folder of the show or False if not all of its episodes
+            could be written
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
         show_meta = '%s' % (title)
-        folder = re.sub(r'[?|$|!|:|#]', r'', alt_title.encode('utf-8'))
+        folder = normalize_title(alt_title.encode('utf-8'))
         show_dir = self.nx_common.check_folder_path(
             path=os.path.join(self.tvshow_path, folder))
         progress = self._create_progress_dialog(in_background)
@@ -415,19 +451,15 @@ class Library(object):
         if not xbmcvfs.exists(show_dir):
             self.log('Created show folder {}'.format(show_dir))
             xbmcvfs.mkdirs(show_dir)
-        if self.show_exists(title) is False:
+        show_entry = self.db.get_show(show_meta)
+        if show_entry is None:
             self.log('Show does not exists, adding entry to internal library')
-            self.db[self.series_label][show_meta] = {
-                'netflix_id': netflix_id,
-                'seasons': [],
-                'episodes': [],
-                'alt_title': alt_title}
+            self.db.add_show(show_meta, alt_title, netflix_id)
         else:
             self.log('Show is present in internal library: {}'
-                     .format(self.db[self.series_label][show_meta]))
-        if 'netflix_id' not in self.db[self.series_label][show_meta]:
-            self.db[self.series_label][show_meta]['netflix_id'] = netflix_id
-            self._update_local_db(filename=self.db_filepath, db=self.db)
+                     .format(show_entry))
+        if show_entry is not None and 'netflix_id' not in show_entry:
+            self.db.set_netflix_id(show_meta, netflix_id)
             self.log('Added missing netflix_id={} for {} to internal library.'
                      .format(netflix_id, title.encode('utf-8')),
                      xbmc.LOGNOTICE)
@@ -437,35 +469,39 @@ class Library(object):
         self.log('Episodes to export: {}'.format(episodes))
         if len(episodes) == 0:
             self.log('No episodes to export, exiting')
-            return False
-        step = round(100.0 / len(episodes), 1)
-        percent = step
-        for episode in episodes:
-            desc = self.kodi_helper.get_local_string(20373) + ': '
-            desc += str(episode.get('season'))
-            long_desc = self.kodi_helper.get_local_string(20359) + ': '
-            long_desc += str(episode.get('episode'))
-            progress.update(
-                percent=int(percent),
-                line1=show_meta,
-                line2=desc,
-                line3=long_desc)
-            self._add_episode(
+            progress.close()
+            return show_dir
+        # the episodes are committed at once, the strm files are written
+        # by a pool of threads afterwards
+        started = time.time()
+        with self.db.batch():
+            files = [self._add_episode(
                 show_dir=show_dir,
                 title=title,
                 season=episode.get('season'),
                 episode=episode.get('episode'),
                 video_id=episode.get('id'),
-                build_url=build_url)
-            percent += step
-            time.sleep(0.05)
-        self._update_local_db(filename=self.db_filepath, db=self.db)
-        time.sleep(1)
+                build_url=build_url) for episode in episodes]
+        episodes_label = self.kodi_helper.get_local_string(20360) + ': '
+
+        def update_progress(done, total):
+            progress.update(
+                percent=int(done * 100.0 / total),
+                line1=show_meta,
+                line2=episodes_label + '{}/{}'.format(done, total))
+        writer = BulkWriter(write=self._write_new_strm_file)
+        written = writer.run(files=files, on_progress=update_progress)
+        for args, error in writer.errors:
+            self.log('Failed to write {}: {}'.format(args[0], error),
+                     xbmc.LOGERROR)
+        self.log('Exported {} of {} episodes of {} in {:.2f}s'
+                 .format(written, len(files), title.encode('utf-8'),
+                         time.time() - started), xbmc.LOGNOTICE)
         progress.close()
         if in_background:
             self.kodi_helper.dialogs.show_episodes_added_notify(
                 title, len(episodes), self.kodi_helper.icon)
-        return show_dir
+        return show_dir if not writer.errors else False
 
     def _create_progress_dialog(self, is_noop):
         if is_noop:
@@ -484,8 +520,7 @@ class Library(object):
 
     def _add_episode(self, title, show_dir, season, episode, video_id, build_url):
         """
-        Adds a single episode to the local DB,
-        generates & persists the strm file
+        Adds a single episode to the local DB
 
         Parameters
         ----------
@@ -506,10 +541,15 @@ class Library(object):
 
         build_url : :obj:`fn`
             Function to generate the stream url
+
+        Returns
+        -------
+        :obj:`tuple`
+            Path, url & title of the strm file of the episode
         """
         season = int(season)
         episode = int(episode)
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
 
         self.log('Adding S{}E{} (id={}) of {} (dest={})'
                  .format(season, episode, video_id, title.encode('utf-8'),
@@ -520,7 +560,7 @@ class Library(object):
             self.log(
                 'Season {} does not exist, adding entry to internal library.'
                 .format(season))
-            self.db[self.series_label][title]['seasons'].append(season)
+            self.db.add_season(title, season)
 
         # add episode
         episode_meta = 'S%02dE%02d' % (season, episode)
@@ -532,21 +572,24 @@ class Library(object):
             self.log(
                 'S{}E{} does not exist, adding entry to internal library.'
                 .format(season, episode))
-            self.db[self.series_label][title]['episodes'].append(episode_meta)
+            self.db.add_episode(title, season, episode)
 
-        # create strm file
+        # strm file, written by the caller
         filename = episode_meta + '.strm'
         filepath = os.path.join(show_dir, filename)
-        if xbmcvfs.exists(filepath):
+        url = build_url({'action': 'play_video', 'video_id': video_id})
+        return filepath, url, title + ' - ' + episode_meta
+
+    def _write_new_strm_file(self, path, url, title_player):
+        """Writes a stream file unless it already exists
+        (see `write_strm_file`)"""
+        if xbmcvfs.exists(path):
             self.log('strm file {} already exists, not writing it'
-                     .format(filepath))
+                     .format(path))
             return
-        url = build_url({'action': 'play_video', 'video_id': video_id})
-        self.write_strm_file(
-            path=filepath,
-            url=url,
-            title_player=title + ' - ' + episode_meta)
+        self.write_strm_file(path=path, url=url, title_player=title_player)
 
+    @write_locked
     def remove_movie(self, title, year):
         """Removes the DB entry & the strm file for the movie given
 
@@ -563,29 +606,24 @@ class Library(object):
         bool
             Delete successfull
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
         movie_meta = '%s (%d)' % (title, year)
-        folder = re.sub(
-            pattern=r'[?|$|!|:|#]',
-            repl=r'',
-            string=self.db[self.movies_label][movie_meta]['alt_title'])
+        folder = normalize_title(self.db.get_movie(movie_meta)['alt_title'])
         progress = xbmcgui.DialogProgress()
         progress.create(self.kodi_helper.get_local_string(1210), movie_meta)
         progress.update(50)
-        time.sleep(0.5)
-        del self.db[self.movies_label][movie_meta]
-        self._update_local_db(filename=self.db_filepath, db=self.db)
+        self.db.remove_movie(movie_meta)
         dirname = self.nx_common.check_folder_path(
             path=os.path.join(self.movie_path, folder))
         filename = os.path.join(self.movie_path, folder, movie_meta + '.strm')
-        if xbmcvfs.exists(dirname):
+        removed = xbmcvfs.exists(dirname)
+        if removed:
             xbmcvfs.delete(filename)
             xbmcvfs.rmdir(dirname)
-            return True
-        return False
-        time.sleep(1)
         progress.close()
+        return removed
 
+    @write_locked
     def remove_show(self, title):
         """Removes the DB entry & the strm files for the show given
 
@@ -599,36 +637,31 @@ class Library(object):
         bool
             Delete successfull
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
-        label = self.series_label
-        rep_str = self.db[label][title]['alt_title'].encode('utf-8')
-        folder = re.sub(
-            pattern=r'[?|$|!|:|#]',
-            repl=r'',
-            string=rep_str)
+        title = normalize_title(title)
+        rep_str = self.db.get_show(title)['alt_title'].encode('utf-8')
+        folder = normalize_title(rep_str)
         progress = xbmcgui.DialogProgress()
         progress.create(self.kodi_helper.get_local_string(1210), title)
-        time.sleep(0.5)
-        del self.db[self.series_label][title]
-        self._update_local_db(filename=self.db_filepath, db=self.db)
+        self.db.remove_show(title)
         show_dir = self.nx_common.check_folder_path(
             path=os.path.join(self.tvshow_path, folder))
-        if xbmcvfs.exists(show_dir):
+        removed = xbmcvfs.exists(show_dir)
+        if removed:
             show_files = xbmcvfs.listdir(show_dir)[1]
-            episode_count_total = len(show_files)
-            step = round(100.0 / episode_count_total, 1)
-            percent = 100 - step
-            for filename in show_files:
-                progress.update(int(percent))
+            episode_count_total = max(1, len(show_files))
+            last_update = 0
+            for index, filename in enumerate(show_files):
+                # the dialog is updated a few times a second at most
+                if time.time() - last_update >= 0.25:
+                    last_update = time.time()
+                    progress.update(
+                        int(100 - index * 100.0 / episode_count_total))
                 xbmcvfs.delete(os.path.join(show_dir, filename))
-                percent = percent - step
-                time.sleep(0.05)
             xbmcvfs.rmdir(show_dir)
-            return True
-        return False
-        time.sleep(1)
         progress.close()
+        return removed
 
+    @write_locked
     def remove_season(self, title, season):
         """Removes the DB entry & the strm files for a season of a show given
 
@@ -645,16 +678,10 @@ class Library(object):
         bool
             Delete successfull
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title.encode('utf-8'))
+        title = normalize_title(title.encode('utf-8'))
         season = int(season)
-        season_list = []
-        episodes_list = []
         show_meta = '%s' % (title)
-        for season_entry in self.db[self.series_label][show_meta]['seasons']:
-            if season_entry != season:
-                season_list.append(season_entry)
-        self.db[self.series_label][show_meta]['seasons'] = season_list
-        alt_title = self.db[self.series_label][show_meta]['alt_title']
+        alt_title = self.db.get_show(show_meta)['alt_title']
         show_dir = self.nx_common.check_folder_path(
             path=os.path.join(self.tvshow_path, alt_title))
         if xbmcvfs.exists(show_dir):
@@ -662,12 +689,10 @@ class Library(object):
             for filename in show_files:
                 if 'S%02dE' % (season) in filename:
                     xbmcvfs.delete(os.path.join(show_dir, filename))
-                else:
-                    episodes_list.append(filename.replace('.strm', ''))
-            self.db[self.series_label][show_meta]['episodes'] = episodes_list
-        self._update_local_db(filename=self.db_filepath, db=self.db)
+        self.db.remove_season(show_meta, season)
         return True
 
+    @write_locked
     def remove_episode(self, title, season, episode):
         """Removes the DB entry & the strm files for an episode of a show given
 
@@ -687,20 +712,15 @@ class Library(object):
         bool
             Delete successfull
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title.encode('utf-8'))
-        episodes_list = []
+        title = normalize_title(title.encode('utf-8'))
         show_meta = '%s' % (title)
         episode_meta = 'S%02dE%02d' % (season, episode)
-        alt_title = self.db[self.series_label][show_meta]['alt_title']
+        alt_title = self.db.get_show(show_meta)['alt_title']
         show_dir = self.nx_common.check_folder_path(
             path=os.path.join(self.tvshow_path, alt_title))
         if xbmcvfs.exists(os.path.join(show_dir, episode_meta + '.strm')):
             xbmcvfs.delete(os.path.join(show_dir, episode_meta + '.strm'))
-        for episode_entry in self.db[self.series_label][show_meta]['episodes']:
-            if episode_meta != episode_entry:
-                episodes_list.append(episode_entry)
-        self.db[self.series_label][show_meta]['episodes'] = episodes_list
-        self._update_local_db(filename=self.db_filepath, db=self.db)
+        self.db.remove_episode(show_meta, season, episode)
         return True
 
     def list_exported_media(self):
@@ -722,7 +742,29 @@ class Library(object):
         return movies + shows
 
     def list_exported_shows(self):
-        return self.db[self.series_label]
+        return self.db.list_shows()
+
+    @write_locked
+    def set_show_fingerprint(self, title, fingerprint):
+        """Stores the fingerprint of an exported show, the show is only
+        updated again once its fingerprint changed
+
+        Parameters
+        ----------
+        title : :obj:`str`
+            Title of the show
+
+        fingerprint : :obj:`list`
+            Season & episode counts of the show, as of its last export
+
+        Returns
+        -------
+        bool
+            Fingerprint has been stored
+        """
+        title = normalize_title(title)
+        show_meta = '%s' % (title)
+        return self.db.set_fingerprint(show_meta, fingerprint)
 
     def get_exported_movie_year(self, title):
         """Return year of given exported movie
@@ -732,14 +774,14 @@ class Library(object):
         obj:`int`
             year of given movie
         """
-        year = '0000'
+        year = None
         folder = self.nx_common.check_folder_path(
             path=os.path.join(self.movie_path, title))
         if xbmcvfs.exists(folder):
-            file = xbmcvfs.listdir(folder)
-            year = str(file[1]).split('(', 1)[1].split(')', 1)[0]
-        return int(year)
+            year = exported_movie_year(xbmcvfs.listdir(folder)[1])
+        return year or 0
 
+    @write_locked
     def updatedb_from_exported(self):
         """Adds movies and shows from exported media to the local db
 
@@ -748,49 +790,13 @@ class Library(object):
         bool
             Process finished
         """
-        tv_show_path = self.tvshow_path
-        db_filepath = self.db_filepath
-        if xbmcvfs.exists(self.nx_common.check_folder_path(self.movie_path)):
-            movies = xbmcvfs.listdir(self.movie_path)
-            for video in movies[0]:
-                folder = os.path.join(self.movie_path, video)
-                file = xbmcvfs.listdir(folder)
-                year = int(str(file[1]).split("(", 1)[1].split(")", 1)[0])
-                alt_title = unicode(video.decode('utf-8'))
-                title = unicode(video.decode('utf-8'))
-                movie_meta = '%s (%d)' % (title, year)
-                if self.movie_exists(title=title, year=year) is False:
-                    self.db[self.movies_label][movie_meta] = {
-                        'alt_title': alt_title}
-                    self._update_local_db(filename=db_filepath, db=self.db)
-
-        if xbmcvfs.exists(self.nx_common.check_folder_path(tv_show_path)):
-            shows = xbmcvfs.listdir(tv_show_path)
-            for video in shows[0]:
-                show_dir = os.path.join(tv_show_path, video)
-                title = unicode(video.decode('utf-8'))
-                alt_title = unicode(video.decode('utf-8'))
-                show_meta = '%s' % (title)
-                if self.show_exists(title) is False:
-                    self.db[self.series_label][show_meta] = {
-                        'seasons': [],
-                        'episodes': [],
-                        'alt_title': alt_title}
-                    episodes = xbmcvfs.listdir(show_dir)
-                    for episode in episodes[1]:
-                        file = str(episode).split(".")[0]
-                        season = int(str(file).split("S")[1].split("E")[0])
-                        episode = int(str(file).split("E")[1])
-                        episode_meta = 'S%02dE%02d' % (season, episode)
-                        episode_exists = self.episode_exists(
-                            title=title,
-                            season=season,
-                            episode=episode)
-                        if episode_exists is False:
-                            self.db[self.series_label][title]['episodes'].append(episode_meta)
-                            self._update_local_db(
-                                filename=self.db_filepath,
-                                db=self.db)
+        update_from_exported(
+            db=self.db,
+            index=self.index,
+            movie_path=self.movie_path,
+            tvshow_path=self.tvshow_path,
+            folder_path=self.nx_common.check_folder_path,
+            exists=xbmcvfs.exists)
         return True
 
     def download_image_file(self, title, url):
@@ -809,7 +815,7 @@ class Library(object):
         bool
             Download triggered
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title.decode('utf-8'))
+        title = normalize_title(title.decode('utf-8'))
         imgfile = title + '.jpg'
         file = os.path.join(self.imagecache_path, imgfile)
         folder_movies = self.nx_common.check_folder_path(
@@ -846,7 +852,7 @@ class Library(object):
         obj:`int`
             image of given title if exists
         """
-        title = re.sub(r'[?|$|!|:|#]', r'', title)
+        title = normalize_title(title)
         imgfile = title + '.jpg'
         file = os.path.join(self.imagecache_path, imgfile)
         if xbmcvfs.exists(file):
@@ -131,4 +131,11 @@ class MSLCrypto():
         return encryption_envelope;
 
     def sign(self, message):
-        return HMAC.new(self.sign_key, message, SHA256).digest()
\ No newline at end of file
+        return HMAC.new(self.sign_key, message, SHA256).digest()
+
+    def verify(self, message, signature):
+        try:
+            HMAC.new(self.sign_key, message, SHA256).verify(signature)
+        except ValueError:
+            return False
+        return True
\ No newline at end of file
@@ -24,6 +24,7 @@ except ImportError:
     from SocketServer import TCPServer
 
 from resources.lib.MSLv2 import MSL
+from resources.lib.concurrency import ThreadPoolMixIn
 
 
 class MSLHttpRequestHandler(BaseHTTPRequestHandler):
@@ -37,13 +38,16 @@ class MSLHttpRequestHandler(BaseHTTPRequestHandler):
     # pylint: disable=invalid-name
     def do_POST(self):
         """Loads the licence for the requested resource"""
+        params = parse_qs(urlparse(self.path).query)
+        viewable_id = int(params['id'][0]) if 'id' in params else None
         length = int(self.headers.get('content-length'))
         post = self.rfile.read(length)
         data = post.split(b'!')
         if len(data) is 2:
             challenge = data[0]
             sid = base64.standard_b64decode(data[1])
-            b64license = self.server.msl_handler.get_license(challenge, sid)
+            b64license = self.server.msl_handler.get_license(
+                challenge, sid, viewable_id)
             if b64license is not '':
                 self.send_response(200)
                 self.end_headers()
@@ -93,16 +97,24 @@ class MSLHttpRequestHandler(BaseHTTPRequestHandler):
 ##################################
 
 
-class MSLTCPServer(TCPServer):
-    """Override TCPServer to allow usage of shared members"""
+class MSLTCPServer(ThreadPoolMixIn, TCPServer):
+    """
+    Override TCPServer to allow usage of shared members,
+    requests are handled by a bounded pool of worker threads so a slow
+    manifest request doesn't hold back the license request of a playback
+    """
 
     def __init__(self, server_address, nx_common):
         """Initialization of MSLTCPServer"""
         nx_common.log(msg='Constructing MSLTCPServer')
         self.nx_common = nx_common
+        self.pool_size = int(nx_common.get_setting('msl_worker_threads') or 1)
+        nx_common.log(msg='[MSL] Worker threads: ' + str(self.pool_size))
         self.msl_handler = MSL(nx_common)
         TCPServer.__init__(self, server_address, MSLHttpRequestHandler)
 
     def reset_msl_data(self):
         """Initialization of MSLTCPServerResets MSL data (perform handshake)"""
         self.msl_handler.perform_key_handshake()
+        # manifests of the former ESN / keys must not be served any longer
+        self.msl_handler.manifest_cache.clear()
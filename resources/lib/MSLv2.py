@@ -5,6 +5,7 @@
 # Created on: 26.01.2017
 # License: MIT https://goo.gl/5bMj3H
 
+import os
 import re
 import sys
 import zlib
@@ -13,6 +14,7 @@ import time
 import base64
 import random
 import uuid
+import threading
 
 try:
     from io import StringIO
@@ -20,9 +22,12 @@ except ImportError:
     from StringIO import StringIO
 
 from datetime import datetime
+from collections import OrderedDict
 import requests
 import xml.etree.ElementTree as ET
 from resources.lib.compat import string_encoding
+from resources.lib.cache import ManifestCache
+from resources.lib.mslstream import CHUNK_SIZE, MSLResponseDecoder
 
 import xbmcaddon
 
@@ -39,6 +44,11 @@ if sdkversion >= 18:
 else:
   from resources.lib.MSLCrypto import MSLCrypto as MSLHandler
 
+# license contexts kept per title & per license session
+MAX_LICENSE_CONTEXTS = 16
+# seconds requests wait for the keys of the initial handshake
+HANDSHAKE_TIMEOUT = 60
+
 class MSL(object):
     # Is a handshake already performed and the keys loaded
     handshake_performed = False
@@ -64,26 +74,125 @@ class MSL(object):
       """
       self.nx_common = nx_common
 
+      # guards the keys, the master token, its sequence number & the
+      # message id, requests are handled on several threads
+      self.crypto_lock = threading.RLock()
+      # guards the license contexts of the manifests & license sessions
+      self.context_lock = threading.Lock()
+      self.license_contexts = OrderedDict()
+      self.session_contexts = OrderedDict()
+
       self.locale_id = []
       locale_id = nx_common.get_setting('locale_id')
       self.locale_id.append(locale_id if locale_id else 'en-US')
 
       self.crypto = MSLHandler(nx_common)
 
-      if self.nx_common.file_exists(self.nx_common.data_path, 'msl_data.json'):
-          self.init_msl_data()
-      else:
-          self.crypto.fromDict(None)
-          self.__perform_key_handshake()
+      persist = nx_common.get_setting('persist_manifest_cache') == 'true'
+      self.manifest_cache = ManifestCache(
+          path=os.path.join(nx_common.data_path, 'manifests')
+          if persist else None)
+
+      self.mastertoken = None
+      self.mastertoken_expiration = 0
+      self.mastertoken_renewal_window = 0
+
+      # loading the keys may need a handshake (& generating RSA keys), the
+      # requests wait for `ready` instead of the service startup
+      self.ready = threading.Event()
+      init_thread = threading.Thread(
+          target=self.__init_keys, name='MSLHandshake')
+      init_thread.daemon = True
+      init_thread.start()
+
+    def __init_keys(self):
+        try:
+            if self.nx_common.file_exists(
+                    self.nx_common.data_path, 'msl_data.json'):
+                self.init_msl_data()
+            else:
+                with self.crypto_lock:
+                    self.crypto.fromDict(None)
+                    self.__perform_key_handshake()
+        except:
+            exc = sys.exc_info()
+            self.nx_common.log(
+                msg='[MSL] Loading the keys failed {} {}'.format(
+                    exc[0], exc[1]))
+        finally:
+            self.ready.set()
+
+    def master_token_renewal_due(self, margin):
+        """
+        Checks if the master token should be renewed
+
+        :param margin: Seconds before the expiry the token is due
+        :return: True if there is no token, its renewal window has been
+            reached or it expires within margin seconds
+        """
+        if not self.ready.is_set():
+            return False
+        with self.crypto_lock:
+            if self.mastertoken is None:
+                return True
+            now = time.time()
+            return (
+                (self.mastertoken_renewal_window and
+                 now >= self.mastertoken_renewal_window) or
+                self.mastertoken_expiration - now < margin)
 
     def load_manifest(self, viewable_id, dolby, hevc, hdr, dolbyvision, vp9):
         """
         Loads the manifets for the given viewable_id and
         returns a mpd-XML-Manifest
 
+        A manifest loaded before for the same title, capabilities & ESN
+        is served from the manifest cache as long as its urls are valid,
+        the license context is always the one of the served manifest
+
         :param viewable_id: The id of of the viewable
         :return: MPD XML Manifest or False if no success
         """
+        key = ManifestCache.key(
+            viewable_id, self.nx_common.get_esn(),
+            dolby, hevc, hdr, dolbyvision, vp9)
+        manifest = self.manifest_cache.get(key)
+        if manifest is None:
+            manifest = self.fetch_manifest(
+                viewable_id, dolby, hevc, hdr, dolbyvision, vp9)
+            if not manifest:
+                return False
+            self.manifest_cache.add(key, manifest)
+        else:
+            self.nx_common.log(
+                msg='Manifest of {} served from cache'.format(viewable_id))
+        return self.__tranform_to_dash(manifest, viewable_id)
+
+    def prefetch_manifest(self, viewable_id, dolby, hevc, hdr, dolbyvision,
+                          vp9):
+        """
+        Loads the manifest for the given viewable_id into the manifest cache,
+        without touching the license context of the current playback
+
+        :param viewable_id: The id of of the viewable
+        :return: True if the manifest is cached
+        """
+        key = ManifestCache.key(
+            viewable_id, self.nx_common.get_esn(),
+            dolby, hevc, hdr, dolbyvision, vp9)
+        if self.manifest_cache.get(key) is not None:
+            return True
+        manifest = self.fetch_manifest(
+            viewable_id, dolby, hevc, hdr, dolbyvision, vp9)
+        return bool(manifest) and self.manifest_cache.add(key, manifest)
+
+    def fetch_manifest(self, viewable_id, dolby, hevc, hdr, dolbyvision, vp9):
+        """
+        Requests the manifest for the given viewable_id from Netflix
+
+        :param viewable_id: The id of of the viewable
+        :return: Decrypted manifest or False if no success
+        """
 
         ia_addon = xbmcaddon.Addon('inputstream.adaptive')
         hdcp = ia_addon is not None and ia_addon.getSetting('HDCPOVERRIDE') == 'true'
@@ -225,44 +334,42 @@ class MSL(object):
         request_data = self.__generate_msl_request_data(manifest_request_data)
 
         try:
-            resp = self.session.post(self.endpoints['manifest'], request_data)
+            resp = self.session.post(
+                self.endpoints['manifest'], request_data, stream=True)
         except:
             resp = None
             exc = sys.exc_info()
             msg = '[MSL][POST] Error {} {}'
             self.nx_common.log(msg=msg.format(exc[0], exc[1]))
 
-        if resp:
-            try:
-                # if the json() does not fail we have an error because
-                # the manifest response is a chuncked json response
-                resp.json()
-                self.nx_common.log(
-                    msg='Error getting Manifest: ' + resp.text)
-                return False
-            except ValueError:
-                # json() failed so parse the chunked response
-                #self.nx_common.log(
-                #    msg='Got chunked Manifest Response: ' + resp.text)
-                resp = self.__parse_chunked_msl_response(resp.text)
-                #self.nx_common.log(
-                #    msg='Parsed chunked Response: ' + json.dumps(resp))
-                data = self.__decrypt_payload_chunks(resp['payloads'])
-                return self.__tranform_to_dash(data)
+        if resp is None:
+            return False
+        # the streamed response goes back to the pool only once closed
+        try:
+            if resp:
+                return self.__decode_msl_response(resp)
+        except (ValueError, KeyError, zlib.error) as exc:
+            # error responses are a single (unchunked) json object
+            self.nx_common.log(
+                msg='Error getting Manifest: ' + str(exc))
+        finally:
+            resp.close()
         return False
 
-    def get_license(self, challenge, sid):
+    def get_license(self, challenge, sid, viewable_id=None):
         """
         Requests and returns a license for the given challenge and sid
         :param challenge: The base64 encoded challenge
         :param sid: The sid paired to the challengew
+        :param viewable_id: The id of the viewable the license is for
         :return: Base64 representation of the licensekey or False unsuccessfull
         """
+        context = self.__get_license_context(sid.decode('utf-8'), viewable_id)
         esn = self.nx_common.get_esn()
         id = int(time.time() * 10000)
         license_request_data = {
             'version': 2,
-            'url': self.last_license_url,
+            'url': context['license_url'],
             'id': id,
             'esn': esn,
             'languages': self.locale_id,
@@ -280,56 +387,44 @@ class MSL(object):
         request_data = self.__generate_msl_request_data(license_request_data)
 
         try:
-            resp = self.session.post(self.endpoints['license'], request_data)
+            resp = self.session.post(
+                self.endpoints['license'], request_data, stream=True)
         except:
             resp = None
             exc = sys.exc_info()
             self.nx_common.log(
                 msg='[MSL][POST] Error {} {}'.format(exc[0], exc[1]))
 
-        #print resp
-
-        if resp:
-            try:
-                # If is valid json the request for the licnese failed
-                resp.json()
-                self.nx_common.log(msg='Error getting license: '+resp.text)
+        if resp is None:
+            return False
+        # the streamed response goes back to the pool only once closed
+        try:
+            if not resp:
                 return False
-            except ValueError:
-                # json() failed so we have a chunked json response
-                resp = self.__parse_chunked_msl_response(resp.text)
-                data = self.__decrypt_payload_chunks(resp['payloads'])
-                if 'licenseResponseBase64' in data[0]:
-                    return data[0]['licenseResponseBase64']
-                else:
-                    self.nx_common.log(
-                        msg='Error getting license: ' + json.dumps(data))
-                    return False
+            data = self.__decode_msl_response(resp)
+        except (ValueError, KeyError, zlib.error) as exc:
+            # error responses are a single (unchunked) json object
+            self.nx_common.log(msg='Error getting license: ' + str(exc))
+            return False
+        finally:
+            resp.close()
+        if 'licenseResponseBase64' in data[0]:
+            return data[0]['licenseResponseBase64']
+        self.nx_common.log(msg='Error getting license: ' + json.dumps(data))
         return False
 
-    def __decrypt_payload_chunks(self, payloadchunks):
-        decrypted_payload = b''
-        for chunk in payloadchunks:
-            payloadchunk = json.loads(chunk)
-            payload = payloadchunk.get('payload')
-            decoded_payload = base64.standard_b64decode(payload)
-            encryption_envelope = json.loads(decoded_payload)
-            # Decrypt the text
-            plaintext = self.crypto.decrypt(base64.standard_b64decode(encryption_envelope['iv']),
-              base64.standard_b64decode(encryption_envelope.get('ciphertext')))
-            # unpad the plaintext
-            plaintext = json.loads(plaintext)
-            data = plaintext.get('data')
-
-            # uncompress data if compressed
-            if plaintext.get('compressionalgo') == 'GZIP':
-                decoded_data = base64.standard_b64decode(data)
-                data = zlib.decompress(decoded_data, 16 + zlib.MAX_WBITS)
-            else:
-                data = base64.standard_b64decode(data)
-            decrypted_payload += data
-
-        decrypted_payload = json.loads(decrypted_payload)
+    def __decode_msl_response(self, resp):
+        """
+        Decodes a chunked MSL response while it's downloaded, the payload
+        chunks are verified & decrypted as soon as they arrive
+        :param resp: The streamed response
+        :return: The result of the message
+        """
+        decoder = MSLResponseDecoder(
+            decrypt=self.__decrypt,
+            verify=self.__verify,
+            size_hint=int(resp.headers.get('content-length') or 0))
+        decrypted_payload = decoder.decode(resp.iter_content(CHUNK_SIZE))
 
         if 'result' in decrypted_payload:
             return decrypted_payload['result']
@@ -341,17 +436,61 @@ class MSL(object):
             decrypted_payload = base64.standard_b64decode(decrypted_payload['data'])
             return json.JSONDecoder().decode(decrypted_payload)
 
+    def __decrypt(self, iv, ciphertext):
+        with self.crypto_lock:
+            return self.crypto.decrypt(iv, ciphertext)
 
-    def __tranform_to_dash(self, manifest):
+    def __verify(self, message, signature):
+        with self.crypto_lock:
+            return self.crypto.verify(message, signature)
+
+    def __set_license_context(self, viewable_id, manifest):
+        """
+        Remembers the license context of a manifest, used by the license
+        requests of the title (see `__get_license_context`)
+        """
+        context = {
+            'license_url': manifest['links']['license']['href'],
+            'playback_context': manifest['playbackContextId'],
+            'drm_context': manifest['drmContextId']
+        }
+        with self.context_lock:
+            self.license_contexts.pop(viewable_id, None)
+            self.license_contexts[viewable_id] = context
+            while len(self.license_contexts) > MAX_LICENSE_CONTEXTS:
+                self.license_contexts.popitem(last=False)
+            self.last_license_url = context['license_url']
+            self.last_playback_context = context['playback_context']
+            self.last_drm_context = context['drm_context']
+
+    def __get_license_context(self, sid, viewable_id):
+        """
+        Returns the license context of a license session. The first license
+        request of a session binds it to the context of the manifest of its
+        title (or the last loaded manifest if the title is unknown), so
+        renewals keep their context while other titles are loaded.
+        """
+        with self.context_lock:
+            context = self.session_contexts.get(sid)
+            if context is None:
+                context = self.license_contexts.get(viewable_id) or {
+                    'license_url': self.last_license_url,
+                    'playback_context': self.last_playback_context,
+                    'drm_context': self.last_drm_context
+                }
+                self.session_contexts[sid] = context
+                while len(self.session_contexts) > MAX_LICENSE_CONTEXTS:
+                    self.session_contexts.popitem(last=False)
+            return context
+
+    def __tranform_to_dash(self, manifest, viewable_id=None):
 
         self.nx_common.save_file(
             data_path=self.nx_common.data_path,
             filename='manifest.json',
             content=json.dumps(manifest))
 
-        self.last_license_url = manifest['links']['license']['href']
-        self.last_playback_context = manifest['playbackContextId']
-        self.last_drm_context = manifest['drmContextId']
+        self.__set_license_context(viewable_id, manifest)
 
         seconds = manifest['duration'] / 1000
         init_length = seconds / 2 * 12 + 20 * 1000
@@ -545,17 +684,15 @@ class MSL(object):
         for url in urls:
             return url['url']
 
-    def __parse_chunked_msl_response(self, message):
-        header = message.split('}}')[0] + '}}'
-        payloads = re.split(',\"signature\":\"[0-9A-Za-z=/+]+\"}', message.split('}}')[1])
-        payloads = [x + '}' for x in payloads][:-1]
-
-        return {
-            'header': header,
-            'payloads': payloads
-        }
-
     def __generate_msl_request_data(self, data):
+        if not self.ready.wait(HANDSHAKE_TIMEOUT):
+            self.nx_common.log(msg='[MSL] Keys not loaded yet')
+        # the message id & the sequence number of the header have to match
+        # the ones of the payload
+        with self.crypto_lock:
+            return self.__generate_msl_request_data_locked(data)
+
+    def __generate_msl_request_data_locked(self, data):
         #self.__load_msl_data()
         header_encryption_envelope = self.__encrypt(
             plaintext=self.__generate_msl_header()).encode()
@@ -647,6 +784,11 @@ class MSL(object):
         self.__perform_key_handshake()
 
     def __perform_key_handshake(self):
+        # requests wait for the new keys instead of using the old ones
+        with self.crypto_lock:
+            return self.__perform_key_handshake_locked()
+
+    def __perform_key_handshake_locked(self):
         esn = self.nx_common.get_esn()
         self.nx_common.log(msg='perform_key_handshake: esn:' + esn)
 
@@ -706,6 +848,10 @@ class MSL(object):
         self.handshake_performed = True
 
     def __load_msl_data(self):
+        with self.crypto_lock:
+            self.__load_msl_data_locked()
+
+    def __load_msl_data_locked(self):
         raw_msl_data = self.nx_common.load_file(
             data_path=self.nx_common.data_path,
             filename='msl_data.json')
@@ -735,12 +881,13 @@ class MSL(object):
         Saves the keys and tokens in json file
         :return:
         """
-        data = {
-            'tokens': {
-                'mastertoken': self.mastertoken
+        with self.crypto_lock:
+            data = {
+                'tokens': {
+                    'mastertoken': self.mastertoken
+                }
             }
-        }
-        data.update(self.crypto.toDict())
+            data.update(self.crypto.toDict())
 
         serialized_data = json.JSONEncoder().encode(data)
         self.nx_common.save_file(
@@ -749,8 +896,13 @@ class MSL(object):
             content=serialized_data)
 
     def __set_master_token(self, master_token):
-        self.mastertoken = master_token
         raw_token = master_token['tokendata']
         base_token = base64.standard_b64decode(raw_token)
         decoded_token = json.JSONDecoder().decode(base_token.decode('utf-8'))
-        self.sequence_number = decoded_token.get('sequencenumber')
+        with self.crypto_lock:
+            self.mastertoken = master_token
+            self.sequence_number = decoded_token.get('sequencenumber')
+            self.mastertoken_expiration = int(
+                decoded_token.get('expiration', 0))
+            self.mastertoken_renewal_window = int(
+                decoded_token.get('renewalwindow', 0))
@@ -15,6 +15,8 @@ import ast
 import re
 import os
 import json
+import socket
+import threading
 
 try:
     from urllib.parse import parse_qsl, urlparse, unquote, urlencode
@@ -23,9 +25,9 @@ except ImportError:
     from urlparse import parse_qsl, urlparse
 
 try:
-    import urllib.request as Request
+    from http.client import BadStatusLine, HTTPConnection, HTTPException
 except ImportError:
-    import urllib2 as Request
+    from httplib import BadStatusLine, HTTPConnection, HTTPException
 
 from datetime import datetime
 from collections import OrderedDict
@@ -34,12 +36,18 @@ from distutils.util import strtobool
 import xbmc
 import resources.lib.NetflixSession as Netflix
 from resources.lib.compat import itername
-from resources.lib.utils import log, find_episode
+from resources.lib.utils import log, find_episode, find_next_episode
 from resources.lib.KodiHelper import KodiHelper
 from resources.lib.Library import Library
+from resources.lib.libraryupdate import LibraryUpdater
 from resources.lib.playback.section_skipping import SKIPPABLE_SECTIONS, OFFSET_CREDITS
 from resources.lib.playback.bookmarks import OFFSET_WATCHED_TO_END
 
+# seconds the plugin waits for an answer of the Netflix service: the
+# slowest calls (login, batched library fetches) finish well within it,
+# without a limit a hung service would block the plugin for good
+SERVICE_TIMEOUT = 120
+
 
 def _get_offset_markers(metadata):
     return {
@@ -98,6 +106,8 @@ class Navigation(object):
 
         self.base_url = self.nx_common.base_url
         self.log = self.nx_common.log
+        # keep-alive connections to the Netflix service (one per thread)
+        self._service_connections = threading.local()
 
     @log
     def router(self, paramstring):
@@ -310,17 +320,20 @@ class Navigation(object):
             infoLabels = {}
 
         try:
-            metadata, tvshow_video_id = self._get_single_metadata(video_id)
+            metadata, tvshow_video_id, next_video_id = (
+                self._get_single_metadata(video_id))
         except KeyError:
             metadata = {}
             tvshow_video_id = None
+            next_video_id = None
 
         return self.kodi_helper.play_item(
             video_id=video_id,
             start_offset=start_offset,
             infoLabels=infoLabels,
             tvshow_video_id=tvshow_video_id,
-            timeline_markers=self._get_timeline_markers(metadata))
+            timeline_markers=self._get_timeline_markers(metadata),
+            next_video_id=next_video_id)
 
     @log
     def _get_timeline_markers(self, metadata):
@@ -344,9 +357,11 @@ class Navigation(object):
         )['video']
 
         if metadata['type'] == 'show':
-            return find_episode(video_id, metadata['seasons']), metadata['id']
+            next_episode = find_next_episode(video_id, metadata['seasons'])
+            return (find_episode(video_id, metadata['seasons']),
+                    metadata['id'], next_episode.get('id'))
 
-        return metadata, None
+        return metadata, None, None
 
     @log
     def show_search_results(self, term):
@@ -500,8 +515,8 @@ class Navigation(object):
         start : :obj:`int`
             Starting point
         """
-        end = start + Netflix.FETCH_VIDEO_REQUEST_COUNT
-        video_list = {}
+        # the whole page is fetched with one request
+        end = start + Netflix.FETCH_VIDEO_PAGE_SIZE - 1
         user_data = self._check_response(self.call_netflix_service({
             'method': 'get_user_data'}))
         if user_data:
@@ -509,27 +524,21 @@ class Navigation(object):
                          'trendingNow', 'newRelease', 'popularTitles']
             if str(type) in user_list and video_list_id is None:
                 video_list_id = self.list_id_for_type(type)
-            for i in range(0, 4):
-                items = self._check_response(self.call_netflix_service({
-                    'method': 'fetch_video_list',
-                    'list_id': video_list_id,
-                    'list_from': start,
-                    'list_to': end,
-                    'guid': user_data['guid'],
-                    'cache': True}))
-                if items is False and i == 0:
-                    self.nx_common.log('show_video_list response is dirty')
-                    return False
-                elif len(items) == 0:
-                    if i == 0:
-                        self.nx_common.log('show_video_list items=0')
-                        return False
-                    break
-                req_count = Netflix.FETCH_VIDEO_REQUEST_COUNT
-                video_list.update(items)
-                start = end + 1
-                end = start + req_count
-            has_more = len(video_list) == (req_count + 1) * 4
+            video_list = self._check_response(self.call_netflix_service({
+                'method': 'fetch_video_list',
+                'list_id': video_list_id,
+                'list_from': start,
+                'list_to': end,
+                'guid': user_data['guid'],
+                'cache': True}))
+            if video_list is False:
+                self.nx_common.log('show_video_list response is dirty')
+                return False
+            elif len(video_list) == 0:
+                self.nx_common.log('show_video_list items=0')
+                return False
+            has_more = len(video_list) == Netflix.FETCH_VIDEO_PAGE_SIZE
+            start = end + 1
             actions = {'movie': 'play_video', 'show': 'season_list'}
             listing = self.kodi_helper.build_video_listing(
                 video_list=video_list,
@@ -654,7 +663,8 @@ class Navigation(object):
         return self.kodi_helper.dialogs.show_request_error_notify()
 
     @log
-    def export_to_library(self, video_id, alt_title, in_background=False):
+    def export_to_library(self, video_id, alt_title, in_background=False,
+                          refresh=False, fingerprint=None):
         """Adds an item to the local library
 
         Parameters
@@ -664,10 +674,23 @@ class Navigation(object):
 
         alt_title : :obj:`str`
             Alternative title (for the folder written to disc)
+
+        refresh : bool
+            Fetch the metadata from Netflix instead of the metadata cache
+
+        fingerprint : :obj:`list`
+            Fingerprint of the show, stored once the show has been
+            exported together with the metadata of its episodes
+
+        Returns
+        -------
+        bool
+            The item has been exported
         """
-        metadata = self._check_response(self.call_netflix_service({
-            'method': 'fetch_metadata',
-            'video_id': video_id}))
+        params = {'method': 'fetch_metadata', 'video_id': video_id}
+        if refresh:
+            params['refresh'] = 'true'
+        metadata = self._check_response(self.call_netflix_service(params))
         if metadata:
             video = metadata['video']
             if video['type'] == 'movie':
@@ -679,41 +702,71 @@ class Navigation(object):
                     build_url=self.build_url)
             if video['type'] == 'show':
                 episodes = []
+                season_ids = [season['id'] for season in video['seasons']]
+                # the episodes are exported without their metadata then
+                complete = self._download_episode_metadata(
+                    season_ids, video['title'], refresh)
+                if not complete:
+                    self.log(msg=('Failed to download episode metadata '
+                                  'for {} seasons {}')
+                             .format(video['title'], season_ids),
+                             level=xbmc.LOGERROR)
                 for season in video['seasons']:
-                    if not self._download_episode_metadata(
-                            season['id'], video['title']):
-                        self.log(msg=('Failed to download episode metadata '
-                                      'for {} season {}')
-                                 .format(video['title'], season['id']),
-                                 level=xbmc.LOGERROR)
                     for episode in season['episodes']:
                         episodes.append({
                             'season': season['seq'],
                             'episode': episode['seq'],
                             'id': episode['id']})
-                self.library.add_show(
+                exported = self.library.add_show(
                     netflix_id=video_id,
                     title=video['title'],
                     alt_title=alt_title,
                     episodes=episodes,
                     build_url=self.build_url,
-                    in_background=in_background)
+                    in_background=in_background) is not False
+                # without the metadata the next update exports it again
+                if exported and complete and fingerprint is not None:
+                    self.library.set_show_fingerprint(alt_title, fingerprint)
+                return exported
             return True
         self.kodi_helper.dialogs.show_no_metadata_notify()
         return False
 
-    def _download_episode_metadata(self, season_id, tvshowtitle):
+    def _download_episode_metadata(self, season_ids, tvshowtitle,
+                                   refresh=False):
+        # the episodes of all seasons are fetched with one request, if that
+        # fails the seasons are fetched one by one, so a single season
+        # doesn't cost the metadata of all the others
+        if not season_ids:
+            return True
         user_data = (
             self._check_response(
                 self.call_netflix_service(
                     {'method': 'get_user_data'})))
-        episode_list = (
-            self._check_response(
-                self.call_netflix_service({
-                    'method': 'fetch_episodes_by_season',
-                    'season_id': season_id,
-                    'guid': user_data['guid'],
-                    'cache': True})))
+        if not user_data:
+            return False
+        if self._download_season_metadata(
+                season_ids, tvshowtitle, user_data['guid'], refresh):
+            return True
+        if len(season_ids) == 1:
+            return False
+        downloaded = [
+            self._download_season_metadata(
+                [season_id], tvshowtitle, user_data['guid'], refresh)
+            for season_id in season_ids]
+        return all(downloaded)
+
+    def _download_season_metadata(self, season_ids, tvshowtitle, guid,
+                                  refresh):
+        params = {
+            'method': 'fetch_episodes_by_seasons',
+            'season_ids': ','.join(
+                str(season_id) for season_id in season_ids),
+            'guid': guid,
+            'cache': True}
+        if refresh:
+            params['refresh'] = 'true'
+        episode_list = self._check_response(self.call_netflix_service(params))
         if episode_list:
             for episode in episode_list.itervalues():
                 episode['tvshowtitle'] = tvshowtitle
@@ -752,26 +805,63 @@ class Navigation(object):
     def export_new_episodes(self, in_background):
         update_started_at = datetime.today().strftime('%Y-%m-%d %H:%M')
         self.nx_common.set_setting('update_running', update_started_at)
+        shows = []
         for title, meta in getattr(self.library.list_exported_shows(), itername)():
             try:
-                netflix_id = meta.get('netflix_id',
-                                      self._get_netflix_id(meta['alt_title']))
+                netflix_id = meta.get('netflix_id')
+                if netflix_id is None:
+                    netflix_id = self._get_netflix_id(meta['alt_title'])
             except KeyError:
                 self.log(
                     ('Cannot determine netflix id for {}. '
                      'Remove and re-add to library to fix this.')
                     .format(title.encode('utf-8')), xbmc.LOGERROR)
                 continue
-            self.log('Exporting new episodes of {} (id={})'
-                     .format(title.encode('utf-8'), netflix_id))
-            self.export_to_library(video_id=netflix_id, alt_title=title,
-                                   in_background=in_background)
+            shows.append((title, meta, netflix_id))
+        # only shows with new seasons or episodes are fetched & exported
+        fingerprints = self._check_response(self.call_netflix_service({
+            'method': 'fetch_show_fingerprints',
+            'show_ids': ','.join(str(netflix_id) for _, _, netflix_id in shows)
+        })) if shows else {}
+        changed = []
+        for title, meta, netflix_id in shows:
+            fingerprint = (fingerprints or {}).get(str(netflix_id))
+            if fingerprint is not None and \
+                    fingerprint == meta.get('fingerprint'):
+                self.log('No new episodes of {} (id={})'
+                         .format(title.encode('utf-8'), netflix_id))
+                continue
+            changed.append((title, netflix_id, fingerprint, in_background))
+        # several shows are fetched at once, the library serializes writes
+        updater = LibraryUpdater(
+            update_show=self._export_new_episodes_of_show,
+            concurrency=int(
+                self.nx_common.get_setting('library_update_threads') or 1),
+            on_progress=lambda done, total, update: self.log(
+                'Updated {} of {} shows ({})'.format(
+                    done, total, update.title.encode('utf-8'))),
+            # a background update leaves Kodi some room between the shows
+            wait_for_abort=(
+                xbmc.Monitor().waitForAbort if in_background else None))
+        updater.run(changed)
+        for line in updater.report():
+            self.log(line, xbmc.LOGNOTICE)
         xbmc.executebuiltin(
             'UpdateLibrary(video, {})'.format(self.library.tvshow_path))
         self.nx_common.set_setting('update_running', 'false')
         self.nx_common.set_setting('last_update', update_started_at[0:10])
         return True
 
+    def _export_new_episodes_of_show(self, title, netflix_id, fingerprint,
+                                     in_background):
+        self.log('Exporting new episodes of {} (id={})'
+                 .format(title.encode('utf-8'), netflix_id))
+        # the cached metadata predates the change the fingerprint shows
+        return self.export_to_library(
+            video_id=netflix_id, alt_title=title,
+            in_background=in_background, refresh=True,
+            fingerprint=fingerprint)
+
     def _get_netflix_id(self, showtitle):
         show_dir = self.nx_common.check_folder_path(
             path=os.path.join(self.library.tvshow_path, showtitle))
@@ -872,10 +962,13 @@ class Navigation(object):
             used later in the routing process
         """
         options = {}
+        # fetch the session state with a single service round trip
+        logged_in, user_data, profiles = self.call_netflix_service_batch([
+            {'method': 'is_logged_in'},
+            {'method': 'get_user_data'},
+            {'method': 'list_profiles'}])
         # check login & try to relogin if necessary
-        logged_in = self._check_response(self.call_netflix_service({
-            'method': 'is_logged_in'}))
-        if logged_in is False:
+        if self._check_response(logged_in) is False:
             credentials = self.nx_common.get_credentials()
             # check if we have user settings, if not, set em
             if credentials['email'] == '':
@@ -890,6 +983,10 @@ class Navigation(object):
             if self.establish_session(account=credentials) is not True:
                 self.nx_common.set_credentials('', '')
                 self.kodi_helper.dialogs.show_login_failed_notify()
+            # the session changed, refetch its state
+            user_data, profiles = self.call_netflix_service_batch([
+                {'method': 'get_user_data'},
+                {'method': 'list_profiles'}])
 
         # persist & load main menu selection
         if 'type' in params:
@@ -897,21 +994,25 @@ class Navigation(object):
             main_menu = self.kodi_helper.get_main_menu_selection()
             options['main_menu_selection'] = main_menu
         # check and switch the profile if needed
-        if self.check_for_designated_profile_change(params=params):
+        user_data = self._check_response(user_data)
+        profiles = self._check_response(profiles)
+        change_profile = self.check_for_designated_profile_change(
+            params=params,
+            user_data=user_data,
+            profiles=profiles)
+        if change_profile:
             self.kodi_helper.invalidate_memcache()
             profile_id = params.get('profile_id', None)
-            if profile_id is None:
-                user_data = self._check_response(self.call_netflix_service({
-                    'method': 'get_user_data'}))
-                if user_data:
-                    profile_id = user_data['guid']
+            if profile_id is None and user_data:
+                profile_id = user_data['guid']
             if profile_id:
                 self.call_netflix_service({
                     'method': 'switch_profile',
                     'profile_id': profile_id})
         return options
 
-    def check_for_designated_profile_change(self, params):
+    def check_for_designated_profile_change(self, params, user_data=None,
+                                            profiles=None):
         """Checks if the profile needs to be switched
 
         Parameters
@@ -919,16 +1020,24 @@ class Navigation(object):
         params : :obj:`dict` of :obj:`str`
             Url query params
 
+        user_data : :obj:`dict` of :obj:`str`
+            Already fetched user data (fetched if not given)
+
+        profiles : :obj:`dict` of :obj:`dict`
+            Already fetched profiles (fetched if not given)
+
         Returns
         -------
         bool
             Profile should be switched or not
         """
         # check if we need to switch the user
-        user_data = self._check_response(self.call_netflix_service({
-            'method': 'get_user_data'}))
-        profiles = self._check_response(self.call_netflix_service({
-            'method': 'list_profiles'}))
+        if user_data is None or profiles is None:
+            user_data, profiles = [
+                self._check_response(response)
+                for response in self.call_netflix_service_batch([
+                    {'method': 'get_user_data'},
+                    {'method': 'list_profiles'}])]
         if user_data and profiles:
             if 'guid' not in user_data:
                 return False
@@ -1054,14 +1163,7 @@ class Navigation(object):
                     msg='Fetched item from cache: (cache_id=' + values + ')')
                 return cached_value
 
-        url = self.get_netflix_service_url()
-        full_url = url + '?' + values
-        # don't use proxy for localhost
-        if urlparse(url).hostname in ('localhost', '127.0.0.1', '::1'):
-            opener = Request.build_opener(Request.ProxyHandler({}))
-            Request.install_opener(opener)
-        data = Request.urlopen(full_url).read()
-        parsed_json = json.loads(data, object_pairs_hook=OrderedDict)
+        parsed_json = self._request_netflix_service(values=values)
         if 'error' in parsed_json:
             result = {'error': parsed_json.get('error')}
             return result
@@ -1071,6 +1173,108 @@ class Navigation(object):
             self.kodi_helper.add_cached_item(cache_id=values, contents=result)
         return result
 
+    def call_netflix_service_batch(self, calls):
+        """
+        Executes several Netflix Service RPC calls with a single request
+        to the internal Netflix HTTP proxy
+
+        Parameters
+        ----------
+        calls : :obj:`list` of :obj:`dict` of :obj:`str`
+            Calls to execute, each one shaped like the params
+            of `call_netflix_service` (without caching)
+
+        Returns
+        -------
+        :obj:`list`
+            Netflix Service RPC results (in the order of the calls)
+        """
+        values = urlencode({
+            'method': 'batch',
+            'calls': json.dumps(calls)})
+        parsed_json = self._request_netflix_service(values=values)
+        results = parsed_json.get('result', None)
+        if 'error' in parsed_json or not isinstance(results, list):
+            error = parsed_json.get('error', results)
+            return [{'error': error} for _ in calls]
+        return results
+
+    def _request_netflix_service(self, values):
+        """
+        Makes a GET request to the internal Netflix HTTP proxy,
+        reusing a keep-alive connection if we already have one
+
+        Parameters
+        ----------
+        values : :obj:`str`
+            Url encoded query string
+
+        Returns
+        -------
+        :obj:`dict`
+            Decoded JSON response
+        """
+        path = '/?' + values
+        while True:
+            reused = getattr(
+                self._service_connections, 'connection', None) is not None
+            connection = self._get_service_connection()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+            except socket.timeout:
+                # the service got the request & is still at it
+                self._close_service_connection()
+                raise
+            except (BadStatusLine, socket.error):
+                # the service answers every request it reads (failed calls
+                # with an error), a reused connection closed without an
+                # answer has been closed while idle: the request never
+                # reached the service & is sent again on a fresh
+                # connection. Failures on a fresh connection are not
+                # retried, the call might have changed state (my list, ...)
+                self._close_service_connection()
+                if not reused:
+                    raise
+                continue
+            except HTTPException:
+                self._close_service_connection()
+                raise
+            try:
+                data = response.read()
+            except (HTTPException, socket.error):
+                self._close_service_connection()
+                raise
+            break
+        if response.status != 200:
+            return {'error': {
+                'code': response.status,
+                'message': response.reason}}
+        return json.loads(data, object_pairs_hook=OrderedDict)
+
+    def _get_service_connection(self):
+        """Returns the keep-alive connection to the Netflix service
+
+        Returns
+        -------
+        :obj:`HTTPConnection`
+            Connection owned by the calling thread
+        """
+        connection = getattr(self._service_connections, 'connection', None)
+        if connection is None:
+            url = urlparse(self.get_netflix_service_url())
+            connection = HTTPConnection(
+                url.hostname, url.port, timeout=SERVICE_TIMEOUT)
+            self._service_connections.connection = connection
+        return connection
+
+    def _close_service_connection(self):
+        """Closes the keep-alive connection of the calling thread"""
+        connection = getattr(self._service_connections, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._service_connections.connection = None
+
     def open_settings(self, url):
         """Opens a foreign settings dialog"""
         url = 'inputstream.adaptive' if url == 'is' else url
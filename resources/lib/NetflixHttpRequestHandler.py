@@ -6,8 +6,6 @@
 
 """Oppionionated internal proxy that dispatches requests to Netflix"""
 
-import json
-
 try:
     from http.server import BaseHTTPRequestHandler
 except ImportError:
@@ -23,19 +21,32 @@ try:
 except ImportError:
     from SocketServer import TCPServer
 
-from resources.lib.utils import get_class_methods
+from resources.lib.concurrency import ThreadPoolMixIn
+from resources.lib.videolist import iter_response_body
 from resources.lib.NetflixSession import NetflixSession
 from resources.lib.NetflixHttpSubRessourceHandler import \
-    NetflixHttpSubRessourceHandler
+    NetflixHttpSubRessourceHandler, ROUTES
 
 
-# get list of methods & instance form the sub ressource handler
-METHODS = get_class_methods(class_item=NetflixHttpSubRessourceHandler)
+# methods of the sub ressource handler that can be called
+METHODS = ROUTES
+# minimum bytes of the encoded body sent as one chunk
+CHUNK_SIZE = 16384
 
 
 class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
     """Oppionionated internal proxy that dispatches requests to Netflix"""
 
+    # keep-alive, the plugin reuses one connection for all of its calls
+    protocol_version = 'HTTP/1.1'
+    # seconds an idle keep-alive connection may block a worker thread,
+    # the plugin sends its calls back to back, so it rarely has to reconnect
+    timeout = 1
+    # buffer the response (flushed once per request) & send it right away
+    # instead of waiting for the ACK of the previous one
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
     # pylint: disable=invalid-name
     def do_GET(self):
         """
@@ -59,14 +70,53 @@ class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
             error_msg += str(METHODS)
             return self.send_error(404, error_msg)
 
-        # call method & get the result
-        result = getattr(self.server.res_handler, method)(params)
+        # call method & get the result, a failed call is always answered:
+        # the plugin resends calls that got no answer on a reused connection
+        try:
+            result = getattr(self.server.res_handler, method)(params)
+        except Exception:  # pylint: disable=broad-except
+            self.server.handle_error(self.request, self.client_address)
+            return self.send_error(500, 'Method "' + method + '" failed')
+        # the body is encoded while it's sent, it's never joined
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
         self.end_headers()
-        return self.wfile.write(json.dumps({
-            'method': method,
-            'result': result}).encode())
+        try:
+            self.write_chunked(
+                iter_response_body(method=method, result=result))
+        except Exception:
+            # the response can't be completed, the client sees it
+            # as an incomplete read
+            self.close_connection = True
+            raise
+
+    def write_chunked(self, pieces):
+        """
+        Writes a body with chunked transfer encoding, small pieces
+        are joined to chunks of at least `CHUNK_SIZE` bytes
+
+        Parameters
+        ----------
+        pieces : :obj:`iterable` of :obj:`bytes`
+            Body
+        """
+        chunk = []
+        size = 0
+        for piece in pieces:
+            chunk.append(piece)
+            size += len(piece)
+            if size >= CHUNK_SIZE:
+                self._write_chunk(b''.join(chunk))
+                chunk = []
+                size = 0
+        if size:
+            self._write_chunk(b''.join(chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, data):
+        self.wfile.write(
+            ('%x\r\n' % len(data)).encode('ascii') + data + b'\r\n')
 
     def log_message(self, *args):
         """Disable the BaseHTTPServer Log"""
@@ -76,13 +126,19 @@ class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
 ##################################
 
 
-class NetflixTCPServer(TCPServer):
-    """Override TCPServer to allow shared struct sharing"""
+class NetflixTCPServer(ThreadPoolMixIn, TCPServer):
+    """
+    Override TCPServer to allow shared struct sharing,
+    requests are handled by a bounded pool of worker threads
+    """
 
     def __init__(self, server_address, nx_common):
         """Initializes NetflixTCPServer"""
         nx_common.log(msg='Constructing netflixTCPServer')
 
+        self.pool_size = int(nx_common.get_setting('ns_worker_threads') or 1)
+        nx_common.log(msg='[NS] Worker threads: ' + str(self.pool_size))
+
         netflix_session = NetflixSession(
             cookie_path=nx_common.cookie_path,
             data_path=nx_common.data_path,
@@ -3,15 +3,88 @@
 # Module: NetflixHttpSubRessourceHandler
 # Created on: 07.03.2017
 
+import sys
+import json
+import threading
+from functools import wraps
+
+from resources.lib.cache import MetadataCache, ResponseCache
+from resources.lib.concurrency import ReadWriteLock, read_locked, write_locked
+
+# seconds the responses of the cached routes are served from memory
+CACHE_TTL = {
+    'fetch_video_list_ids': 600,
+    'fetch_video_list': 600,
+    'fetch_seasons_for_show': 3600,
+    'fetch_episodes_by_season': 3600,
+    'fetch_episodes_by_seasons': 3600,
+}
+# methods that can be called through the proxy (helpers never can)
+ROUTES = (
+    'is_logged_in',
+    'logout',
+    'login',
+    'list_profiles',
+    'get_esn',
+    'fetch_video_list_ids',
+    'fetch_video_list',
+    'fetch_episodes_by_season',
+    'fetch_episodes_by_seasons',
+    'fetch_show_fingerprints',
+    'fetch_seasons_for_show',
+    'rate_video',
+    'remove_from_list',
+    'add_to_list',
+    'fetch_metadata',
+    'send_adult_pin',
+    'switch_profile',
+    'get_user_data',
+    'search',
+    'batch',
+)
+
+
+def cached_response(func):
+    """
+    Decorator that serves a route from `self.response_cache`,
+    keyed by the active profile & the request params.
+    Empty & error responses are not cached, a `refresh` param bypasses
+    the lookup.
+    """
+    @wraps(func)
+    def wrapped(self, params):
+        """Wrapper function to maintain correct stack traces"""
+        key = (
+            func.__name__,
+            self.netflix_session.user_data.get('guid'),
+            tuple(sorted(
+                (name, tuple(value)) for name, value in params.items()
+                if name not in ('method', 'cache', 'refresh'))))
+        if 'refresh' not in params:
+            result = self.response_cache.get(key)
+            if result is not None:
+                return result
+        result = func(self, params)
+        if result and not (isinstance(result, dict) and 'error' in result):
+            self.response_cache.add(key, result, CACHE_TTL[func.__name__])
+        return result
+    return wrapped
+
 
 class NetflixHttpSubRessourceHandler(object):
     """
     Represents the callable internal server routes &
     translates/executes them to requests for Netflix
+
+    Routes are executed by several server threads at once, so every route
+    is guarded by `self.lock`: routes that only read the shared session
+    state (cookies, user data, profiles) hold it for reading and run in
+    parallel, routes that change it (login, logout, profile switch) hold it
+    exclusively.
     """
 
     def __init__(self, nx_common, netflix_session):
-        """Sets up credentials & video_list_cache cache
+        """Sets up credentials & the response cache
         Assigns the netflix_session/kodi_helper instacnes
         Does the initial login if we have user data
 
@@ -25,9 +98,18 @@ class NetflixHttpSubRessourceHandler(object):
         """
         self.nx_common = nx_common
         self.netflix_session = netflix_session
+        self.lock = ReadWriteLock()
+        self.login_check_lock = threading.Lock()
         self.credentials = self.nx_common.get_credentials()
         self.profiles = []
-        self.video_list_cache = {}
+        self.response_cache = ResponseCache()
+        # /metadata responses are kept on disk (per profile), they are
+        # needed again on every replay & library update
+        self.metadata_cache = MetadataCache(
+            path=nx_common.data_path + 'metadata',
+            fetch=self._fetch_metadata)
+        # called without args after a login or profile switch
+        self.session_listeners = []
         self.prefetch_login()
 
     def prefetch_login(self):
@@ -48,6 +130,10 @@ class NetflixHttpSubRessourceHandler(object):
                 if self.netflix_session.login(account=self.credentials):
                     self.profiles = self.netflix_session.profiles
 
+    # runs before every plugin route, so it shares the lock with the
+    # fetches, concurrent checks are serialized by their own lock (the
+    # cookie jar is reloaded from memory, the profiles only once)
+    @read_locked
     def is_logged_in(self, params):
         """Existing login proxy function
 
@@ -65,8 +151,11 @@ class NetflixHttpSubRessourceHandler(object):
         password = self.credentials.get('password', '')
         if email == '' and password == '':
             return False
-        return self.netflix_session.is_logged_in(account=self.credentials)
+        with self.login_check_lock:
+            return self.netflix_session.is_logged_in(
+                account=self.credentials)
 
+    @write_locked
     def logout(self, params):
         """Logout proxy function
 
@@ -82,9 +171,12 @@ class NetflixHttpSubRessourceHandler(object):
         """
         self.profiles = []
         self.credentials = {'email': '', 'password': ''}
+        self.response_cache.invalidate()
+        self.metadata_cache.clear()
 
         return self.netflix_session.logout()
 
+    @write_locked
     def login(self, params):
         """Logout proxy function
 
@@ -102,11 +194,15 @@ class NetflixHttpSubRessourceHandler(object):
         password = params.get('password', [''])[0]
         if email != '' and password != '':
             self.credentials = {'email': email, 'password': password}
+            self.response_cache.invalidate()
             _ret = self.netflix_session.login(account=self.credentials)
             self.profiles = self.netflix_session.profiles
+            if _ret:
+                self._notify_session_listeners()
             return _ret
         return None
 
+    @read_locked
     def list_profiles(self, params):
         """Returns the cached list of profiles
 
@@ -122,6 +218,7 @@ class NetflixHttpSubRessourceHandler(object):
         """
         return self.profiles
 
+    @read_locked
     def get_esn(self, params):
         """ESN getter function
 
@@ -137,6 +234,8 @@ class NetflixHttpSubRessourceHandler(object):
         """
         return self.netflix_session.esn
 
+    @read_locked
+    @cached_response
     def fetch_video_list_ids(self, params):
         """Video list ids proxy function (caches video lists)
 
@@ -150,11 +249,6 @@ class NetflixHttpSubRessourceHandler(object):
         :obj:`list`
             Transformed response of the remote call
         """
-        guid = self.netflix_session.user_data.get('guid')
-        cached_list = self.video_list_cache.get(guid, None)
-        if cached_list is not None:
-            self.nx_common.log(msg='Serving cached list for user: ' + guid)
-            return cached_list
         video_list_ids_raw = self.netflix_session.fetch_video_list_ids()
 
         if 'error' in video_list_ids_raw:
@@ -163,6 +257,8 @@ class NetflixHttpSubRessourceHandler(object):
             response_data=video_list_ids_raw)
         return video_list
 
+    @read_locked
+    @cached_response
     def fetch_video_list(self, params):
         """Video list proxy function
 
@@ -192,6 +288,8 @@ class NetflixHttpSubRessourceHandler(object):
             return video_list
         return []
 
+    @read_locked
+    @cached_response
     def fetch_episodes_by_season(self, params):
         """Episodes for season proxy function
 
@@ -213,6 +311,66 @@ class NetflixHttpSubRessourceHandler(object):
             response_data=raw_episode_list)
         return episodes
 
+    @read_locked
+    @cached_response
+    def fetch_episodes_by_seasons(self, params):
+        """Episodes of several seasons proxy function,
+        fetched with a single request
+
+        Parameters
+        ----------
+        params : :obj:`dict` of :obj:`str`
+            Request params, `season_ids` is a comma separated list
+
+        Returns
+        -------
+        :obj:`list`
+            Transformed response of the remote call
+        """
+        season_ids = [
+            season_id for season_id in
+            params.get('season_ids', [''])[0].split(',') if season_id]
+        if not season_ids:
+            return {}
+        raw_episode_list = self.netflix_session.fetch_episodes_by_seasons(
+            season_ids=season_ids)
+        if 'error' in raw_episode_list:
+            return raw_episode_list
+        if 'videos' not in raw_episode_list.get('value', {}):
+            return {}
+        episodes = self.netflix_session.parse_episodes_by_season(
+            response_data=raw_episode_list)
+        return episodes
+
+    @read_locked
+    def fetch_show_fingerprints(self, params):
+        """Show fingerprints proxy function, the season & episode counts
+        of several shows fetched with a single request
+
+        Parameters
+        ----------
+        params : :obj:`dict` of :obj:`str`
+            Request params, `show_ids` is a comma separated list
+
+        Returns
+        -------
+        :obj:`dict` of :obj:`list`
+            Fingerprint by show id
+        """
+        show_ids = [
+            show_id for show_id in
+            params.get('show_ids', [''])[0].split(',') if show_id]
+        if not show_ids:
+            return {}
+        raw_summaries = self.netflix_session.fetch_show_summaries(
+            ids=show_ids)
+        if 'error' in raw_summaries:
+            return raw_summaries
+        return self.netflix_session.parse_show_fingerprints(
+            response_data=raw_summaries)
+
+    @read_locked
+    @cached_response
     def fetch_seasons_for_show(self, params):
         """Season for show proxy function
 
@@ -241,7 +399,9 @@ class NetflixHttpSubRessourceHandler(object):
         return seasons
 
     def rate_video(self, params):
-        """Video rating proxy function
+        """Video rating proxy function, the cached metadata of the
+        video is fetched again afterwards (outside of the lock,
+        the metadata cache takes it on its own)
 
         Parameters
         ----------
@@ -254,12 +414,22 @@ class NetflixHttpSubRessourceHandler(object):
             Response of the remote call
         """
         video_id = params.get('video_id', [''])[0]
-        rating = params.get('rating', [''])[0]
+        rate = self._rate_video(
+            video_id=video_id,
+            rating=params.get('rating', [''])[0])
+        self.metadata_cache.refresh(
+            video_id, profile=self.netflix_session.user_data.get('guid'))
+        return rate
+
+    @read_locked
+    def _rate_video(self, video_id, rating):
         rate = self.netflix_session.rate_video(
             video_id=video_id,
             rating=rating)
+        self._invalidate_cached_responses('fetch_video_list')
         return rate
 
+    @read_locked
     def remove_from_list(self, params):
         """Remove from my list proxy function
 
@@ -274,8 +444,13 @@ class NetflixHttpSubRessourceHandler(object):
             Response of the remote call
         """
         video_id = params.get('video_id', [''])[0]
-        return self.netflix_session.remove_from_list(video_id=video_id)
+        result = self.netflix_session.remove_from_list(video_id=video_id)
+        # afterwards, a list fetched during the call would be stale
+        self._invalidate_cached_responses(
+            'fetch_video_list_ids', 'fetch_video_list')
+        return result
 
+    @read_locked
     def add_to_list(self, params):
         """Add to my list proxy function
 
@@ -290,10 +465,28 @@ class NetflixHttpSubRessourceHandler(object):
             Response of the remote call
         """
         video_id = params.get('video_id', [''])[0]
-        return self.netflix_session.add_to_list(video_id=video_id)
+        result = self.netflix_session.add_to_list(video_id=video_id)
+        # afterwards, a list fetched during the call would be stale
+        self._invalidate_cached_responses(
+            'fetch_video_list_ids', 'fetch_video_list')
+        return result
+
+    def _invalidate_cached_responses(self, *methods):
+        """Drops the cached responses of the given routes
+        for the active profile
+
+        Parameters
+        ----------
+        methods : :obj:`str`
+            Names of the cached routes
+        """
+        guid = self.netflix_session.user_data.get('guid')
+        self.response_cache.invalidate(
+            lambda key: key[0] in methods and key[1] == guid)
 
     def fetch_metadata(self, params):
-        """Metadata proxy function
+        """Metadata proxy function, served from the metadata cache
+        (the cache takes the lock when it has to fetch)
 
         Parameters
         ----------
@@ -306,8 +499,24 @@ class NetflixHttpSubRessourceHandler(object):
             Response of the remote call
         """
         video_id = params.get('video_id', [''])[0]
+        guid = self.netflix_session.user_data.get('guid')
+        if 'refresh' in params:
+            self.metadata_cache.remove(video_id, profile=guid)
+        return self.metadata_cache.get(video_id, profile=guid)
+
+    @read_locked
+    def _fetch_metadata(self, video_id, profile):
+        # a revalidation may run after a profile switch, never store the
+        # metadata of the active profile for another one
+        if profile != self.netflix_session.user_data.get('guid'):
+            return {
+                'error': True,
+                'message': 'Profile has been switched',
+                'code': '409'
+            }
         return self.netflix_session.fetch_metadata(id=video_id)
 
+    @read_locked
     def send_adult_pin(self, params):
         """Checks the adult pin
 
@@ -324,6 +533,7 @@ class NetflixHttpSubRessourceHandler(object):
         pin = params.get('pin', [''])[0]
         return self.netflix_session.send_adult_pin(pin=pin)
 
+    @write_locked
     def switch_profile(self, params):
         """Switch profile proxy function
 
@@ -341,8 +551,16 @@ class NetflixHttpSubRessourceHandler(object):
         switch_profile = self.netflix_session.switch_profile(
             profile_id=profile_id,
             account=self.credentials)
+        if switch_profile:
+            self._notify_session_listeners()
         return switch_profile
 
+    def _notify_session_listeners(self):
+        """Informs the session listeners about a login or profile switch"""
+        for listener in self.session_listeners:
+            listener()
+
+    @read_locked
     def get_user_data(self, params):
         """User data getter function
 
@@ -358,6 +576,7 @@ class NetflixHttpSubRessourceHandler(object):
         """
         return self.netflix_session.user_data
 
+    @read_locked
     def search(self, params):
         """Search proxy function
 
@@ -385,3 +604,61 @@ class NetflixHttpSubRessourceHandler(object):
             response_data=raw_search_results,
             term=term)
         return search_results
+
+    def batch(self, params):
+        """Executes a list of calls in order & returns all of their results
+
+        The calls are passed as a JSON encoded list in the `calls` param,
+        every call is a dict with a `method` key plus the params the method
+        would receive on its own. A failing call doesn't abort the batch,
+        its slot in the result list contains an error object instead.
+        Each call takes the handler lock on its own, so this route must
+        not hold it.
+
+        Parameters
+        ----------
+        params : :obj:`dict` of :obj:`str`
+            Request params
+
+        Returns
+        -------
+        :obj:`list`
+            Results of the calls (in the order they were given)
+        """
+        try:
+            calls = json.loads(params.get('calls', ['[]'])[0])
+        except ValueError:
+            calls = None
+        if not isinstance(calls, list):
+            return {
+                'error': True,
+                'message': 'Invalid batch calls',
+                'code': 500
+            }
+        results = []
+        for call in calls:
+            method = call.get('method') if isinstance(call, dict) else None
+            if method not in ROUTES or method == 'batch':
+                results.append({
+                    'error': True,
+                    'message': 'Method "' + str(method) + '" not found',
+                    'code': 404
+                })
+                continue
+            # mimic the parse_qs format the routes expect
+            call_params = {}
+            for key, value in call.items():
+                call_params[key] = value if isinstance(value, list) else [value]
+            try:
+                results.append(getattr(self, method)(call_params))
+            except Exception:
+                exc = sys.exc_info()
+                self.nx_common.log(
+                    msg='[NS] Batch call "' + method + '" failed: ' +
+                    str(exc[1]))
+                results.append({
+                    'error': True,
+                    'message': '{} {}'.format(exc[0], exc[1]),
+                    'code': 500
+                })
+        return results
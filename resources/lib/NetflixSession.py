@@ -17,18 +17,24 @@ try:
 except ImportError:
     from urllib import quote, unquote
 
-from re import compile as recompile, DOTALL
 from base64 import urlsafe_b64encode
 from requests import session, cookies
 from resources.lib.compat import itername
 from resources.lib.utils import noop, get_user_agent
-from collections import OrderedDict
+from resources.lib.pagedata import extract_page_data
+from resources.lib.videolist import VideoList, VideoListEntry
+from resources.lib.falcor import (
+    PathRequestCoalescer, as_reference, collapse_paths, encode_path_request)
 try:
     import cPickle as pickle
 except:
     import pickle
 
 FETCH_VIDEO_REQUEST_COUNT = 26
+# number of FETCH_VIDEO_REQUEST_COUNT sized pages shown on one listing page
+FETCH_VIDEO_PAGE_COUNT = 4
+# items of one listing page, fetched with a single request
+FETCH_VIDEO_PAGE_SIZE = (FETCH_VIDEO_REQUEST_COUNT + 1) * FETCH_VIDEO_PAGE_COUNT
 
 ART_FANART_SIZE = '1080'
 # Lower quality for episodes than 1080, because it provides more variance
@@ -144,18 +150,13 @@ class NetflixSession(object):
         self.nx_common = nx_common
         self.parsed_cookies = {}
         self.parsed_user_data = {}
+        self.path_coalescer = PathRequestCoalescer(
+            send=self._send_path_request)
         self._init_session()
 
     def extract_json(self, content, name):
         # Extract json from netflix content page
-        json_array = recompile(r"netflix\.%s\s*=\s*(.*?);\s*</script>" % name, DOTALL).findall(content)
-        if not json_array:
-            return {}  # Return an empty dict if json not found !
-        json_str = json_array[0]
-        json_str = json_str.replace('\"', '\\"')  # Hook for escape double-quotes
-        json_str = json_str.replace('\\s', '\\\\s')  # Hook for escape \s in json regex
-        json_str = json_str.encode().decode('unicode_escape')  # finally decoding...
-        return json.loads(json_str, encoding='utf-8', strict=False)
+        return extract_page_data(content, [name]).get(name, {})
 
     def extract_inline_netflix_page_data(self, content='', items=None):
         """Extract the essential data from the page contents
@@ -176,8 +177,8 @@ class NetflixSession(object):
         self.nx_common.log(msg='Parsing inline data...')
         items = self.page_items if items is None else items
         user_data = {'gpsModel': 'harris'}
-        content = content.decode('utf-8');
-        react_context = self.extract_json(content, 'reactContext')
+        page_data = extract_page_data(content, ['reactContext', 'falcorCache'])
+        react_context = page_data.get('reactContext', {})
         # iterate over all wanted item keys & try to fetch them
         for item in items:
             keys = item.split("/")
@@ -189,7 +190,8 @@ class NetflixSession(object):
             if val:
                 user_data.update({key: val})
         # fetch profiles & avatars
-        profiles = self.get_profiles(content=content)
+        profiles = self.get_profiles(
+            falkor_cache=page_data.get('falcorCache', {}))
         # get guid of active user
         for guid in profiles:
             if profiles[guid].get('isActive', False) is True:
@@ -205,10 +207,11 @@ class NetflixSession(object):
         self.nx_common.log(msg='Parsing inline data failed')
         return (user_data, profiles)
 
-    def get_profiles(self, content):
+    def get_profiles(self, content=None, falkor_cache=None):
         """ADD ME"""
         profiles = {}
-        falkor_cache = self.extract_json(content, 'falcorCache')
+        if falkor_cache is None:
+            falkor_cache = self.extract_json(content, 'falcorCache')
         _profiles = falkor_cache.get('profiles', {})
 
         for guid in _profiles:
@@ -619,10 +622,13 @@ class NetflixSession(object):
         response_data : :obj:`dict` of :obj:`str`
             Parsed response JSON from the `fetch_video_list` call
 
+        term : :obj:`str`
+            Search term, if the response is a search result
+
         Returns
         -------
-        :obj:`dict` of :obj:`dict`
-            Video list in the format:
+        :obj:`VideoList` of :obj:`VideoListEntry`
+            Video list, serialized in the format:
 
             {
                 "372203": {
@@ -720,6 +726,26 @@ class NetflixSession(object):
                 },
             }
         """
+        return VideoList(
+            (entry.id, entry)
+            for entry in self.iter_video_list(response_data, term=term))
+
+    def iter_video_list(self, response_data, term=None):
+        """Parse a list of videos entry by entry
+
+        Parameters
+        ----------
+        response_data : :obj:`dict` of :obj:`str`
+            Parsed response JSON from the `fetch_video_list` call
+
+        term : :obj:`str`
+            Search term, if the response is a search result
+
+        Returns
+        -------
+        generator of :obj:`VideoListEntry`
+            Video list entries (see `parse_video_list`) in list order
+        """
         video_ids = []
         raw_video_list = response_data.get('value', {})
         # search results have sorting given in references
@@ -730,26 +756,38 @@ class NetflixSession(object):
                for reference_id in range (0, 48):
                    video_ids.append(references.get(str(reference_id)).get('reference')[1])
            except:
-               return {}
+               return
         else:
             for video_id in raw_video_list.get('videos', {}):
                 if self._is_size_key(key=video_id) is False:
                     video_ids.append(video_id);
 
-        video_list = OrderedDict()
         netflix_list_id = self.parse_netflix_list_id(video_list=raw_video_list)
         for video_id in video_ids:
-            video_list_entry = self.parse_video_list_entry(
+            yield self.video_list_entry(
                 id=video_id,
                 list_id=netflix_list_id,
                 video=raw_video_list.get('videos', {}).get(video_id),
                 persons=raw_video_list.get('person'),
                 genres=raw_video_list.get('genres'))
-            video_list.update(video_list_entry)
-
-        return video_list
 
     def parse_video_list_entry(self, id, list_id, video, persons, genres):
+        """Parse a video list entry e.g. rip out the parts we need,
+        see `video_list_entry` for the parameters
+
+        Returns
+        -------
+        entry : :obj:`dict` of :obj:`VideoListEntry`
+            Video list entry by video id
+        """
+        return {id: self.video_list_entry(
+            id=id,
+            list_id=list_id,
+            video=video,
+            persons=persons,
+            genres=genres)}
+
+    def video_list_entry(self, id, list_id, video, persons, genres):
         """Parse a video list entry e.g. rip out the parts we need
 
         Parameters
@@ -771,8 +809,8 @@ class NetflixSession(object):
 
         Returns
         -------
-        entry : :obj:`dict` of :obj:`dict` of :obj:`str`
-            Video list entry in the format:
+        entry : :obj:`VideoListEntry`
+            Video list entry, serialized in the format:
 
            {
               "372203": {
@@ -854,47 +892,44 @@ class NetflixSession(object):
         artwork = next(iter(video.get('BGImages', {}).get(ART_FANART_SIZE, {}).get('jpg', [{}])), {}).get('url')
         logo = video.get('bb2OGLogo', {}).get(ART_LOGO_SIZE, {}).get('png', {}).get('url')
 
-        return {
-            id: {
-                'id': id,
-                'list_id': list_id,
-                'title': video.get('title'),
-                'synopsis': video.get('synopsis'),
-                'regular_synopsis': video.get('regularSynopsis'),
-                'type': video.get('summary', {}).get('type'),
-                'rating': rating,
-                'episode_count': season_info.get('episode_count'),
-                'seasons_label': season_info.get('seasons_label'),
-                'seasons_count': season_info.get('seasons_count'),
-                'in_my_list': video.get('queue', {}).get('inQueue'),
-                'year': video.get('releaseYear'),
-                'runtime': self.parse_runtime_for_video(video=video),
-                'watched': video.get('watched', None),
-                'tags': self.parse_tags_for_video(video=video),
-                'genres': self.parse_genres_for_video(
-                    video=video,
-                    genres=genres),
-                'quality': self.parse_quality_for_video(video=video),
-                'cast': self.parse_cast_for_video(
-                    video=video,
-                    persons=persons),
-                'directors': self.parse_directors_for_video(
-                    video=video,
-                    persons=persons),
-                'creators': self.parse_creators_for_video(
-                    video=video,
-                    persons=persons),
-                'maturity': maturity,
-                'boxarts': {
-                    'small': bx_small,
-                    'big': bx_big,
-                    'poster': bx_poster
-                },
-                'interesting_moment': moment,
-                'artwork': artwork,
-                'clearlogo': logo
-            }
-        }
+        return VideoListEntry(
+            id=id,
+            list_id=list_id,
+            title=video.get('title'),
+            synopsis=video.get('synopsis'),
+            regular_synopsis=video.get('regularSynopsis'),
+            type=video.get('summary', {}).get('type'),
+            rating=rating,
+            episode_count=season_info.get('episode_count'),
+            seasons_label=season_info.get('seasons_label'),
+            seasons_count=season_info.get('seasons_count'),
+            in_my_list=video.get('queue', {}).get('inQueue'),
+            year=video.get('releaseYear'),
+            runtime=self.parse_runtime_for_video(video=video),
+            watched=video.get('watched', None),
+            tags=self.parse_tags_for_video(video=video),
+            genres=self.parse_genres_for_video(
+                video=video,
+                genres=genres),
+            quality=self.parse_quality_for_video(video=video),
+            cast=self.parse_cast_for_video(
+                video=video,
+                persons=persons),
+            directors=self.parse_directors_for_video(
+                video=video,
+                persons=persons),
+            creators=self.parse_creators_for_video(
+                video=video,
+                persons=persons),
+            maturity=maturity,
+            boxarts={
+                'small': bx_small,
+                'big': bx_big,
+                'poster': bx_poster
+            },
+            interesting_moment=moment,
+            artwork=artwork,
+            clearlogo=logo)
 
     def parse_creators_for_video(self, video, persons):
         """Matches ids with person names to generate a list of creators
@@ -1173,6 +1208,51 @@ class NetflixSession(object):
                 seasons.update(season_entry)
         return seasons
 
+    def parse_show_fingerprints(self, response_data):
+        """Parse the fingerprints of shows, they change whenever
+        seasons or episodes are added to a show
+
+        Parameters
+        ----------
+        response_data : :obj:`dict` of :obj:`str`
+            Parsed response JSON from the `fetch_show_summaries` call
+
+        Returns
+        -------
+        :obj:`dict` of :obj:`list`
+            Fingerprint by show id in the format:
+
+            {
+                "80057281": [3, 24, [[80113084, 8], [80113085, 8], ...]]
+            }
+
+            (season count, episode count & the season ids with their
+            episode counts, in season order)
+        """
+        value = response_data.get('value', {})
+        seasons = value.get('seasons', {})
+        fingerprints = {}
+        for show_id, show in getattr(value.get('videos', {}), itername)():
+            if self._is_size_key(key=show_id) or not isinstance(show, dict):
+                continue
+            # shows the summary couldn't be fetched for have no fingerprint
+            if show.get('seasonCount') is None:
+                continue
+            season_list = show.get('seasonList', {})
+            season_counts = []
+            for idx in sorted((idx for idx in season_list if idx.isdigit()),
+                              key=int):
+                reference = as_reference(season_list[idx])
+                if reference is None:
+                    continue
+                summary = seasons.get(reference[1], {}).get('summary', {})
+                season_counts.append(
+                    [summary.get('id', reference[1]), summary.get('length')])
+            fingerprints[show_id] = [
+                show.get('seasonCount'), show.get('episodeCount'),
+                season_counts]
+        return fingerprints
+
     def _parse_season_entry(self, season, video, sorting):
         """Parse a season list entry e.g. rip out the parts we need
 
@@ -1625,30 +1705,86 @@ class NetflixSession(object):
         :obj:`dict` of :obj:`dict` of :obj:`str`
             Raw Netflix API call response or api call error
         """
+        return self.fetch_episodes_by_seasons(
+            season_ids=[season_id],
+            list_from=list_from,
+            list_to=list_to)
+
+    def fetch_episodes_by_seasons(self, season_ids, list_from=-1, list_to=40):
+        """Fetches the JSON which contains the episodes of several seasons
+        with a single request
+
+        Parameters
+        ----------
+        season_ids : :obj:`list` of :obj:`str`
+            Unique season ids to query Netflix for
+
+        list_from : :obj:`int`
+            Start entry for pagination (of every season)
+
+        list_to : :obj:`int`
+            Last entry for pagination (of every season)
+
+        Returns
+        -------
+        :obj:`dict` of :obj:`dict` of :obj:`str`
+            Raw Netflix API call response or api call error
+        """
+        season_ids = list(season_ids)
         paths = [
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, ['summary', 'synopsis', 'title', 'runtime', 'releaseYear', 'queue', 'info', 'maturity', 'userRating', 'bookmarkPosition', 'creditOffset', 'watched', 'delivery']],
-            # ['videos', season_id, 'cast', {'from': 0, 'to': 15}, ['id', 'name']],
-            # ['videos', season_id, 'cast', 'summary'],
-            # ['videos', season_id, 'genres', {'from': 0, 'to': 5}, ['id', 'name']],
-            # ['videos', season_id, 'genres', 'summary'],
-            # ['videos', season_id, 'tags', {'from': 0, 'to': 9}, ['id', 'name']],
-            # ['videos', season_id, 'tags', 'summary'],
-            # ['videos', season_id, ['creators', 'directors'], {'from': 0, 'to': 49}, ['id', 'name']],
-            # ['videos', season_id, ['creators', 'directors'], 'summary'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'genres', {'from': 0, 'to': 1}, ['id', 'name']],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'genres', 'summary'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'interestingMoment', ART_MOMENT_SIZE_LARGE, 'jpg'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'interestingMoment', ART_MOMENT_SIZE_SMALL, 'jpg'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'boxarts', ART_BOX_SIZE_SMALL, 'jpg'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'boxarts', ART_BOX_SIZE_LARGE, 'jpg'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'boxarts', ART_BOX_SIZE_POSTER, 'jpg'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'bb2OGLogo', ART_LOGO_SIZE, 'png'],
-            ['seasons', season_id, 'episodes', {'from': list_from, 'to': list_to}, 'BGImages', ART_FANART_SIZE_EPISODE, 'jpg']
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, ['summary', 'synopsis', 'title', 'runtime', 'releaseYear', 'queue', 'info', 'maturity', 'userRating', 'bookmarkPosition', 'creditOffset', 'watched', 'delivery']],
+            # ['videos', season_ids, 'cast', {'from': 0, 'to': 15}, ['id', 'name']],
+            # ['videos', season_ids, 'cast', 'summary'],
+            # ['videos', season_ids, 'genres', {'from': 0, 'to': 5}, ['id', 'name']],
+            # ['videos', season_ids, 'genres', 'summary'],
+            # ['videos', season_ids, 'tags', {'from': 0, 'to': 9}, ['id', 'name']],
+            # ['videos', season_ids, 'tags', 'summary'],
+            # ['videos', season_ids, ['creators', 'directors'], {'from': 0, 'to': 49}, ['id', 'name']],
+            # ['videos', season_ids, ['creators', 'directors'], 'summary'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'genres', {'from': 0, 'to': 1}, ['id', 'name']],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'genres', 'summary'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'interestingMoment', ART_MOMENT_SIZE_LARGE, 'jpg'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'interestingMoment', ART_MOMENT_SIZE_SMALL, 'jpg'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'boxarts', ART_BOX_SIZE_SMALL, 'jpg'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'boxarts', ART_BOX_SIZE_LARGE, 'jpg'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'boxarts', ART_BOX_SIZE_POSTER, 'jpg'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'bb2OGLogo', ART_LOGO_SIZE, 'png'],
+            ['seasons', season_ids, 'episodes', {'from': list_from, 'to': list_to}, 'BGImages', ART_FANART_SIZE_EPISODE, 'jpg']
         ]
         response = self._path_request(paths=paths)
         return self._process_response(
             response=response,
-            component='fetch_episodes_by_season')
+            component='fetch_episodes_by_seasons')
+
+    def fetch_show_summaries(self, ids, list_from=0, list_to=30):
+        """Fetches the season & episode counts of several shows
+        with a single request, without any further metadata
+
+        Parameters
+        ----------
+        ids : :obj:`list` of :obj:`str`
+            Unique show ids to query Netflix for
+
+        list_from : :obj:`int`
+            Start entry for the season pagination (of every show)
+
+        list_to : :obj:`int`
+            Last entry for the season pagination (of every show)
+
+        Returns
+        -------
+        :obj:`dict` of :obj:`dict` of :obj:`str`
+            Raw Netflix API call response or api call error
+        """
+        ids = list(ids)
+        paths = [
+            ['videos', ids, ['episodeCount', 'seasonCount']],
+            ['videos', ids, 'seasonList', {'from': list_from, 'to': list_to}, 'summary']
+        ]
+        response = self._path_request(paths=paths)
+        return self._process_response(
+            response=response,
+            component='fetch_show_summaries')
 
     def refresh_session_data(self, account):
         """Reload the session data (profiles, user_data, api_data)
@@ -1671,6 +1807,24 @@ class NetflixSession(object):
         return False
 
     def _path_request(self, paths):
+        """
+        Executes a post request against the shakti
+        endpoint with falkor style payload, requests issued concurrently
+        are merged into one (identical ones share the response)
+
+        Parameters
+        ----------
+        paths : :obj:`list` of :obj:`list`
+            Payload with path querys for the Netflix Shakti API in falkor style
+
+        Returns
+        -------
+        :obj:`requests.response`
+            Response from a POST call made with Requests
+        """
+        return self.path_coalescer.request(paths=paths)
+
+    def _send_path_request(self, paths):
         """
         Executes a post request against the shakti
         endpoint with falkor style payload
@@ -1690,11 +1844,9 @@ class NetflixSession(object):
             'Accept': 'application/json, text/javascript, */*',
         }
 
-        data = ""
-        for path in paths:
-            data = data + 'path=' + json.dumps(path) + '&'
-
-        data = data + 'authURL=' + self.user_data['authURL']
+        data = encode_path_request(
+            paths=collapse_paths(paths),
+            auth_url=self.user_data['authURL'])
 
         params = {
             'model': self.user_data['gpsModel']
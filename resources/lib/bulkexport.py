@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Module: bulkexport
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Writes the files of a library export on a small pool of threads"""
+
+import threading
+from time import time
+
+from resources.lib.concurrency import ThreadPool
+
+# threads writing the files of an export, most of the time is spent
+# waiting on the file system (which may be a network share)
+WRITER_THREADS = 4
+# minimum seconds between two progress updates
+PROGRESS_INTERVAL = 0.25
+
+
+class BulkWriter(object):
+    """
+    Runs the writes of an export on a pool of worker threads & reports
+    the progress in between, at most every `progress_interval` seconds
+    """
+
+    def __init__(self, write, size=WRITER_THREADS,
+                 progress_interval=PROGRESS_INTERVAL):
+        """
+        Parameters
+        ----------
+        write : :obj:`fn`
+            Writes a single file, called with the arguments of the file
+
+        size : :obj:`int`
+            Maximum number of files written at the same time
+
+        progress_interval : :obj:`float`
+            Minimum seconds between two progress updates
+        """
+        self.write = write
+        self.size = max(1, int(size))
+        self.progress_interval = progress_interval
+        self.errors = []
+        self.duration = 0
+        self._done = 0
+        self._total = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def run(self, files, on_progress=None):
+        """
+        Writes the files & waits until all of them are written
+
+        Parameters
+        ----------
+        files : :obj:`list` of :obj:`tuple`
+            Arguments of `write` for every file
+
+        on_progress : :obj:`fn`
+            Optional, called with the number of written & total files,
+            from the calling thread
+
+        Returns
+        -------
+        int
+            Number of files written without errors
+        """
+        files = list(files)
+        started = time()
+        self.errors = []
+        self._done = 0
+        self._total = len(files)
+        if files:
+            pool = ThreadPool(
+                size=min(self.size, len(files)), name='BulkWriter')
+            for args in files:
+                pool.submit(self._write, args)
+            self._wait(len(files), on_progress)
+            pool.stop()
+        self.duration = time() - started
+        return len(files) - len(self.errors)
+
+    def _wait(self, total, on_progress):
+        while True:
+            with self._cond:
+                if self._done < total:
+                    self._cond.wait(self.progress_interval)
+                done = self._done
+            if on_progress is not None:
+                on_progress(done, total)
+            if done >= total:
+                return
+
+    def _write(self, args):
+        # pylint: disable=broad-except
+        try:
+            self.write(*args)
+        except Exception as error:
+            with self._cond:
+                self.errors.append((args, error))
+        with self._cond:
+            self._done += 1
+            # progress is reported on the interval, only the last
+            # write wakes up the waiting thread
+            if self._done == self._total:
+                self._cond.notify()
@@ -0,0 +1,761 @@
+# -*- coding: utf-8 -*-
+# Module: cache
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Bounded LRU caches with per entry expiry"""
+
+import os
+import json
+import hashlib
+import threading
+from time import time
+from collections import OrderedDict
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+INDEX_PROPERTY = 'memcache.index'
+ENTRY_PROPERTY = 'memcache.entry.'
+
+# seconds a manifest is kept if neither it nor its urls tell its lifetime
+MANIFEST_TTL = 3600
+# seconds a cached manifest has to stay valid beyond the end of playback
+MANIFEST_EXPIRY_MARGIN = 600
+
+
+class WindowCache(object):
+    """
+    LRU cache that keeps every entry in its own Kodi window property.
+
+    A small JSON index (property `memcache.index`) tracks the entries in
+    least recently used order together with their size, expiry & the slot
+    (property) that holds them, so a lookup only has to deserialize the
+    entry it asks for. Entries are evicted once they expire, when the byte
+    budget would be exceeded or when all slots are taken.
+
+    Several addon processes share the window without a lock, so an index
+    update may get lost. Every entry therefore names its key in its slot
+    & an added entry takes the lowest free slot: a slot left behind by a
+    lost update is taken by the next entry added, so the number of
+    properties stays bounded by the number of slots.
+    """
+
+    def __init__(self, window, max_bytes, ttl, slots=256):
+        """
+        Parameters
+        ----------
+        window : :obj:`xbmcgui.Window`
+            Window that holds the cache properties
+
+        max_bytes : :obj:`int`
+            Maximum size of all serialized entries together
+
+        ttl : :obj:`int`
+            Default lifetime of an entry in seconds
+
+        slots : :obj:`int`
+            Maximum number of entries
+        """
+        self.window = window
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.slots = slots
+
+    def get(self, key):
+        """Returns the contents of an entry or None if there is no such
+        (or no longer valid) entry
+
+        Parameters
+        ----------
+        key : :obj:`str`
+            ID of the cache entry
+
+        Returns
+        -------
+        mixed
+            Contents of the cache entry or None
+        """
+        name = self._hash(key)
+        index = self._load_index()
+        entry = index.get(name)
+        if entry is None:
+            return None
+        if entry[2] < time():
+            self._remove(index, name)
+            self._save_index(index)
+            return None
+        value = self.window.getProperty(self._property(entry[3]))
+        try:
+            if not value.startswith(name + ':'):
+                # the slot has been taken by an entry of another process
+                raise ValueError(name)
+            contents = pickle.loads(
+                value[len(name) + 1:].encode('latin-1'))
+        except (EOFError, ValueError, UnicodeError, pickle.UnpicklingError):
+            index.pop(name, None)
+            self._save_index(index)
+            return None
+        # the order is only updated for entries in the less recently used
+        # half, most hits don't have to write the index
+        tick = self._next_tick(index)
+        if entry[0] <= tick - 1 - len(index) // 2:
+            entry[0] = tick
+            self._save_index(index)
+        return contents
+
+    def add(self, key, contents, ttl=None):
+        """Adds (or replaces) an entry, evicts the least recently used
+        entries if the byte budget would be exceeded or all slots are taken
+
+        Parameters
+        ----------
+        key : :obj:`str`
+            ID of the cache entry
+
+        contents : mixed
+            Picklable cache entry contents
+
+        ttl : :obj:`int`
+            Lifetime of the entry in seconds (defaults to the cache ttl)
+        """
+        name = self._hash(key)
+        value = pickle.dumps(contents, protocol=0).decode('latin-1')
+        size = len(value)
+        index = self._load_index()
+        if size > self.max_bytes:
+            self._remove(index, name)
+            self._save_index(index)
+            return
+        # an entry that is replaced keeps its slot
+        previous = index.pop(name, None)
+        self._evict(index, size)
+        slot = previous[3] if previous is not None else self._free_slot(index)
+        self.window.setProperty(self._property(slot), name + ':' + value)
+        index[name] = [
+            self._next_tick(index),
+            size,
+            time() + (self.ttl if ttl is None else ttl),
+            slot]
+        self._save_index(index)
+
+    def clear(self):
+        """Removes all entries"""
+        for slot in range(self.slots):
+            self.window.clearProperty(self._property(slot))
+        self.window.clearProperty(INDEX_PROPERTY)
+
+    def _evict(self, index, size):
+        now = time()
+        for name in [name for name, entry in index.items() if entry[2] < now]:
+            self._remove(index, name)
+        used = sum(entry[1] for entry in index.values())
+        for name in sorted(index.keys(), key=lambda name: index[name][0]):
+            if used + size <= self.max_bytes and len(index) < self.slots:
+                break
+            used -= index[name][1]
+            self._remove(index, name)
+
+    def _free_slot(self, index):
+        taken = set(entry[3] for entry in index.values())
+        for slot in range(self.slots):
+            if slot not in taken:
+                return slot
+
+    def _remove(self, index, name):
+        entry = index.pop(name, None)
+        if entry is not None:
+            self.window.clearProperty(self._property(entry[3]))
+
+    @staticmethod
+    def _property(slot):
+        return ENTRY_PROPERTY + str(slot)
+
+    def _load_index(self):
+        # maps entry hash -> [lru tick, size, expires, slot]
+        try:
+            index = json.loads(self.window.getProperty(INDEX_PROPERTY))
+        except ValueError:
+            return {}
+        if not isinstance(index, dict):
+            return {}
+        # skip malformed entries
+        return dict(
+            (name, entry) for name, entry in index.items()
+            if isinstance(entry, list) and len(entry) == 4)
+
+    def _save_index(self, index):
+        self.window.setProperty(
+            INDEX_PROPERTY, json.dumps(index, separators=(',', ':')))
+
+    @staticmethod
+    def _next_tick(index):
+        return max([entry[0] for entry in index.values()] or [0]) + 1
+
+    @staticmethod
+    def _hash(key):
+        if not isinstance(key, bytes):
+            key = key.encode('utf-8')
+        return hashlib.md5(key).hexdigest()
+
+
+class ResponseCache(object):
+    """
+    Thread safe in-process LRU cache with per entry expiry,
+    used by the service to share responses between all plugin invocations
+    """
+
+    def __init__(self, max_entries=512):
+        """
+        Parameters
+        ----------
+        max_entries : :obj:`int`
+            Number of entries kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value of an entry or None if there is no such
+        (or no longer valid) entry
+
+        Parameters
+        ----------
+        key : :obj:`tuple`
+            Hashable ID of the cache entry
+
+        Returns
+        -------
+        mixed
+            Cached value or None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[1] < time():
+                return None
+            # re-insert to mark as most recently used
+            self._entries[key] = entry
+            return entry[0]
+
+    def add(self, key, value, ttl):
+        """Adds (or replaces) an entry
+
+        Parameters
+        ----------
+        key : :obj:`tuple`
+            Hashable ID of the cache entry
+
+        value : mixed
+            Value to cache
+
+        ttl : :obj:`int`
+            Lifetime of the entry in seconds
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time() + ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate=None):
+        """Removes all entries whose key matches the predicate
+
+        Parameters
+        ----------
+        predicate : :obj:`fn`
+            Called with the key of every entry, all entries
+            are removed if not given
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+
+class MetadataCache(object):
+    """
+    Size bounded on-disk cache of /metadata responses.
+
+    Every show or movie is stored in its own JSON file, a small JSON index
+    (`index.json`) maps the ids it is looked up by (the requested id, the
+    show id & the ids of all of its episodes) to the file & tracks the size,
+    last use & fetch time of the entries.
+    The responses contain per profile state (bookmarks, watched state,
+    ratings), so entries are kept per profile.
+
+    Entries are fresh for `ttl` seconds. Stale entries are still served
+    for another `max_stale` seconds while they are fetched again in the
+    background, older ones are fetched before they are served.
+    """
+
+    def __init__(self, path, fetch, max_bytes=20 * 1024 * 1024,
+                 ttl=86400, max_stale=3600):
+        """
+        Parameters
+        ----------
+        path : :obj:`str`
+            Directory of the cache files
+
+        fetch : :obj:`fn`
+            Called with a video id & a profile, returns the metadata
+            or an error dict
+
+        max_bytes : :obj:`int`
+            Maximum size of all cache files together
+
+        ttl : :obj:`int`
+            Seconds an entry is served without revalidation
+
+        max_stale : :obj:`int`
+            Seconds a stale entry is still served while it's revalidated
+        """
+        self.path = path
+        self.fetch = fetch
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._index = None
+        self._revalidating = set()
+        self._lock = threading.Lock()
+
+    def get(self, video_id, profile=None):
+        """Returns the metadata of a show, movie or episode,
+        fetches it if it is not cached
+
+        Parameters
+        ----------
+        video_id : :obj:`str`
+            Show, movie or episode id
+
+        profile : :obj:`str`
+            Guid of the profile the metadata is requested for
+
+        Returns
+        -------
+        :obj:`dict`
+            Metadata or the error dict returned by `fetch`
+        """
+        video_id = str(video_id)
+        with self._lock:
+            entry = self._read(self._key(video_id, profile))
+        if entry is None:
+            return self._fetch(video_id, profile)
+        metadata, fetched = entry
+        if time() - fetched > self.ttl:
+            self._revalidate(video_id, profile)
+        return metadata
+
+    def refresh(self, video_id, profile=None):
+        """Fetches the metadata of a video again & replaces its entry,
+        the entry is dropped if that fails
+
+        Parameters
+        ----------
+        video_id : :obj:`str`
+            Show, movie or episode id
+
+        profile : :obj:`str`
+            Guid of the profile the metadata is requested for
+
+        Returns
+        -------
+        :obj:`dict`
+            Metadata or the error dict returned by `fetch`
+        """
+        metadata = self._fetch(str(video_id), profile)
+        if not isinstance(metadata, dict) or 'error' in metadata:
+            self.remove(video_id, profile)
+        return metadata
+
+    def add(self, video_id, metadata, profile=None):
+        """Stores the metadata of a video & evicts the least recently
+        used entries if the size limit would be exceeded
+
+        Parameters
+        ----------
+        video_id : :obj:`str`
+            Id the metadata was fetched for
+
+        metadata : :obj:`dict`
+            Response of the /metadata API
+
+        profile : :obj:`str`
+            Guid of the profile the metadata was fetched for
+        """
+        video = metadata.get('video', {})
+        key = self._key(video.get('id', video_id), profile)
+        data = json.dumps(metadata, separators=(',', ':'))
+        with self._lock:
+            index = self._load_index()
+            self._remove(index, key)
+            if len(data) > self.max_bytes:
+                self._save_index(index)
+                return
+            self._evict(index, len(data))
+            self._write(self._filename(key), data)
+            now = time()
+            index['entries'][key] = [len(data), now, now]
+            aliases = index['aliases']
+            aliases[self._key(video_id, profile)] = key
+            aliases[key] = key
+            for season in video.get('seasons', []):
+                for episode in season.get('episodes', []):
+                    aliases[self._key(episode.get('id'), profile)] = key
+            self._save_index(index)
+
+    def remove(self, video_id, profile=None):
+        """Removes the entry a video id belongs to
+
+        Parameters
+        ----------
+        video_id : :obj:`str`
+            Show, movie or episode id
+
+        profile : :obj:`str`
+            Guid of the profile the entry belongs to
+        """
+        with self._lock:
+            index = self._load_index()
+            self._remove(
+                index, index['aliases'].get(self._key(video_id, profile)))
+            self._save_index(index)
+
+    def clear(self):
+        """Removes all entries"""
+        with self._lock:
+            index = self._load_index()
+            for key in list(index['entries'].keys()):
+                self._remove(index, key)
+            self._save_index(index)
+
+    @staticmethod
+    def _key(video_id, profile):
+        if not profile:
+            return str(video_id)
+        return '{}_{}'.format(profile, video_id)
+
+    def _fetch(self, video_id, profile):
+        metadata = self.fetch(video_id, profile)
+        if isinstance(metadata, dict) and 'error' not in metadata:
+            self.add(video_id, metadata, profile)
+        return metadata
+
+    def _revalidate(self, video_id, profile):
+        key = self._key(video_id, profile)
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        thread = threading.Thread(
+            target=self._run_revalidation, args=(video_id, profile),
+            name='MetadataRevalidation')
+        thread.daemon = True
+        thread.start()
+
+    def _run_revalidation(self, video_id, profile):
+        # pylint: disable=broad-except
+        try:
+            self._fetch(video_id, profile)
+        except Exception:
+            # the stale entry stays until the next attempt
+            pass
+        finally:
+            with self._lock:
+                self._revalidating.discard(self._key(video_id, profile))
+
+    def _read(self, alias):
+        index = self._load_index()
+        key = index['aliases'].get(alias)
+        entry = index['entries'].get(key)
+        if entry is None:
+            return None
+        if time() - entry[2] > self.ttl + self.max_stale:
+            self._remove(index, key)
+            self._save_index(index)
+            return None
+        try:
+            with open(self._filename(key), 'r') as cache_file:
+                metadata = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            self._remove(index, key)
+            self._save_index(index)
+            return None
+        # the new use is persisted with the next change of the index
+        entry[1] = time()
+        return metadata, entry[2]
+
+    def _evict(self, index, size):
+        entries = index['entries']
+        used = sum(entry[0] for entry in entries.values())
+        for key in sorted(entries.keys(), key=lambda key: entries[key][1]):
+            if used + size <= self.max_bytes:
+                break
+            used -= entries[key][0]
+            self._remove(index, key)
+
+    def _remove(self, index, key):
+        if index['entries'].pop(key, None) is None:
+            return
+        aliases = index['aliases']
+        for alias in [alias for alias in aliases if aliases[alias] == key]:
+            del aliases[alias]
+        try:
+            os.remove(self._filename(key))
+        except OSError:
+            pass
+
+    def _filename(self, key):
+        return os.path.join(self.path, key + '.json')
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = {'entries': {}, 'aliases': {}}
+            try:
+                with open(self._filename('index'), 'r') as index_file:
+                    index = json.load(index_file)
+                if isinstance(index, dict):
+                    self._index['entries'] = index.get('entries', {})
+                    self._index['aliases'] = index.get('aliases', {})
+            except (IOError, OSError, ValueError):
+                pass
+        return self._index
+
+    def _save_index(self, index):
+        self._write(
+            self._filename('index'),
+            json.dumps(index, separators=(',', ':')))
+
+    def _write(self, filename, data):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        # write & rename, readers never see a partially written file
+        temp_filename = filename + '.tmp'
+        with open(temp_filename, 'w') as cache_file:
+            cache_file.write(data)
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp_filename, filename)
+
+
+def manifest_expiry(manifest):
+    """
+    Returns the time until which a manifest can be used to start playback:
+    its urls must stay valid until the whole title has been played
+
+    Parameters
+    ----------
+    manifest : :obj:`dict`
+        Manifest as returned by the MSL API
+
+    Returns
+    -------
+    float
+        Timestamp the manifest expires at
+    """
+    expirations = []
+    if manifest.get('expiration'):
+        expiration = float(manifest['expiration'])
+        # milliseconds since the epoch
+        expirations.append(
+            expiration / 1000 if expiration > 10 ** 11 else expiration)
+    tracks = (manifest.get('video_tracks', []) +
+              manifest.get('audio_tracks', []))
+    for track in tracks:
+        for stream in track.get('streams', []):
+            for url in stream.get('urls', []):
+                # CDN urls carry their expiry in the `e` query param
+                expiry = parse_qs(urlparse(url.get('url', '')).query).get('e')
+                if expiry and expiry[0].isdigit():
+                    expirations.append(float(expiry[0]))
+    if not expirations:
+        return time() + MANIFEST_TTL
+    playback = manifest.get('duration', 0) / 1000.0 + MANIFEST_EXPIRY_MARGIN
+    return min(expirations) - playback
+
+
+class ManifestCache(object):
+    """
+    Thread safe cache of the manifests loaded by the MSL service.
+
+    A manifest is requested for a title with a set of capabilities
+    (codecs, HDR, ...) & an ESN, all of them are part of the key.
+    Entries expire with the manifest itself (see `manifest_expiry`) and
+    are optionally kept on disk, so they survive a restart of the service.
+    The files follow the entries in memory: they are removed once an entry
+    expires or is evicted, expired files are removed on startup.
+    """
+
+    def __init__(self, path=None, max_entries=16):
+        """
+        Parameters
+        ----------
+        path : :obj:`str`
+            Optional directory the manifests are persisted in
+
+        max_entries : :obj:`int`
+            Number of manifests kept (in memory & on disk)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(viewable_id, esn, dolby, hevc, hdr, dolbyvision, vp9):
+        """
+        Returns the key of a manifest
+
+        Parameters
+        ----------
+        viewable_id : :obj:`int`
+            ID of the title
+
+        esn : :obj:`str`
+            ESN the manifest is requested with
+
+        dolby, hevc, hdr, dolbyvision, vp9 : bool
+            Requested capabilities
+
+        Returns
+        -------
+        :obj:`str`
+            ID of the cache entry
+        """
+        flags = [dolby, hevc, hdr, dolbyvision, vp9]
+        return '{}_{}_{}'.format(
+            viewable_id, ''.join('1' if flag else '0' for flag in flags),
+            esn)
+
+    def get(self, key):
+        """Returns a manifest or None if there is no such
+        (or no longer valid) entry
+
+        Parameters
+        ----------
+        key : :obj:`str`
+            ID of the cache entry (see `key`)
+
+        Returns
+        -------
+        :obj:`dict`
+            Cached manifest or None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[1] < time():
+                if entry is not None:
+                    self._delete(key)
+                return None
+            self._entries[key] = entry
+            return entry[0]
+
+    def add(self, key, manifest):
+        """Adds (or replaces) a manifest, unless it's already expired
+
+        Parameters
+        ----------
+        key : :obj:`str`
+            ID of the cache entry (see `key`)
+
+        manifest : :obj:`dict`
+            Manifest as returned by the MSL API
+
+        Returns
+        -------
+        bool
+            The manifest has been cached
+        """
+        expires = manifest_expiry(manifest)
+        if expires < time():
+            return False
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (manifest, expires)
+            self._evict()
+            self._persist(key, (manifest, expires))
+        return True
+
+    def remove(self, key):
+        """Removes a manifest"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._delete(key)
+
+    def clear(self):
+        """Removes all manifests"""
+        with self._lock:
+            self._entries.clear()
+            if self.path is None or not os.path.isdir(self.path):
+                return
+            for filename in os.listdir(self.path):
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except OSError:
+                    pass
+
+    def _filename(self, key):
+        return os.path.join(
+            self.path, hashlib.md5(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._delete(self._entries.popitem(last=False)[0])
+
+    def _load(self):
+        if self.path is None or not os.path.isdir(self.path):
+            return
+        entries = []
+        for filename in os.listdir(self.path):
+            filename = os.path.join(self.path, filename)
+            try:
+                with open(filename, 'r') as cache_file:
+                    entry = json.load(cache_file)
+                if entry['expires'] >= time():
+                    entries.append((os.path.getmtime(filename), entry['key'],
+                                    (entry['manifest'], entry['expires'])))
+                    continue
+            except (IOError, OSError, ValueError, KeyError, TypeError):
+                pass
+            # expired, unreadable or a leftover temp file
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+        # the most recently written entries are kept
+        for _, key, entry in sorted(entries, key=lambda item: item[0]):
+            self._entries[key] = entry
+        self._evict()
+
+    def _persist(self, key, entry):
+        if self.path is None:
+            return
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        filename = self._filename(key)
+        # write & rename, readers never see a partially written file
+        temp_filename = filename + '.tmp'
+        with open(temp_filename, 'w') as cache_file:
+            json.dump({'key': key, 'manifest': entry[0], 'expires': entry[1]},
+                      cache_file)
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp_filename, filename)
+
+    def _delete(self, key):
+        if self.path is None:
+            return
+        try:
+            os.remove(self._filename(key))
+        except OSError:
+            pass
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Module: concurrency
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Threading helpers shared by the service and the addon"""
+
+import sys
+import threading
+from functools import wraps
+from time import sleep, time
+
+try:
+    import queue as Queue
+except ImportError:
+    import Queue
+
+try:
+    from socketserver import TCPServer
+except ImportError:
+    from SocketServer import TCPServer
+
+
+class ReadWriteLock(object):
+    """
+    Lock that allows any number of concurrent readers or a single writer.
+    Writers are preferred: once a writer waits, new readers queue up behind
+    it, so a profile switch can't be starved by a stream of list requests.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """Acquire the lock for reading (shared)"""
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """Release a previously acquired read lock"""
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """Acquire the lock for writing (exclusive)"""
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        """Release a previously acquired write lock"""
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+def read_locked(func):
+    """
+    Decorator that runs a method while holding `self.lock` for reading
+    """
+    @wraps(func)
+    def wrapped(self, *args, **kwargs):
+        """Wrapper function to maintain correct stack traces"""
+        self.lock.acquire_read()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.lock.release_read()
+    return wrapped
+
+
+def write_locked(func):
+    """
+    Decorator that runs a method while holding `self.lock` for writing
+    """
+    @wraps(func)
+    def wrapped(self, *args, **kwargs):
+        """Wrapper function to maintain correct stack traces"""
+        self.lock.acquire_write()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.lock.release_write()
+    return wrapped
+
+
+class ThreadPool(object):
+    """
+    Fixed size pool of daemon worker threads consuming a task queue
+    """
+    def __init__(self, size, name='ThreadPool'):
+        self.size = max(1, int(size))
+        self.name = name
+        self._tasks = Queue.Queue()
+        self._workers = []
+
+    def start(self):
+        """Spawn the worker threads (no-op if already running)"""
+        if self._workers:
+            return
+        for index in range(self.size):
+            worker = threading.Thread(
+                target=self._work,
+                name='{}-{}'.format(self.name, index))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, func, *args, **kwargs):
+        """Queue `func(*args, **kwargs)` for execution by a worker"""
+        self.start()
+        self._tasks.put((func, args, kwargs))
+
+    def join(self):
+        """Block until every queued task has been processed"""
+        self._tasks.join()
+
+    def stop(self):
+        """Let the workers finish the queued tasks and terminate"""
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join()
+        self._workers = []
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            try:
+                if task is None:
+                    return
+                func, args, kwargs = task
+                func(*args, **kwargs)
+            # pylint: disable=broad-except
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+            finally:
+                self._tasks.task_done()
+
+
+class RateLimiter(object):
+    """
+    Spaces out calls made from several threads, so that no two of them
+    start within less than `interval` seconds of each other
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0
+
+    def wait(self):
+        """Block until the calling thread may start its next call"""
+        with self._lock:
+            now = time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            sleep(slot - now)
+
+
+class ThreadPoolMixIn:
+    """
+    Mix-in for `SocketServer.TCPServer` that handles requests on a bounded
+    pool of worker threads instead of the thread calling serve_forever.
+    A `pool_size` of 1 keeps the original single threaded behaviour.
+    """
+    # pylint: disable=old-style-class, no-init
+    pool_size = 4
+
+    _request_pool = None
+
+    def process_request(self, request, client_address):
+        """Hand the request over to a pool worker"""
+        if self.pool_size <= 1:
+            return self._process_request_in_pool(request, client_address)
+        if self._request_pool is None:
+            self._request_pool = ThreadPool(
+                size=self.pool_size,
+                name=self.__class__.__name__)
+        return self._request_pool.submit(
+            self._process_request_in_pool, request, client_address)
+
+    def _process_request_in_pool(self, request, client_address):
+        # pylint: disable=broad-except
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Stop the worker pool and close the listening socket"""
+        TCPServer.server_close(self)
+        if self._request_pool is not None:
+            self._request_pool.stop()
+            self._request_pool = None
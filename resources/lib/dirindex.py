@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Module: dirindex
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Persisted directory listings, only refreshed once a directory changed"""
+
+import os
+from time import time
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+# seconds a directory has to be unchanged before its listing is kept,
+# mtimes have a resolution of a second (or worse, on network shares)
+MTIME_SLACK = 2
+
+
+class DirectoryIndex(object):
+    """
+    Listings of directories together with the mtime of the directory
+    at the time it was listed. A directory is only listed again when its
+    mtime changed, checking the mtime is a lot cheaper than listing the
+    directory on a network share.
+    """
+
+    def __init__(self, filename, listdir, mtime):
+        """
+        Parameters
+        ----------
+        filename : :obj:`str`
+            Location of the persisted index
+
+        listdir : :obj:`fn`
+            Lists a directory, returns the directories & the files in it
+
+        mtime : :obj:`fn`
+            Returns the mtime of a directory (0 if it's unknown)
+        """
+        self.filename = filename
+        self._listdir = listdir
+        self._mtime = mtime
+        self._entries = self._load()
+        self._dirty = False
+
+    def listdir(self, path, revalidate=True):
+        """
+        Returns the listing of a directory
+
+        Parameters
+        ----------
+        path : :obj:`str`
+            Directory to list
+
+        revalidate : bool
+            Check the mtime of the directory before the indexed listing is
+            used, if False an indexed listing is used as it is
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`list`
+            The directories & the files in the directory
+        """
+        entry = self._entries.get(path)
+        if entry is not None and not revalidate:
+            return entry[1]
+        mtime = self._mtime(path)
+        if entry is not None and mtime and entry[0] == mtime:
+            return entry[1]
+        listing = self._listdir(path)
+        listing = (list(listing[0]), list(listing[1]))
+        if mtime and mtime < time() - MTIME_SLACK:
+            self._entries[path] = (mtime, listing)
+        else:
+            # changed just now, might change again within the same second
+            self._entries.pop(path, None)
+        self._dirty = True
+        return listing
+
+    def retain(self, paths):
+        """Drops the listings of all the directories not in `paths`"""
+        paths = set(paths)
+        for path in [path for path in self._entries if path not in paths]:
+            del self._entries[path]
+            self._dirty = True
+
+    def save(self):
+        """Persists the index if it changed"""
+        if not self._dirty:
+            return
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'wb') as index_file:
+            pickle.dump(self._entries, index_file, protocol=2)
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+        os.rename(temp_filename, self.filename)
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.filename, 'rb') as index_file:
+                entries = pickle.load(index_file)
+        # pylint: disable=broad-except
+        except Exception:
+            return {}
+        return entries if isinstance(entries, dict) else {}
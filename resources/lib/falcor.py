@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+# Module: falcor
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Helpers for the Falcor style path requests against shakti"""
+
+import json
+import threading
+from collections import OrderedDict
+from time import sleep
+
+# seconds a path request waits for others to join it (only if the
+# endpoint is already busy, idle requests are sent right away)
+COALESCE_WINDOW = 0.02
+# maximum number of paths sent with one coalesced request
+COALESCE_MAX_PATHS = 150
+
+
+def _range_keys(key_range):
+    start = int(key_range.get('from', 0))
+    end = int(key_range.get('to', start))
+    return [str(index) for index in range(start, end + 1)]
+
+
+def expand_keys(key):
+    """
+    Returns the graph keys a single path key stands for
+    (a plain key, a key set or a {'from', 'to'} range)
+
+    Parameters
+    ----------
+    key : :obj:`str`, :obj:`int`, :obj:`list` or :obj:`dict`
+        Path key
+
+    Returns
+    -------
+    :obj:`list` of :obj:`str`
+        Graph keys
+    """
+    if isinstance(key, dict):
+        return _range_keys(key)
+    if isinstance(key, list):
+        keys = []
+        for item in key:
+            keys.extend(expand_keys(item))
+        return keys
+    return [str(key) if isinstance(key, int) else key]
+
+
+def as_reference(node):
+    """
+    Returns the graph path a node refers to or None if it's no reference.
+    Shakti answers references as plain lists (['videos', '80057281']),
+    the $type notation of the Falcor JSON graph is supported as well.
+    """
+    if isinstance(node, dict) and node.get('$type') == 'ref':
+        node = node.get('value')
+    if isinstance(node, list) and node and not isinstance(node[0], dict):
+        return node
+    return None
+
+
+def is_absent(node):
+    """Checks if a node marks a path without a value"""
+    return (isinstance(node, dict) and node.get('$type') == 'atom' and
+            'value' not in node)
+
+
+def _set_node(target, path, value):
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+        if not isinstance(target, dict):
+            return
+    target[path[-1]] = value
+
+
+def _extract(graph, node, path, location, target):
+    if is_absent(node):
+        return
+    if not path:
+        _set_node(target, location, node)
+        return
+    reference = as_reference(node)
+    if reference is not None:
+        # keep the reference itself & continue at its target
+        _set_node(target, location, node)
+        _walk(graph, graph, reference + list(path), [], target)
+        return
+    if isinstance(node, dict):
+        _walk(graph, node, path, location, target)
+
+
+def _walk(graph, node, path, location, target):
+    if not path:
+        _set_node(target, location, node)
+        return
+    if not isinstance(node, dict):
+        return _extract(graph, node, path, location, target)
+    for key in expand_keys(path[0]):
+        if key in node:
+            _extract(graph, node[key], path[1:], location + [key], target)
+
+
+def extract_paths(graph, paths):
+    """
+    Copies the parts of a JSON graph that answer the given paths into a new
+    graph, references are followed, so the videos a list refers to are
+    copied as well
+
+    Parameters
+    ----------
+    graph : :obj:`dict`
+        JSON graph (the `value` of a pathEvaluator response)
+
+    paths : :obj:`list` of :obj:`list`
+        Falcor paths
+
+    Returns
+    -------
+    :obj:`dict`
+        JSON graph that only contains the requested paths
+    """
+    target = {}
+    for path in paths:
+        _walk(graph, graph, list(path), [], target)
+    # keep the size info of the roots (parsers skip them, but expect them)
+    for root, node in graph.items():
+        if root in target and isinstance(node, dict):
+            for key in ('$size', 'size'):
+                if key in node:
+                    target[root].setdefault(key, node[key])
+    return target
+
+
+def _path_atoms(key):
+    # ranges are kept as (from, to) tuples, they are hashable trie keys
+    if isinstance(key, dict):
+        start = int(key.get('from', 0))
+        return [(start, int(key.get('to', start)))]
+    if isinstance(key, list):
+        atoms = []
+        for item in key:
+            atoms.extend(_path_atoms(item))
+        return atoms
+    return [key]
+
+
+def _as_interval(atom):
+    if isinstance(atom, tuple):
+        return atom
+    if isinstance(atom, bool):
+        return None
+    if isinstance(atom, int):
+        return (atom, atom)
+    if hasattr(atom, 'isdigit') and atom.isdigit() and (
+            atom == '0' or not atom.startswith('0')):
+        return (int(atom), int(atom))
+    return None
+
+
+def _key_set(atoms):
+    # overlapping & adjacent indices become one range, the rest a key set
+    keys = []
+    intervals = []
+    for atom in atoms:
+        interval = _as_interval(atom)
+        if interval is None:
+            keys.append(atom)
+        else:
+            intervals.append((interval, atom))
+    intervals.sort(key=lambda item: item[0])
+    merged = []
+    for interval, atom in intervals:
+        if merged and interval[0] <= merged[-1][0][1] + 1:
+            last = merged[-1][0]
+            merged[-1] = ((last[0], max(last[1], interval[1])), None)
+        else:
+            merged.append((interval, atom))
+    for (start, end), atom in merged:
+        if start == end and atom is not None and not isinstance(atom, tuple):
+            keys.append(atom)
+        else:
+            keys.append({'from': start, 'to': end})
+    return keys[0] if len(keys) == 1 else keys
+
+
+class _PathNode(object):
+    __slots__ = ('children', 'leaf', 'signature')
+
+    def __init__(self):
+        self.children = OrderedDict()
+        self.leaf = False
+        self.signature = None
+
+
+def _sign(node, signatures):
+    # identical subtrees share the same (interned) signature id
+    children = tuple(sorted(
+        (repr(key), _sign(child, signatures))
+        for key, child in node.children.items()))
+    signature = (node.leaf, children)
+    node.signature = signatures.setdefault(signature, len(signatures))
+    return node.signature
+
+
+def _collapse(node):
+    suffixes = [[]] if node.leaf else []
+    groups = {}
+    order = []
+    for key, child in node.children.items():
+        group = groups.get(child.signature)
+        if group is None:
+            group = groups[child.signature] = []
+            order.append(child.signature)
+        group.append((key, child))
+    for signature in order:
+        group = groups[signature]
+        key_set = _key_set([key for key, _ in group])
+        for suffix in _collapse(group[0][1]):
+            suffixes.append([key_set] + suffix)
+    return suffixes
+
+
+def collapse_paths(paths):
+    """
+    Collapses a list of paths into the smallest equivalent list of path
+    sets: siblings with identical sub paths are merged into key sets &
+    contiguous indices into {'from', 'to'} ranges
+
+    Parameters
+    ----------
+    paths : :obj:`list` of :obj:`list`
+        Falcor paths
+
+    Returns
+    -------
+    :obj:`list` of :obj:`list`
+        Falcor path sets requesting exactly the same values
+    """
+    if len(paths) < 2:
+        return list(paths)
+    root = _PathNode()
+    for path in paths:
+        nodes = [root]
+        for key in path:
+            next_nodes = []
+            for node in nodes:
+                for atom in _path_atoms(key):
+                    child = node.children.get(atom)
+                    if child is None:
+                        child = node.children[atom] = _PathNode()
+                    next_nodes.append(child)
+            nodes = next_nodes
+        for node in nodes:
+            node.leaf = True
+    _sign(root, {})
+    return _collapse(root)
+
+
+def encode_path_request(paths, auth_url):
+    """
+    Builds the form encoded body of a pathEvaluator request
+
+    Parameters
+    ----------
+    paths : :obj:`list` of :obj:`list`
+        Falcor paths
+
+    auth_url : :obj:`str`
+        authURL of the session
+
+    Returns
+    -------
+    :obj:`str`
+        Request body
+    """
+    parts = ['path=' + json.dumps(path, separators=(',', ':'))
+             for path in paths]
+    parts.append('authURL=' + auth_url)
+    return '&'.join(parts)
+
+
+class GraphResponse(object):
+    """
+    Minimal stand in for a `requests.Response` carrying a JSON graph,
+    handed to callers whose paths were answered by a shared request
+    """
+
+    def __init__(self, graph, status_code=200):
+        self.status_code = status_code
+        self._data = {'value': graph}
+
+    def json(self):
+        """Returns the decoded response body"""
+        return self._data
+
+    @property
+    def ok(self):
+        """Mirrors `requests.Response.ok`"""
+        return self.status_code < 400
+
+    def __bool__(self):
+        return self.ok
+
+    __nonzero__ = __bool__
+
+
+class _PathCall(object):
+    def __init__(self, paths):
+        self.paths = paths
+        self.response = None
+        self.done = threading.Event()
+
+
+class PathRequestCoalescer(object):
+    """
+    Merges path requests issued by several threads into one request
+
+    Identical requests that are already in flight share the response of
+    the first one. While the endpoint is busy, requests are queued for a
+    short window and sent together, every caller gets its part of the
+    combined graph back.
+    """
+
+    def __init__(self, send, window=COALESCE_WINDOW,
+                 max_paths=COALESCE_MAX_PATHS):
+        """
+        Parameters
+        ----------
+        send : :obj:`fn`
+            Executes a path request, called with the list of paths,
+            returns a `requests.Response` or None
+
+        window : :obj:`float`
+            Seconds a request waits for others to join it
+
+        max_paths : :obj:`int`
+            Maximum number of paths of a combined request
+        """
+        self.send = send
+        self.window = window
+        self.max_paths = max_paths
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._batch = None
+
+    def request(self, paths):
+        """Executes (or joins) a path request
+
+        Parameters
+        ----------
+        paths : :obj:`list` of :obj:`list`
+            Falcor paths
+
+        Returns
+        -------
+        :obj:`requests.Response` or :obj:`GraphResponse`
+            Response to the path request
+        """
+        key = json.dumps(paths, sort_keys=True)
+        leader = False
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = _PathCall(paths)
+                busy = bool(self._in_flight)
+                self._in_flight[key] = call
+                batch = self._batch
+                if (batch is None or
+                        batch.size + len(paths) > self.max_paths):
+                    batch = _PathBatch(delay=self.window if busy else 0)
+                    self._batch = batch
+                    leader = True
+                batch.add(key, call)
+        if leader:
+            self._execute(batch)
+        call.done.wait()
+        return call.response
+
+    def _execute(self, batch):
+        if batch.delay:
+            sleep(batch.delay)
+        with self._lock:
+            if self._batch is batch:
+                self._batch = None
+        try:
+            self._dispatch(batch)
+        finally:
+            with self._lock:
+                for key, call in batch.calls:
+                    self._in_flight.pop(key, None)
+                    call.done.set()
+
+    def _dispatch(self, batch):
+        if len(batch.calls) == 1:
+            call = batch.calls[0][1]
+            call.response = self.send(call.paths)
+            return
+        response = self.send(batch.paths())
+        graph = None
+        if response is not None and response.status_code == 200:
+            try:
+                graph = response.json().get('value', {})
+            except ValueError:
+                graph = None
+        for _, call in batch.calls:
+            if graph is None:
+                call.response = response
+            else:
+                call.response = GraphResponse(
+                    extract_paths(graph, call.paths))
+
+
+class _PathBatch(object):
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = []
+        self.size = 0
+
+    def add(self, key, call):
+        self.calls.append((key, call))
+        self.size += len(call.paths)
+
+    def paths(self):
+        paths = []
+        seen = set()
+        for _, call in self.calls:
+            for path in call.paths:
+                path_key = json.dumps(path, sort_keys=True)
+                if path_key not in seen:
+                    seen.add(path_key)
+                    paths.append(path)
+        return paths
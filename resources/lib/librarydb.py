@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# Module: librarydb
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""SQLite store of the movies & shows exported to the library"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from resources.lib.compat import compat_unicode
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS movies (
+    title TEXT PRIMARY KEY,
+    alt_title TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shows (
+    title TEXT PRIMARY KEY,
+    alt_title TEXT NOT NULL,
+    netflix_id TEXT,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS seasons (
+    show TEXT NOT NULL REFERENCES shows (title) ON DELETE CASCADE,
+    season INTEGER NOT NULL,
+    PRIMARY KEY (show, season)
+);
+CREATE TABLE IF NOT EXISTS episodes (
+    show TEXT NOT NULL REFERENCES shows (title) ON DELETE CASCADE,
+    episode TEXT NOT NULL,
+    PRIMARY KEY (show, episode)
+);
+'''
+
+
+def _text(value):
+    """Returns a title as unicode, the sqlite driver rejects utf-8 bytes"""
+    if isinstance(value, bytes) and bytes is not compat_unicode:
+        return value.decode('utf-8')
+    return value
+
+
+def episode_label(season, episode):
+    """Returns the label of an episode (S01E02), used as its key"""
+    return 'S%02dE%02d' % (int(season), int(episode))
+
+
+class LibraryDB(object):
+    """
+    Movies are keyed by their title & year (`Title (2018)`), shows by their
+    title, episodes by the label of the episode (`S01E02`).
+
+    Every change is committed right away, unless it is made within
+    `batch()`, which commits all the changes made within in a single
+    transaction. The connection is shared by all threads.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : :obj:`str`
+            Location of the database file, it's created if it doesn't exist
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the connection"""
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager that runs the changes made within in a single
+        transaction, rolled back if an error is raised. Batches may be nested,
+        only the outermost one commits.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._connection.execute('BEGIN')
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._connection.execute('ROLLBACK')
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._connection.execute('COMMIT')
+
+    def _query(self, statement, params=()):
+        with self._lock:
+            return self._connection.execute(statement, params).fetchall()
+
+    def _change(self, statement, params=()):
+        with self.batch():
+            return self._connection.execute(statement, params).rowcount
+
+    def _exists(self, statement, params):
+        return len(self._query(statement, params)) > 0
+
+    def movie_exists(self, movie):
+        """Checks if a movie (`Title (year)`) is present"""
+        return self._exists(
+            'SELECT 1 FROM movies WHERE title = ?', (_text(movie),))
+
+    def get_movie(self, movie):
+        """Returns the entry of a movie (alt_title) or None"""
+        rows = self._query(
+            'SELECT alt_title FROM movies WHERE title = ?', (_text(movie),))
+        return {'alt_title': rows[0][0]} if rows else None
+
+    def add_movie(self, movie, alt_title):
+        """Adds a movie, an existing entry is kept"""
+        self._change(
+            'INSERT OR IGNORE INTO movies (title, alt_title) VALUES (?, ?)',
+            (_text(movie), _text(alt_title)))
+
+    def remove_movie(self, movie):
+        """Removes a movie"""
+        self._change('DELETE FROM movies WHERE title = ?', (_text(movie),))
+
+    def show_exists(self, title):
+        """Checks if a show is present"""
+        return self._exists(
+            'SELECT 1 FROM shows WHERE title = ?', (_text(title),))
+
+    def get_show(self, title):
+        """
+        Returns the entry of a show or None
+
+        Returns
+        -------
+        :obj:`dict`
+            alt_title, netflix_id (if known), fingerprint (if known),
+            the season numbers & the episode labels of the show
+        """
+        with self._lock:
+            return self._list_shows(title=_text(title)).get(_text(title))
+
+    def list_shows(self):
+        """Returns the entries of all shows by title (see `get_show`)"""
+        with self._lock:
+            return self._list_shows()
+
+    def _list_shows(self, title=None):
+        params = () if title is None else (title,)
+        show_filter = '' if title is None else ' WHERE title = ?'
+        child_filter = '' if title is None else ' WHERE show = ?'
+        shows = {}
+        for title, alt_title, netflix_id, fingerprint in self._query(
+                'SELECT title, alt_title, netflix_id, fingerprint FROM shows'
+                + show_filter, params):
+            shows[title] = {'alt_title': alt_title, 'seasons': [],
+                            'episodes': []}
+            if netflix_id is not None:
+                shows[title]['netflix_id'] = netflix_id
+            if fingerprint is not None:
+                shows[title]['fingerprint'] = json.loads(fingerprint)
+        for show, season in self._query(
+                'SELECT show, season FROM seasons' + child_filter +
+                ' ORDER BY show, season', params):
+            shows[show]['seasons'].append(season)
+        for show, episode in self._query(
+                'SELECT show, episode FROM episodes' + child_filter +
+                ' ORDER BY show, episode', params):
+            shows[show]['episodes'].append(episode)
+        return shows
+
+    def add_show(self, title, alt_title, netflix_id=None):
+        """Adds a show, an existing entry is kept"""
+        self._change(
+            'INSERT OR IGNORE INTO shows (title, alt_title, netflix_id) '
+            'VALUES (?, ?, ?)',
+            (_text(title), _text(alt_title),
+             None if netflix_id is None else str(netflix_id)))
+
+    def set_netflix_id(self, title, netflix_id):
+        """Sets the netflix id of a show"""
+        return self._change(
+            'UPDATE shows SET netflix_id = ? WHERE title = ?',
+            (str(netflix_id), _text(title))) > 0
+
+    def set_fingerprint(self, title, fingerprint):
+        """Sets the fingerprint of a show (any JSON serializable value)"""
+        return self._change(
+            'UPDATE shows SET fingerprint = ? WHERE title = ?',
+            (json.dumps(fingerprint), _text(title))) > 0
+
+    def remove_show(self, title):
+        """Removes a show with all its seasons & episodes"""
+        self._change('DELETE FROM shows WHERE title = ?', (_text(title),))
+
+    def season_exists(self, title, season):
+        """Checks if a season of a show is present"""
+        return self._exists(
+            'SELECT 1 FROM seasons WHERE show = ? AND season = ?',
+            (_text(title), int(season)))
+
+    def add_season(self, title, season):
+        """Adds a season to a show"""
+        self._change(
+            'INSERT OR IGNORE INTO seasons (show, season) VALUES (?, ?)',
+            (_text(title), int(season)))
+
+    def remove_season(self, title, season):
+        """Removes a season & its episodes from a show"""
+        with self.batch():
+            self._change(
+                'DELETE FROM seasons WHERE show = ? AND season = ?',
+                (_text(title), int(season)))
+            self._change(
+                'DELETE FROM episodes WHERE show = ? AND episode LIKE ?',
+                (_text(title), 'S%02dE%%' % int(season)))
+
+    def episode_exists(self, title, season, episode):
+        """Checks if an episode of a show is present"""
+        return self._exists(
+            'SELECT 1 FROM episodes WHERE show = ? AND episode = ?',
+            (_text(title), episode_label(season, episode)))
+
+    def add_episode(self, title, season, episode):
+        """Adds an episode to a show"""
+        self._change(
+            'INSERT OR IGNORE INTO episodes (show, episode) VALUES (?, ?)',
+            (_text(title), episode_label(season, episode)))
+
+    def remove_episode(self, title, season, episode):
+        """Removes an episode from a show"""
+        self._change(
+            'DELETE FROM episodes WHERE show = ? AND episode = ?',
+            (_text(title), episode_label(season, episode)))
+
+    def import_dump(self, dump, movies_label, series_label):
+        """
+        Imports the contents of the former pickled library db
+        in a single transaction
+
+        Parameters
+        ----------
+        dump : :obj:`dict`
+            Entries by title, of the movies & the shows
+
+        movies_label : :obj:`str`
+            Key of the movies in the dump
+
+        series_label : :obj:`str`
+            Key of the shows in the dump
+        """
+        with self.batch():
+            for movie, entry in dump.get(movies_label, {}).items():
+                self.add_movie(movie, entry.get('alt_title', movie))
+            for title, entry in dump.get(series_label, {}).items():
+                self.add_show(title, entry.get('alt_title', title),
+                              entry.get('netflix_id'))
+                if entry.get('fingerprint') is not None:
+                    self.set_fingerprint(title, entry['fingerprint'])
+                for season in entry.get('seasons', []):
+                    self.add_season(title, season)
+                for episode in entry.get('episodes', []):
+                    self._change(
+                        'INSERT OR IGNORE INTO episodes (show, episode) '
+                        'VALUES (?, ?)', (_text(title), _text(episode)))
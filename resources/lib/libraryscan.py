@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Module: libraryscan
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Import of the movies & shows found in the exported library folders"""
+
+import os
+import re
+
+# name of the strm file of an episode
+EPISODE_FILENAME = re.compile(r'^S(\d+)E(\d+)\.strm$')
+# release year in the name of the strm file of a movie
+MOVIE_YEAR = re.compile(r'\((\d+)\)\.strm$')
+
+
+def exported_movie_year(filenames):
+    """Returns the release year in the name of the strm file of a movie"""
+    for filename in filenames:
+        match = MOVIE_YEAR.search(filename)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def scan_exported(index, movie_path, tvshow_path, folder_path, exists):
+    """
+    Lists the folders of the exported movies & shows, through the
+    directory index: a folder is only listed again if it changed since
+    the last scan
+
+    Parameters
+    ----------
+    index : :obj:`DirectoryIndex`
+        Listings of the library folders
+
+    movie_path : :obj:`str`
+        Folder of the exported movies
+
+    tvshow_path : :obj:`str`
+        Folder of the exported shows
+
+    folder_path : :obj:`fn`
+        Returns a folder path with a trailing delimiter
+
+    exists : :obj:`fn`
+        Checks if a folder exists
+
+    Returns
+    -------
+    :obj:`tuple`
+        The movies (`Title (year)` & alt title), the shows (title,
+        alt title & the season & episode numbers of the episodes found)
+        & the folders that have been listed
+    """
+    movies = []
+    shows = []
+    listed = []
+    movies_folder = folder_path(movie_path)
+    if exists(movies_folder):
+        listed.append(movies_folder)
+        for video in index.listdir(movies_folder)[0]:
+            folder = folder_path(os.path.join(movie_path, video))
+            listed.append(folder)
+            # the strm file of a movie doesn't change once exported
+            year = exported_movie_year(
+                index.listdir(folder, revalidate=False)[1])
+            if year is not None:
+                movies.append(('%s (%d)' % (video, year), video))
+    shows_folder = folder_path(tvshow_path)
+    if exists(shows_folder):
+        listed.append(shows_folder)
+        for video in index.listdir(shows_folder)[0]:
+            folder = folder_path(os.path.join(tvshow_path, video))
+            listed.append(folder)
+            # new episodes change the mtime of the folder,
+            # so they are listed again only then
+            episodes = []
+            for filename in index.listdir(folder)[1]:
+                match = EPISODE_FILENAME.match(filename)
+                if match:
+                    episodes.append(
+                        (int(match.group(1)), int(match.group(2))))
+            shows.append((video, video, episodes))
+    return movies, shows, listed
+
+
+def update_from_exported(db, index, movie_path, tvshow_path, folder_path,
+                         exists):
+    """
+    Adds the movies, shows & episodes found in the exported library
+    folders to the db (existing entries are kept). All the folders are
+    listed before the entries are committed in a single transaction,
+    so the db isn't locked while slow (network) folders are listed.
+
+    Parameters
+    ----------
+    db : :obj:`LibraryDB`
+        Local db of the exported movies & shows
+
+    index : :obj:`DirectoryIndex`
+        Listings of the library folders
+
+    movie_path : :obj:`str`
+        Folder of the exported movies
+
+    tvshow_path : :obj:`str`
+        Folder of the exported shows
+
+    folder_path : :obj:`fn`
+        Returns a folder path with a trailing delimiter
+
+    exists : :obj:`fn`
+        Checks if a folder exists
+    """
+    movies, shows, listed = scan_exported(
+        index=index,
+        movie_path=movie_path,
+        tvshow_path=tvshow_path,
+        folder_path=folder_path,
+        exists=exists)
+    with db.batch():
+        for movie, alt_title in movies:
+            db.add_movie(movie, alt_title)
+        for title, alt_title, episodes in shows:
+            db.add_show(title, alt_title)
+            for season, episode in episodes:
+                db.add_episode(title, season=season, episode=episode)
+    index.retain(listed)
+    index.save()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Module: libraryupdate
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Updates the exported shows of the library several at a time"""
+
+import sys
+import threading
+from time import time
+
+from resources.lib.concurrency import RateLimiter, ThreadPool
+
+# shows updated at the same time
+UPDATE_CONCURRENCY = 4
+# minimum seconds between the start of two show updates, each one makes
+# a few requests to Netflix in a row & those shouldn't come in bursts
+UPDATE_INTERVAL = 0.5
+# seconds a worker yields to Kodi after every show of a background update
+BACKGROUND_PAUSE = 1
+
+
+class ShowUpdate(object):
+    """Outcome of the update of a single show"""
+    __slots__ = ('title', 'duration', 'result', 'error')
+
+    def __init__(self, title, duration, result=None, error=None):
+        self.title = title
+        self.duration = duration
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        """The show has been updated without errors"""
+        return self.error is None and self.result is not False
+
+
+class LibraryUpdater(object):
+    """
+    Runs the update of several shows on a bounded pool of worker threads.
+    The updates spend most of their time waiting on the network, the
+    library DB guards its writes itself (see `Library.lock`).
+    """
+
+    def __init__(self, update_show, concurrency=UPDATE_CONCURRENCY,
+                 interval=UPDATE_INTERVAL, on_progress=None,
+                 wait_for_abort=None, pause=BACKGROUND_PAUSE):
+        """
+        Parameters
+        ----------
+        update_show : :obj:`fn`
+            Called with the title & the arguments of a show, updates it,
+            a result of False marks a failed update
+
+        concurrency : :obj:`int`
+            Maximum number of shows updated at the same time
+
+        interval : :obj:`float`
+            Minimum seconds between the start of two show updates
+
+        on_progress : :obj:`fn`
+            Optional, called with the number of finished & total updates
+            and the update that just finished
+
+        wait_for_abort : :obj:`fn`
+            Optional, called with `pause` after every show update
+            (`xbmc.Monitor().waitForAbort` for background updates),
+            the remaining shows are skipped once it returns True
+
+        pause : :obj:`float`
+            Seconds passed to `wait_for_abort`
+        """
+        self.update_show = update_show
+        self.concurrency = max(1, int(concurrency))
+        self.rate_limiter = RateLimiter(interval=interval)
+        self.on_progress = on_progress
+        self.wait_for_abort = wait_for_abort
+        self.pause = pause
+        self.updates = []
+        self._lock = threading.Lock()
+        self._aborted = threading.Event()
+
+    def run(self, shows):
+        """
+        Updates the shows & waits until all of them are done
+
+        Parameters
+        ----------
+        shows : :obj:`list` of :obj:`tuple`
+            Title & the arguments of `update_show` for every show
+
+        Returns
+        -------
+        :obj:`list` of :obj:`ShowUpdate`
+            Outcome of every update, in the order they finished
+        """
+        shows = list(shows)
+        self.updates = []
+        self._aborted.clear()
+        if not shows:
+            return self.updates
+        pool = ThreadPool(
+            size=min(self.concurrency, len(shows)),
+            name='LibraryUpdater')
+        for show in shows:
+            pool.submit(self._update, len(shows), *show)
+        pool.join()
+        pool.stop()
+        return self.updates
+
+    def report(self):
+        """
+        Summarizes the last run, slowest shows first
+
+        Returns
+        -------
+        :obj:`list` of :obj:`str`
+            Report lines
+        """
+        total = sum(update.duration for update in self.updates)
+        failed = [update for update in self.updates if not update.ok]
+        lines = ['Updated {} shows ({} failed), {:.1f}s spent on shows'
+                 .format(len(self.updates), len(failed), total)]
+        for update in sorted(self.updates, key=lambda u: -u.duration):
+            lines.append('{:8.2f}s {}{}'.format(
+                update.duration,
+                update.title.encode('utf-8') if sys.version_info[0] < 3
+                else update.title,
+                '' if update.ok else ' (failed: {})'.format(
+                    update.error or 'no result')))
+        return lines
+
+    def _update(self, total, title, *args):
+        if self._aborted.is_set():
+            return
+        self.rate_limiter.wait()
+        started = time()
+        # pylint: disable=broad-except
+        try:
+            update = ShowUpdate(
+                title=title, duration=0, result=self.update_show(title, *args))
+        except Exception as error:
+            update = ShowUpdate(title=title, duration=0, error=repr(error))
+        update.duration = time() - started
+        with self._lock:
+            self.updates.append(update)
+            done = len(self.updates)
+        if self.on_progress is not None:
+            self.on_progress(done, total, update)
+        if (self.wait_for_abort is not None and
+                self.wait_for_abort(self.pause)):
+            self._aborted.set()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Module: mslstream
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Incremental decoding of chunked MSL responses"""
+
+import re
+import json
+import zlib
+import base64
+
+# bytes read from the socket at once
+CHUNK_SIZE = 65536
+# bytes preallocated for the decoded payload (at least)
+INITIAL_SIZE = 65536
+# zlib window bits of gzip compressed data
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+TOKEN = re.compile(b'[{}"]')
+BACKSLASH = ord('\\')
+
+
+def iter_objects(chunks):
+    """
+    Yields the JSON objects of a stream of concatenated objects (a MSL
+    message is a header object followed by payload chunk objects) as soon
+    as the last byte of an object has been read
+
+    Parameters
+    ----------
+    chunks : :obj:`iterable` of :obj:`bytes`
+        Response body
+
+    Returns
+    -------
+    :obj:`generator` of :obj:`bytes`
+        Serialized objects
+    """
+    buf = bytearray()
+    pos = 0
+    start = 0
+    depth = 0
+    in_string = False
+    for chunk in chunks:
+        buf += chunk
+        while True:
+            if in_string:
+                # strings are long base64 values, find is a lot faster
+                # than a regular expression on those
+                end = buf.find(b'"', pos)
+                if end == -1:
+                    pos = len(buf)
+                    break
+                pos = end + 1
+                escapes = 0
+                while buf[end - escapes - 1] == BACKSLASH:
+                    escapes += 1
+                in_string = escapes % 2 == 1
+                continue
+            match = TOKEN.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            token = match.group()
+            pos = match.end()
+            if token == b'"':
+                in_string = True
+            elif token == b'{':
+                if depth == 0:
+                    start = match.start()
+                depth += 1
+            elif depth > 0:
+                depth -= 1
+                if depth == 0:
+                    yield bytes(buf[start:pos])
+                    del buf[:pos]
+                    pos = 0
+    if depth > 0:
+        raise ValueError('Truncated MSL response')
+
+
+class MSLResponseDecoder(object):
+    """
+    Decodes the payload of a chunked MSL response while it's downloaded:
+    every payload chunk is checked against its signature, decrypted &
+    decompressed as soon as it's complete & appended to a single
+    preallocated buffer, which is parsed once the message is complete.
+    """
+
+    def __init__(self, decrypt, verify=None, size_hint=0):
+        """
+        Parameters
+        ----------
+        decrypt : :obj:`fn`
+            Called with the iv & the ciphertext of a chunk, returns the
+            plaintext
+
+        verify : :obj:`fn`
+            Optional, called with the encryption envelope & the signature
+            of a chunk, returns if the signature is valid
+
+        size_hint : :obj:`int`
+            Expected size of the decoded payload
+        """
+        self.decrypt = decrypt
+        self.verify = verify
+        self.header = None
+        self._buffer = bytearray(max(INITIAL_SIZE, size_hint))
+        self._length = 0
+        self._decompressor = None
+
+    def decode(self, chunks):
+        """
+        Reads & decodes a whole response
+
+        Parameters
+        ----------
+        chunks : :obj:`iterable` of :obj:`bytes`
+            Response body
+
+        Returns
+        -------
+        :obj:`dict`
+            The parsed payload of the message
+        """
+        for obj in iter_objects(chunks):
+            if self.header is None:
+                self._read_header(obj)
+            else:
+                self._read_chunk(obj)
+        if self.header is None:
+            raise ValueError('Empty MSL response')
+        return json.loads(self._buffer[:self._length].decode('utf-8'))
+
+    def _read_header(self, obj):
+        header = json.loads(obj.decode('utf-8'))
+        if 'errordata' in header or 'headerdata' not in header:
+            raise ValueError('MSL error response: {}'.format(
+                obj.decode('utf-8')))
+        self.header = header
+
+    def _read_chunk(self, obj):
+        chunk = json.loads(obj.decode('utf-8'))
+        envelope = base64.standard_b64decode(chunk['payload'])
+        if self.verify is not None and not self.verify(
+                envelope, base64.standard_b64decode(chunk['signature'])):
+            raise ValueError('Invalid signature of MSL payload chunk')
+        envelope = json.loads(envelope)
+        plaintext = json.loads(self.decrypt(
+            base64.standard_b64decode(envelope['iv']),
+            base64.standard_b64decode(envelope['ciphertext'])))
+        data = base64.standard_b64decode(plaintext.get('data', ''))
+        if plaintext.get('compressionalgo') == 'GZIP':
+            data = self._decompress(data)
+        self._append(data)
+
+    def _decompress(self, data):
+        # chunks are usually compressed on their own, a chunk starting a
+        # new gzip member starts a new decompressor
+        if self._decompressor is None or getattr(
+                self._decompressor, 'eof', False):
+            self._decompressor = zlib.decompressobj(GZIP_WBITS)
+        output = self._decompressor.decompress(data)
+        while self._decompressor.unused_data:
+            data = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(GZIP_WBITS)
+            output += self._decompressor.decompress(data)
+        return output
+
+    def _append(self, data):
+        end = self._length + len(data)
+        # grows the buffer if the data doesn't fit
+        self._buffer[self._length:end] = data
+        self._length = end
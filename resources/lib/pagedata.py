@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Module: pagedata
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Extracts the inline `netflix.<name> = {...};` objects of Netflix pages"""
+
+import re
+import json
+
+ASSIGNMENT = re.compile(br'netflix\.(\w+)\s*=\s*')
+SCRIPT_END = b'</script>'
+# javascript escapes that are not valid in JSON, escaped backslashes are
+# matched too, so the character following them is never taken as an escape
+JS_ESCAPE = re.compile(r'\\(x[0-9a-fA-F]{2}|.)', re.DOTALL)
+JSON_ESCAPES = frozenset('"\\/bfnrtu')
+# escapes that need more than the \xNN -> \u00NN translation
+SPECIAL_ESCAPE = re.compile(r'\\[^"/bfnrtux]')
+
+
+def _replace_escape(match):
+    escape = match.group(1)
+    if escape in JSON_ESCAPES:
+        return match.group(0)
+    if escape[0] == 'x' and len(escape) == 3:
+        return '\\u00' + escape[1:]
+    if escape == "'":
+        return escape
+    # keep unknown escapes (f.e. \s in regular expressions) literally
+    return '\\\\' + escape
+
+
+def decode_js_object(text):
+    """
+    Parses a javascript object literal that only deviates from JSON by its
+    string escapes (\\xNN, \\' ...)
+
+    Parameters
+    ----------
+    text : :obj:`str`
+        Object literal
+
+    Returns
+    -------
+    :obj:`dict`
+        Parsed object
+    """
+    if '\\' in text:
+        if SPECIAL_ESCAPE.search(text):
+            text = JS_ESCAPE.sub(_replace_escape, text)
+        else:
+            text = text.replace('\\x', '\\u00')
+    return json.loads(text, strict=False)
+
+
+def extract_page_data(content, names):
+    """
+    Finds the `netflix.<name> = ...;</script>` assignments of the given
+    names in a single pass over the page & parses them
+
+    Parameters
+    ----------
+    content : :obj:`bytes`
+        UTF-8 encoded page contents
+
+    names : :obj:`list` of :obj:`str`
+        Names of the objects to extract
+
+    Returns
+    -------
+    :obj:`dict` of :obj:`dict`
+        Parsed objects by name, names not found in the page are missing
+    """
+    wanted = set(names)
+    data = {}
+    position = 0
+    while wanted:
+        match = ASSIGNMENT.search(content, position)
+        if match is None:
+            break
+        name = match.group(1).decode('ascii')
+        if name not in wanted:
+            position = match.end()
+            continue
+        end = content.find(SCRIPT_END, match.end())
+        if end == -1:
+            break
+        position = end + len(SCRIPT_END)
+        wanted.discard(name)
+        block = content[match.end():end].rstrip()
+        if block.endswith(b';'):
+            block = block[:-1]
+        data[name] = decode_js_object(block.decode('utf-8'))
+    return data
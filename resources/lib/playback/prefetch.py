@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Module: prefetch
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+# pylint: disable=import-error
+
+"""Prefetching of the manifest of the next episode of a tv show"""
+import threading
+
+import xbmc
+
+from resources.lib.playback import PlaybackActionManager
+from resources.lib.playback.section_skipping import OFFSET_CREDITS
+
+# seconds before the credits the manifest of the next episode is loaded
+PREFETCH_LEAD = 60
+# progress (percent) the manifest is loaded at if there are no credit markers
+PREFETCH_PERCENTAGE = 85
+
+
+class ManifestPrefetcher(PlaybackActionManager):
+    """
+    Loads the manifest of the next episode into the manifest cache of the
+    MSL service shortly before the credits of the playing episode, so the
+    next episode starts without waiting on the manifest
+    """
+    def __init__(self, nx_common, msl_handler):
+        super(ManifestPrefetcher, self).__init__(nx_common)
+        self.msl_handler = msl_handler
+        self.next_video_id = None
+        self.prefetch_at = None
+        self.prefetched = False
+
+    def __str__(self):
+        return ('enabled={}, next_video_id={}, prefetch_at={}'
+                .format(self.enabled, self.next_video_id, self.prefetch_at))
+
+    def _initialize(self, data):
+        # let this throw a KeyError to disable this instance if there is no
+        # next episode
+        self.next_video_id = data['next_video_id']
+        credits_offset = data.get('timeline_markers', {}).get(OFFSET_CREDITS)
+        self.prefetch_at = (max(0, credits_offset - PREFETCH_LEAD)
+                            if credits_offset else None)
+        self.prefetched = False
+
+    def _on_tick(self, player_state):
+        if self.prefetched or not self._prefetch_reached(player_state):
+            return
+        self.prefetched = True
+        thread = threading.Thread(
+            target=self._prefetch, args=(self.next_video_id,),
+            name='ManifestPrefetcher')
+        thread.daemon = True
+        thread.start()
+
+    def _prefetch_reached(self, player_state):
+        if self.prefetch_at is not None:
+            return player_state['elapsed_seconds'] >= self.prefetch_at
+        return player_state['percentage'] >= PREFETCH_PERCENTAGE
+
+    def _prefetch(self, video_id):
+        self.log('Prefetching manifest of {}'.format(video_id))
+        flags = [self.addon.getSetting(setting) == 'true' for setting in [
+            'enable_dolby_sound', 'enable_hevc_profiles',
+            'enable_hdr_profiles', 'enable_dolbyvision_profiles',
+            'enable_vp9_profiles']]
+        # pylint: disable=broad-except
+        try:
+            cached = self.msl_handler.prefetch_manifest(int(video_id), *flags)
+        except Exception as exc:
+            self.log('Prefetching manifest of {} failed: {}'
+                     .format(video_id, exc), xbmc.LOGWARNING)
+            return
+        self.log('Prefetched manifest of {} (cached={})'
+                 .format(video_id, cached))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Module: prewarm
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Loads the home screen lists into the service cache in the background"""
+
+import sys
+import threading
+from time import time
+
+from resources.lib.NetflixSession import FETCH_VIDEO_PAGE_SIZE
+
+# seconds between two idle prewarm runs (matches the list cache ttl)
+PREWARM_INTERVAL = 600
+
+
+def first_page_range():
+    """
+    Returns the (list_from, list_to) range Navigation.show_video_list
+    requests for the first page of a list
+    """
+    return 0, FETCH_VIDEO_PAGE_SIZE - 1
+
+
+class Prewarmer(object):
+    """
+    Fetches the lolomo & the first page of every user list (My List,
+    Continue Watching, ...) through the cached routes of the sub-resource
+    handler, so the first time the addon is opened it is served from memory.
+
+    Runs once on startup, after every login or profile switch and
+    periodically while Kodi is idle.
+    """
+
+    def __init__(self, nx_common, res_handler, interval=PREWARM_INTERVAL):
+        """
+        Parameters
+        ----------
+        nx_common : :obj:`NetflixCommon`
+            instance of the NetflixCommon class
+
+        res_handler : :obj:`NetflixHttpSubRessourceHandler`
+            Route handler whose cache gets filled
+
+        interval : :obj:`int`
+            Minimum seconds between two idle runs
+        """
+        self.nx_common = nx_common
+        self.res_handler = res_handler
+        self.interval = interval
+        self.last_run = 0
+        self._pending = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='Prewarmer')
+        self._thread.daemon = True
+        res_handler.session_listeners.append(self.schedule)
+
+    def start(self):
+        """Starts the worker thread & schedules the initial run"""
+        self._thread.start()
+        self.schedule()
+
+    def stop(self):
+        """Stops the worker thread (an ongoing run is cut short)"""
+        self._stopped = True
+        self._pending.set()
+        # the service may stop before it started everything
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def schedule(self):
+        """Requests a prewarm run"""
+        self._pending.set()
+
+    def on_idle(self):
+        """Requests a prewarm run if the last one is older than the
+        interval, to be called while Kodi is idle"""
+        if time() - self.last_run >= self.interval:
+            self.schedule()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            if self._stopped:
+                return
+            self._pending.clear()
+            started = time()
+            # pylint: disable=broad-except
+            try:
+                self.warm()
+            except Exception:
+                exc = sys.exc_info()
+                self.nx_common.log(
+                    msg='[NS] Prewarming failed: ' + str(exc[1]))
+            self.last_run = time()
+            self.nx_common.log(msg='[NS] Prewarming took {:.2f}s'.format(
+                self.last_run - started))
+
+    def warm(self):
+        """Fetches the lolomo & the first page of every user list"""
+        guid = self.res_handler.netflix_session.user_data.get('guid')
+        if not guid:
+            return
+        # mirror the params Navigation sends, they are part of the cache key
+        video_list_ids = self.res_handler.fetch_video_list_ids({
+            'guid': [guid],
+            'refresh': ['true']})
+        if 'error' in video_list_ids:
+            return
+        list_from, list_to = first_page_range()
+        for user_list in video_list_ids.get('user', {}).values():
+            if self._stopped:
+                return
+            self.res_handler.fetch_video_list({
+                'list_id': [str(user_list['id'])],
+                'list_from': [str(list_from)],
+                'list_to': [str(list_to)],
+                'guid': [guid],
+                'refresh': ['true']})
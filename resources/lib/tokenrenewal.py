@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Module: tokenrenewal
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Renews the MSL master token in the background while Kodi is idle"""
+
+import sys
+import threading
+from time import time
+
+# seconds between two checks of the master token while Kodi is idle
+RENEWAL_CHECK_INTERVAL = 900
+# the token is renewed once it expires within this many seconds
+RENEWAL_MARGIN = 24 * 60 * 60
+
+
+class MasterTokenRenewal(object):
+    """
+    Performs the key handshake on a worker thread well before the master
+    token expires, so the handshake of an expired token never delays the
+    manifest or license request of a playback.
+
+    Checks the token periodically while Kodi is idle.
+    """
+
+    def __init__(self, nx_common, msl_handler,
+                 interval=RENEWAL_CHECK_INTERVAL, margin=RENEWAL_MARGIN):
+        """
+        Parameters
+        ----------
+        nx_common : :obj:`NetflixCommon`
+            instance of the NetflixCommon class
+
+        msl_handler : :obj:`MSL`
+            MSL handler whose master token gets renewed
+
+        interval : :obj:`int`
+            Minimum seconds between two idle checks
+
+        margin : :obj:`int`
+            Seconds before the expiry of the token it gets renewed
+        """
+        self.nx_common = nx_common
+        self.msl_handler = msl_handler
+        self.interval = interval
+        self.margin = margin
+        self.last_check = 0
+        self._pending = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name='MasterTokenRenewal')
+        self._thread.daemon = True
+
+    def start(self):
+        """Starts the worker thread"""
+        self._thread.start()
+
+    def stop(self):
+        """Stops the worker thread (an ongoing handshake is finished)"""
+        self._stopped = True
+        self._pending.set()
+        # the service may stop before it started everything
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def schedule(self):
+        """Requests a check of the master token"""
+        self._pending.set()
+
+    def on_idle(self):
+        """Requests a check if the last one is older than the interval,
+        to be called while Kodi is idle"""
+        if time() - self.last_check >= self.interval:
+            self.last_check = time()
+            self.schedule()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            if self._stopped:
+                return
+            self._pending.clear()
+            # pylint: disable=broad-except
+            try:
+                self.renew()
+            except Exception:
+                exc = sys.exc_info()
+                self.nx_common.log(
+                    msg='[MSL] Renewing the master token failed: ' +
+                    str(exc[1]))
+
+    def renew(self):
+        """
+        Performs the key handshake if the master token is due
+
+        Returns
+        -------
+        bool
+            A handshake has been performed
+        """
+        if not self.msl_handler.master_token_renewal_due(self.margin):
+            return False
+        started = time()
+        self.msl_handler.perform_key_handshake()
+        self.nx_common.log(msg='[MSL] Renewed the master token in {:.2f}s'
+                           .format(time() - started))
+        return True
@@ -149,3 +149,21 @@ def find_episode(episode_id, seasons):
             if str(episode['id']) == episode_id:
                 return episode
     return {}
+
+
+def find_next_episode(episode_id, seasons):
+    """
+    Return metadata for the episode following a specific episode
+    (the first episode of the next season after a season finale) from
+    within a nested metadata dict.
+    Returns an empty dict if there is no next episode.
+    """
+    episodes = [
+        episode
+        for season in sorted(seasons, key=lambda s: s.get('seq', 0))
+        for episode in sorted(season['episodes'],
+                              key=lambda e: e.get('seq', 0))]
+    for index, episode in enumerate(episodes[:-1]):
+        if str(episode['id']) == episode_id:
+            return episodes[index + 1]
+    return {}
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Module: videolist
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Compact video list entries & their serialization for the service"""
+
+import json
+from collections import OrderedDict
+
+# fields of a parsed video list entry, in serialization order
+VIDEO_LIST_ENTRY_FIELDS = (
+    'id', 'list_id', 'title', 'synopsis', 'regular_synopsis', 'type',
+    'rating', 'episode_count', 'seasons_label', 'seasons_count',
+    'in_my_list', 'year', 'runtime', 'watched', 'tags', 'genres', 'quality',
+    'cast', 'directors', 'creators', 'maturity', 'boxarts',
+    'interesting_moment', 'artwork', 'clearlogo')
+
+
+class VideoListEntry(object):
+    """
+    Parsed video list entry with a fixed set of fields
+    (see VIDEO_LIST_ENTRY_FIELDS), supports read only dict style access.
+
+    Entries are not changed once parsed, so their JSON encoding is
+    computed once & reused every time a cached list is served.
+    """
+    __slots__ = VIDEO_LIST_ENTRY_FIELDS + ('_json',)
+
+    def __init__(self, **fields):
+        """
+        Parameters
+        ----------
+        fields : mixed
+            Values of the entry fields, missing fields are None
+        """
+        for field in VIDEO_LIST_ENTRY_FIELDS:
+            setattr(self, field, fields.pop(field, None))
+        if fields:
+            raise TypeError('Unknown video list entry fields: {}'.format(
+                ', '.join(fields)))
+        self._json = None
+
+    def __getitem__(self, field):
+        if field not in VIDEO_LIST_ENTRY_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __contains__(self, field):
+        return field in VIDEO_LIST_ENTRY_FIELDS
+
+    def __eq__(self, other):
+        if not isinstance(other, VideoListEntry):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def get(self, field, default=None):
+        """Returns the value of a field or `default` for unknown fields"""
+        if field not in VIDEO_LIST_ENTRY_FIELDS:
+            return default
+        return getattr(self, field)
+
+    def as_dict(self):
+        """Returns the entry as an OrderedDict"""
+        return OrderedDict(
+            (field, getattr(self, field)) for field in VIDEO_LIST_ENTRY_FIELDS)
+
+    def to_json(self):
+        """Returns the (memoized) JSON encoding of the entry"""
+        if self._json is None:
+            self._json = json.dumps(self.as_dict())
+        return self._json
+
+
+class VideoList(OrderedDict):
+    """Video list entries by video id, in list order"""
+
+
+def _encode_default(value):
+    if isinstance(value, VideoListEntry):
+        return value.as_dict()
+    raise TypeError(repr(value) + ' is not JSON serializable')
+
+
+def iter_json(value):
+    """
+    Yields the JSON encoding of a value in pieces, entries of a
+    VideoList are not encoded again but written as they are
+
+    Parameters
+    ----------
+    value : mixed
+        Value to encode, may contain VideoListEntry objects
+
+    Returns
+    -------
+    generator of :obj:`str`
+        JSON encoded pieces
+    """
+    if not isinstance(value, VideoList):
+        yield json.dumps(value, default=_encode_default)
+        return
+    separator = '{'
+    for video_id, entry in value.items():
+        yield separator + json.dumps(video_id) + ': '
+        yield entry.to_json()
+        separator = ', '
+    yield '}' if separator == ', ' else '{}'
+
+
+def iter_response_body(method, result):
+    """
+    Yields the encoded pieces of a service RPC response
+
+    Parameters
+    ----------
+    method : :obj:`str`
+        Called method
+
+    result : mixed
+        Result of the called method
+
+    Returns
+    -------
+    generator of :obj:`bytes`
+        ASCII encoded JSON pieces
+    """
+    yield ('{"method": ' + json.dumps(method) + ', "result": ').encode()
+    for piece in iter_json(result):
+        yield piece.encode()
+    yield b'}'
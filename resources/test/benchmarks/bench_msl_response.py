@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Module: benchmarks.bench_msl_response
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""
+Decode time & peak memory of an encrypted chunked MSL manifest response
+
+Compares splitting the whole response text & decrypting the collected
+chunks (what MSL did before) with the streaming `MSLResponseDecoder`,
+which verifies the signature of every chunk on top.
+Without arguments a manifest response of a title with many tracks is
+recorded with random keys, a recorded response can be passed together
+with the `msl_data.json` of the session it was recorded in:
+`python -m resources.test.benchmarks.bench_msl_response response msl_data`.
+Needs pycryptodome, run with `make bench`
+"""
+
+from __future__ import print_function
+
+import re
+import os
+import sys
+import json
+import zlib
+import base64
+import hashlib
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from Cryptodome.Cipher import AES
+from Cryptodome.Hash import HMAC, SHA256
+from Cryptodome.Util import Padding
+
+from resources.lib.mslstream import CHUNK_SIZE, MSLResponseDecoder
+from resources.test.benchmarks.common import measure, report
+
+# bytes of the manifest per payload chunk, as sent by Netflix
+PAYLOAD_CHUNK_SIZE = 16384
+CDN_URL = ('https://ipv4-c{:03d}-x.1.nflxvideo.net/range/?o=1&v=3&e=1600000000'
+           '&t={}')
+
+
+def manifest(tracks=24, streams=14):
+    """Builds a manifest like response of a title with many tracks"""
+    def token(*args):
+        # urls & ids are unique per stream, they hardly compress
+        return hashlib.sha256(repr(args).encode('utf-8')).hexdigest()
+
+    def track(kind, index):
+        return {
+            'id': '{}-{}'.format(kind, index), 'type': kind,
+            'language': 'lang{}'.format(index),
+            'streams': [{
+                'downloadable_id': token(kind, index, stream),
+                'bitrate': 100 * stream, 'size': 1000000 * stream,
+                'content_profile': 'playready-h264mpl40-dash',
+                'sidx': {'offset': 0, 'size': 4000},
+                'urls': [{'cdn_id': cdn, 'url': CDN_URL.format(
+                    cdn, token(kind, index, stream, cdn))}
+                         for cdn in range(3)]}
+                        for stream in range(streams)]}
+    return {'result': {
+        'movieId': 80001, 'duration': 5400000,
+        'links': {'license': {'href': '/license?licenseType=standard'}},
+        'playbackContextId': 'E1-' + 'A' * 400, 'drmContextId': 'E1-' + 'B' * 200,
+        'video_tracks': [track('video', 0)],
+        'audio_tracks': [track('audio', index) for index in range(tracks)],
+        'timedtexttracks': [track('text', index) for index in range(tracks)]}}
+
+
+def record(result, encryption_key, sign_key):
+    """Encrypts a result like the MSL API does"""
+    def b64(data):
+        return base64.standard_b64encode(data).decode('ascii')
+    body = json.dumps(result).encode('utf-8')
+    # the master token is the last member of the header
+    chunks = ['{{"headerdata":"{}","signature":"{}","mastertoken":{}}}'.format(
+        b64(b'{}'), b64(b'\0' * 32),
+        json.dumps({'tokendata': b64(b'{}'), 'signature': b64(b'\0' * 32)},
+                   separators=(',', ':')))]
+    for offset in range(0, len(body), PAYLOAD_CHUNK_SIZE):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        data = compressor.compress(body[offset:offset + PAYLOAD_CHUNK_SIZE])
+        data += compressor.flush()
+        plaintext = json.dumps({
+            'messageid': 1, 'sequencenumber': len(chunks),
+            'compressionalgo': 'GZIP', 'data': b64(data)}).encode('utf-8')
+        iv = os.urandom(16)
+        cipher = AES.new(encryption_key, AES.MODE_CBC, iv)
+        envelope = json.dumps({
+            'keyid': 'ESN_1', 'sha256': 'AA==', 'iv': b64(iv),
+            'ciphertext': b64(cipher.encrypt(Padding.pad(plaintext, 16)))
+        }).encode('utf-8')
+        signature = HMAC.new(sign_key, envelope, SHA256).digest()
+        chunks.append('{{"payload":"{}","signature":"{}"}}'.format(
+            b64(envelope), b64(signature)))
+    return ''.join(chunks).encode('utf-8')
+
+
+def decrypter(encryption_key):
+    """Returns the decrypt function of MSLCrypto"""
+    def decrypt(iv, data):
+        cipher = AES.new(encryption_key, AES.MODE_CBC, iv)
+        return Padding.unpad(cipher.decrypt(data), 16)
+    return decrypt
+
+
+def verifier(sign_key):
+    """Returns the verify function of MSLCrypto"""
+    def verify(message, signature):
+        try:
+            HMAC.new(sign_key, message, SHA256).verify(signature)
+        except ValueError:
+            return False
+        return True
+    return verify
+
+
+def chunks(body):
+    """Yields the body in socket sized chunks"""
+    for offset in range(0, len(body), CHUNK_SIZE):
+        yield body[offset:offset + CHUNK_SIZE]
+
+
+def decode_whole(body, decrypt):
+    """Decodes the response like MSL did before the streaming decoder"""
+    message = b''.join(chunks(body)).decode('utf-8')
+    payloads = re.split(',\"signature\":\"[0-9A-Za-z=/+]+\"}',
+                        message.split('}}')[1])
+    payloads = [x + '}' for x in payloads][:-1]
+    decrypted_payload = b''
+    for chunk in payloads:
+        payload = json.loads(chunk).get('payload')
+        envelope = json.loads(base64.standard_b64decode(payload))
+        plaintext = json.loads(decrypt(
+            base64.standard_b64decode(envelope['iv']),
+            base64.standard_b64decode(envelope.get('ciphertext'))))
+        data = base64.standard_b64decode(plaintext.get('data'))
+        if plaintext.get('compressionalgo') == 'GZIP':
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        decrypted_payload += data
+    return json.loads(decrypted_payload)
+
+
+def decode_streamed(body, decrypt, verify):
+    """Decodes the response like MSL does"""
+    decoder = MSLResponseDecoder(
+        decrypt=decrypt, verify=verify, size_hint=len(body))
+    return decoder.decode(chunks(body))
+
+
+def peak_memory(func):
+    """Returns the peak of the memory allocated by `func` in KB"""
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak / 1024.0
+
+
+def main():
+    """Runs the benchmark"""
+    if len(sys.argv) == 3:
+        with open(sys.argv[1], 'rb') as response_file:
+            body = response_file.read()
+        with open(sys.argv[2], 'r') as msl_data_file:
+            msl_data = json.load(msl_data_file)
+        encryption_key = base64.standard_b64decode(msl_data['encryption_key'])
+        sign_key = base64.standard_b64decode(msl_data['sign_key'])
+        title = 'recorded manifest response'
+    else:
+        encryption_key = os.urandom(16)
+        sign_key = os.urandom(32)
+        body = record(manifest(), encryption_key, sign_key)
+        title = 'manifest response'
+    decrypt = decrypter(encryption_key)
+    verify = verifier(sign_key)
+    assert decode_whole(body, decrypt) == decode_streamed(body, decrypt, verify)
+    title += ' ({} KB)'.format(len(body) // 1024)
+    report(title + ' decode time', [
+        ('whole response', measure(
+            lambda: decode_whole(body, decrypt), number=5), 'ms'),
+        ('streamed', measure(
+            lambda: decode_streamed(body, decrypt, verify), number=5), 'ms')])
+    if tracemalloc is not None:
+        report(title + ' peak memory', [
+            ('whole response', peak_memory(
+                lambda: decode_whole(body, decrypt)), 'KB'),
+            ('streamed', peak_memory(
+                lambda: decode_streamed(body, decrypt, verify)), 'KB')])
+
+
+if __name__ == '__main__':
+    main()
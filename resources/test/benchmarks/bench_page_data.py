@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Module: benchmarks.bench_page_data
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""
+Extraction time of the inline reactContext & falcorCache page objects
+
+Compares the former extraction (the page is decoded, then a DOTALL regex,
+two replace passes & an unicode_escape round trip per object) with the
+single pass scanner. Runs against a generated page of the size of
+/browse, saved pages (f.e. the `raw_content` debug dump of
+NetflixSession) can be passed as arguments. Run with `make bench` or
+`python -m resources.test.benchmarks.bench_page_data [page ...]`
+"""
+
+from __future__ import print_function
+
+import re
+import sys
+import json
+
+from resources.lib.pagedata import extract_page_data
+from resources.test.benchmarks.common import measure, report
+
+NAMES = ['reactContext', 'falcorCache']
+
+
+def legacy_extract_json(content, name):
+    """Extracts an object like the former NetflixSession.extract_json"""
+    json_array = re.compile(
+        r"netflix\.%s\s*=\s*(.*?);\s*</script>" % name,
+        re.DOTALL).findall(content)
+    if not json_array:
+        return {}
+    json_str = json_array[0]
+    json_str = json_str.replace('\"', '\\"')
+    json_str = json_str.replace('\\s', '\\\\s')
+    json_str = json_str.encode().decode('unicode_escape')
+    return json.loads(json_str, strict=False)
+
+
+def legacy_extract(content):
+    """Extracts both objects like the former NetflixSession did"""
+    content = content.decode('utf-8')
+    return dict((name, legacy_extract_json(content, name)) for name in NAMES)
+
+
+def generated_page(videos=1500):
+    """Builds a page with about the size & escaping of /browse"""
+    react_context = {'models': {
+        'userInfo': {'data': {
+            'authURL': '1234567890.abcdefghij/klmnop=', 'guid': 'GUID'}},
+        'serverDefs': {'data': dict(
+            ('flag{}'.format(flag), 'value/{}'.format(flag))
+            for flag in range(500))}}}
+    falcor_cache = {
+        'profiles': {'GUID': {'summary': {'value': {'firstName': 'Bench'}}}},
+        'videos': dict(
+            (str(80000000 + video), {
+                'title': {'value': 'Title {}'.format(video)},
+                'synopsis': {'value': 'A "quoted" synopsis / {}'.format(
+                    video)}})
+            for video in range(videos))}
+    scripts = []
+    for name, value in [('reactContext', react_context),
+                        ('falcorCache', falcor_cache)]:
+        # the pages escape slashes & blanks in strings as \xNN
+        literal = json.dumps(value, separators=(',', ':')).replace(
+            '/', '\\x2F').replace(' ', '\\x20')
+        scripts.append('<script>netflix.{} = {};</script>'.format(
+            name, literal))
+    filler = '<div class="row">{}</div>'.format('x' * 200) * 500
+    return ('<html><head><script>window.netflix = window.netflix || {} ;'
+            '</script></head><body>' + filler + ''.join(scripts) + filler +
+            '</body></html>').encode('utf-8')
+
+
+def main(files):
+    """Runs the benchmark"""
+    pages = [('generated page', generated_page())]
+    for filename in files:
+        with open(filename, 'rb') as page:
+            pages.append((filename, page.read()))
+    for name, content in pages:
+        assert legacy_extract(content) == extract_page_data(content, NAMES)
+        report('{} ({} KB)'.format(name, len(content) // 1024), [
+            ('legacy', measure(lambda: legacy_extract(content), number=5),
+             'ms'),
+            ('single pass', measure(
+                lambda: extract_page_data(content, NAMES), number=5), 'ms')])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Module: benchmarks.bench_path_requests
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""
+Size & build time of the pathEvaluator request bodies
+
+Compares the former body (one `path=` parameter per path, built by
+repeated string concatenation) with collapsed path sets encoded in one
+pass, for the paths the `fetch_*` methods of NetflixSession send and for a
+large batch of video paths. Run with `make bench` or
+`python -m resources.test.benchmarks.bench_path_requests`
+"""
+
+from __future__ import print_function
+
+import json
+
+from resources.lib.falcor import collapse_paths, encode_path_request
+from resources.lib.NetflixSession import NetflixSession
+from resources.test.benchmarks.common import measure, report
+
+AUTH_URL = '1234567890123.abcdefghijklmnopqrstuvwxyz0123456789ABCD='
+VIDEO_FIELDS = ['title', 'synopsis', 'regularSynopsis', 'evidence',
+                'releaseYear', 'maturity', 'runtime', 'userRating']
+
+
+def legacy_body(paths, auth_url=AUTH_URL):
+    """Builds the body like the former NetflixSession._path_request"""
+    data = ''
+    for path in paths:
+        data = data + 'path=' + json.dumps(path) + '&'
+    return data + 'authURL=' + auth_url
+
+
+def collapsed_body(paths, auth_url=AUTH_URL):
+    """Builds the body like the current NetflixSession._send_path_request"""
+    return encode_path_request(
+        paths=collapse_paths(paths),
+        auth_url=auth_url)
+
+
+def captured_paths():
+    """Returns the paths the fetch_* methods of NetflixSession send"""
+    session = NetflixSession.__new__(NetflixSession)
+    captured = []
+    session._path_request = lambda paths: captured.append(paths)
+    session._process_response = lambda response, component: response
+    calls = [
+        ('fetch_video_list_ids', lambda: session.fetch_video_list_ids()),
+        ('fetch_video_list', lambda: session.fetch_video_list(
+            list_id='list', list_from=0, list_to=26)),
+        ('fetch_search_results', lambda: session.fetch_search_results(
+            search_str='search')),
+        ('fetch_seasons_for_show', lambda: session.fetch_seasons_for_show(
+            id='80000000')),
+        ('fetch_episodes_by_season', lambda: session.fetch_episodes_by_season(
+            season_id='80000001')),
+    ]
+    result = []
+    for name, call in calls:
+        del captured[:]
+        call()
+        result.append((name, captured[0]))
+    return result
+
+
+def video_paths(count=500):
+    """Returns one path per field of `count` videos"""
+    return [['videos', str(80000000 + video), field]
+            for video in range(count)
+            for field in VIDEO_FIELDS]
+
+
+def main():
+    """Runs the benchmark"""
+    requests = captured_paths()
+    requests.append(('{} video paths'.format(len(video_paths())),
+                     video_paths()))
+    for name, paths in requests:
+        legacy = legacy_body(paths)
+        collapsed = collapsed_body(paths)
+        title = '{} ({} paths -> {} path sets)'.format(
+            name, len(paths), len(collapse_paths(paths)))
+        report(title + ' body size', [
+            ('legacy', len(legacy), 'B'),
+            ('collapsed', len(collapsed), 'B')])
+        report(title + ' build time', [
+            ('legacy', measure(lambda: legacy_body(paths)), 'ms'),
+            ('encoded', measure(
+                lambda: encode_path_request(paths, AUTH_URL)), 'ms'),
+            ('collapsed', measure(lambda: collapsed_body(paths)), 'ms')])
+
+
+if __name__ == '__main__':
+    main()
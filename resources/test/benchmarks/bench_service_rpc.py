@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Module: benchmarks.bench_service_rpc
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""
+Per call latency of the plugin -> Netflix service loopback RPC
+
+Compares the former transport (HTTP/1.0 service, new urllib opener &
+TCP connection per call) with a keep-alive connection to the HTTP/1.1
+service. Run with `make bench` or
+`python -m resources.test.benchmarks.bench_service_rpc`
+"""
+
+import json
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler
+    from http.client import HTTPConnection
+    import urllib.request as Request
+    from urllib.parse import urlencode
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from httplib import HTTPConnection
+    from urllib import urlencode
+    import urllib2 as Request
+
+try:
+    from socketserver import TCPServer
+except ImportError:
+    from SocketServer import TCPServer
+
+from resources.lib.concurrency import ThreadPoolMixIn
+from resources.test.benchmarks.common import measure, report
+
+RESULT = {'guid': 'ABCDEFGHIJ', 'profileName': 'Bench', 'isKids': False}
+QUERY = '/?' + urlencode({'method': 'get_user_data'})
+
+
+class LegacyHandler(BaseHTTPRequestHandler):
+    """Serializes responses like the former NetflixHttpRequestHandler"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({
+            'method': 'get_user_data',
+            'result': RESULT}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class KeepAliveHandler(LegacyHandler):
+    """Serializes responses like the current NetflixHttpRequestHandler"""
+    protocol_version = 'HTTP/1.1'
+    timeout = 5
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_GET(self):
+        body = json.dumps({
+            'method': 'get_user_data',
+            'result': RESULT}).encode()
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BenchServer(ThreadPoolMixIn, TCPServer):
+    allow_reuse_address = True
+    pool_size = 4
+
+
+def _serve(handler):
+    server = BenchServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main():
+    legacy = _serve(LegacyHandler)
+    keep_alive = _serve(KeepAliveHandler)
+    legacy_url = 'http://127.0.0.1:{}{}'.format(
+        legacy.server_address[1], QUERY)
+    connection = HTTPConnection('127.0.0.1', keep_alive.server_address[1])
+
+    def legacy_call():
+        opener = Request.build_opener(Request.ProxyHandler({}))
+        Request.install_opener(opener)
+        json.loads(Request.urlopen(legacy_url).read())
+
+    def keep_alive_call():
+        connection.request('GET', QUERY)
+        json.loads(connection.getresponse().read())
+
+    report('Netflix service RPC latency (per call)', [
+        ('HTTP/1.0, new connection per call', measure(legacy_call), 'ms'),
+        ('HTTP/1.1 keep-alive', measure(keep_alive_call), 'ms')])
+
+    connection.close()
+    for server in (legacy, keep_alive):
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
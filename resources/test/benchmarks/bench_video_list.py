@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Module: benchmarks.bench_video_list
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""
+Memory & serialization cost of parsed video lists in the service
+
+Compares the former dict entries (emulated from the parsed entries,
+collected with OrderedDict.update) with the compact VideoListEntry objects
+for a 108 title list: the memory the cached list takes & the time to
+encode the RPC response every time the list is served from the cache.
+Memory is only reported where tracemalloc is available (Python 3).
+Run with `make bench` or `python -m resources.test.benchmarks.bench_video_list`
+"""
+
+from __future__ import print_function
+
+import json
+from collections import OrderedDict
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from resources.lib.NetflixSession import NetflixSession
+from resources.lib.videolist import iter_response_body
+from resources.test.benchmarks.common import measure, report
+
+ART = 'https://occ-0-1-2.1.nflxso.net/dnm/api/v6/{}/AAAABQ{}.jpg'
+
+
+def video_list_response(videos=108):
+    """Builds a fetch_video_list like response graph"""
+    graph = {'videos': {}, 'person': {}, 'genres': {}, 'lists': {'L': {}}}
+    for index in range(videos):
+        video_id = str(80000000 + index)
+        cast = dict(
+            (str(member), ['person', str(index * 20 + member)])
+            for member in range(16))
+        for member in range(20):
+            graph['person'][str(index * 20 + member)] = {
+                'id': index * 20 + member,
+                'name': u'P\xe9rson {}'.format(member)}
+        graph['lists']['L'][str(index)] = {'reference': ['videos', video_id]}
+        graph['videos'][video_id] = {
+            'title': u'Title – {}'.format(index),
+            'synopsis': 'A synopsis of title {} '.format(index) * 8,
+            'regularSynopsis': 'A synopsis of title {} '.format(index) * 8,
+            'summary': {'id': int(video_id), 'type': 'show'},
+            'maturity': {'rating': {'value': '12', 'maturityLevel': 80}},
+            'userRating': {'average': 3.9, 'type': 'star'},
+            'queue': {'inQueue': False}, 'watched': False,
+            'releaseYear': 2018, 'runtime': 1387,
+            'episodeCount': 24, 'seasonCount': 3,
+            'numSeasonsLabel': '3 Seasons',
+            'delivery': {'hasHD': True, 'hasUltraHD': False},
+            'cast': cast,
+            'genres': dict((str(g), ['genres', str(g)]) for g in range(6)),
+            'tags': dict((str(t), {'id': t, 'name': 'Tag {}'.format(t)})
+                         for t in range(10)),
+            'boxarts': dict((size, {'jpg': {'url': ART.format(size, index)}})
+                            for size in ['_342x192', '_665x375', '_1280x720']),
+            'interestingMoment': dict(
+                (size, {'jpg': {'url': ART.format(size, index)}})
+                for size in ['_665x375', '_1920x1080']),
+            'BGImages': {'1080': {'jpg': [{'url': ART.format(1080, index)}]}},
+            'storyarts': {'_1632x873': {'jpg': {
+                'url': ART.format(1632, index)}}}}
+    for genre in range(6):
+        graph['genres'][str(genre)] = {'name': 'Genre {}'.format(genre)}
+    return json.dumps({'value': graph}).encode('utf-8')
+
+
+def legacy_parse(session, response_data):
+    """Collects dict entries like the former parse_video_list"""
+    video_list = OrderedDict()
+    for entry in session.iter_video_list(response_data):
+        video_list.update({entry.id: dict(entry.as_dict())})
+    return video_list
+
+
+def legacy_body(video_list):
+    """Encodes the response like the former NetflixHttpRequestHandler"""
+    return json.dumps({
+        'method': 'fetch_video_list',
+        'result': video_list}).encode()
+
+
+def compact_body(video_list):
+    """Encodes the response like the current NetflixHttpRequestHandler"""
+    return b''.join(iter_response_body('fetch_video_list', video_list))
+
+
+def allocated(func):
+    """Returns the memory still allocated by the result of `func` in KB"""
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1024.0
+
+
+def main():
+    """Runs the benchmark"""
+    session = NetflixSession.__new__(NetflixSession)
+    response_data = json.loads(video_list_response().decode('utf-8'))
+    legacy = legacy_parse(session, response_data)
+    compact = session.parse_video_list(response_data)
+    title = 'fetch_video_list ({} titles)'.format(len(compact))
+    report(title + ' encode cached list', [
+        ('dict entries', measure(lambda: legacy_body(legacy)), 'ms'),
+        ('compact entries', measure(lambda: compact_body(compact)), 'ms')])
+    if tracemalloc is not None:
+        report(title + ' cached list size', [
+            ('dict entries', allocated(
+                lambda: legacy_parse(session, response_data)), 'KB'),
+            ('compact entries', allocated(
+                lambda: session.parse_video_list(response_data)), 'KB')])
+
+
+if __name__ == '__main__':
+    main()
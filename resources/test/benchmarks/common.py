@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Module: benchmarks.common
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Helpers shared by the micro benchmarks"""
+
+from __future__ import print_function
+
+import timeit
+
+
+def measure(func, number=100, repeat=5):
+    """
+    Runs `func` `number` times, `repeat` times over
+    and returns the best time per call in milliseconds
+    """
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    return min(timings) / number * 1000
+
+
+def report(title, results):
+    """
+    Prints a table of (label, value, unit) tuples,
+    the first row is the baseline the others are compared against
+    """
+    print(title)
+    print('-' * len(title))
+    baseline = results[0][1]
+    for label, value, unit in results:
+        ratio = baseline / value if value else 0
+        print('{:<40} {:>12.3f} {:<4} {:>6.2f}x'.format(
+            label, value, unit, ratio))
+    print('')
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Module: BulkExport
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `bulkexport` module"""
+
+import threading
+import unittest
+from resources.lib.bulkexport import BulkWriter
+
+
+class BulkExportTestCase(unittest.TestCase):
+    """Tests for the `bulkexport` module"""
+
+    def test_writes_all_files(self):
+        """Every file is written, failed writes are collected"""
+        written = []
+        lock = threading.Lock()
+
+        def write(path, content):
+            if path == 'broken':
+                raise IOError(path)
+            with lock:
+                written.append((path, content))
+        files = [('S01E{:02d}.strm'.format(i), i) for i in range(30)]
+        writer = BulkWriter(write=write, size=3)
+        self.assertEqual(writer.run(files + [('broken', None)]), 30)
+        self.assertEqual(sorted(written), files)
+        self.assertEqual(len(writer.errors), 1)
+        self.assertEqual(writer.errors[0][0], ('broken', None))
+
+    def test_progress_is_throttled(self):
+        """Progress is reported on the interval & once all are written"""
+        progress = []
+        writer = BulkWriter(
+            write=lambda index: threading.Event().wait(0.002),
+            size=2, progress_interval=10)
+        writer.run([(i,) for i in range(50)],
+                   on_progress=lambda done, total: progress.append(
+                       (done, total)))
+        self.assertEqual(progress, [(50, 50)])
+        self.assertEqual(BulkWriter(write=None).run([]), 0)
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+# Module: Cache
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `cache` module"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from time import sleep, time
+from resources.lib.cache import (
+    ManifestCache, MetadataCache, WindowCache, ResponseCache,
+    manifest_expiry)
+
+
+class MockWindow(dict):
+    def getProperty(self, key):
+        return self.get(key, '')
+
+    def setProperty(self, key, value):
+        self[key] = value
+
+    def clearProperty(self, key):
+        self.pop(key, None)
+
+
+class WindowCacheTestCase(unittest.TestCase):
+    """Tests for the `WindowCache` class"""
+
+    def test_get_returns_added_item(self):
+        """Entries can be read back"""
+        cache = WindowCache(window=MockWindow(), max_bytes=1024, ttl=60)
+        cache.add('foo', {'bar': [1, 2]})
+        self.assertEqual(cache.get('foo'), {'bar': [1, 2]})
+        self.assertIsNone(cache.get('baz'))
+
+    def test_evicts_least_recently_used(self):
+        """Exceeding the byte budget drops the least recently used entry"""
+        cache = WindowCache(window=MockWindow(), max_bytes=200, ttl=60)
+        cache.add('a', 'a' * 80)
+        cache.add('b', 'b' * 80)
+        cache.get('a')
+        cache.add('c', 'c' * 80)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'a' * 80)
+        self.assertEqual(cache.get('c'), 'c' * 80)
+
+    def test_expired_entries_are_dropped(self):
+        """Entries are not returned after their ttl"""
+        window = MockWindow()
+        cache = WindowCache(window=window, max_bytes=1024, ttl=60)
+        cache.add('foo', 'bar', ttl=-1)
+        self.assertIsNone(cache.get('foo'))
+        self.assertEqual(len(window), 1)
+
+    def test_clear_removes_all_properties(self):
+        """Clearing the cache leaves no window properties behind"""
+        window = MockWindow()
+        cache = WindowCache(window=window, max_bytes=1024, ttl=60)
+        cache.add('foo', 'bar')
+        cache.add('baz', 'qux')
+        cache.clear()
+        self.assertEqual(window, {})
+
+    def test_lost_index_updates_leave_no_orphans(self):
+        """Entries missing from an overwritten index are cleared"""
+        window = MockWindow()
+        cache = WindowCache(window=window, max_bytes=1024, ttl=60)
+        cache.add('foo', 'bar')
+        index = window['memcache.index']
+        cache.add('baz', 'qux')
+        # another process saves the index it loaded before 'baz' was added
+        window['memcache.index'] = index
+        cache.add('quux', 'corge')
+        self.assertIsNone(cache.get('baz'))
+        self.assertEqual(len(window), 3)
+
+    def test_full_slots_evict_least_recently_used(self):
+        """Once all slots are taken the least recently used entry goes"""
+        cache = WindowCache(
+            window=MockWindow(), max_bytes=1024, ttl=60, slots=3)
+        for key in 'abc':
+            cache.add(key, key)
+        cache.get('a')
+        cache.add('d', 'd')
+        self.assertIsNone(cache.get('b'))
+        for key in 'acd':
+            self.assertEqual(cache.get(key), key)
+
+    def test_add_only_writes_its_slot(self):
+        """Adding an entry doesn't touch the slots of other entries"""
+        window = MockWindow()
+        cache = WindowCache(window=window, max_bytes=1024, ttl=60)
+        cache.add('foo', 'bar')
+        cleared = []
+        window.clearProperty = cleared.append
+        cache.add('baz', 'qux')
+        self.assertEqual(cleared, [])
+        self.assertEqual(cache.get('foo'), 'bar')
+
+    def test_recent_hits_dont_write_the_index(self):
+        """Hits of recently used entries leave the index as it is"""
+        window = MockWindow()
+        cache = WindowCache(window=window, max_bytes=1024, ttl=60)
+        for key in 'abcd':
+            cache.add(key, key)
+        index = window['memcache.index']
+        self.assertEqual(cache.get('d'), 'd')
+        self.assertIs(window['memcache.index'], index)
+        self.assertEqual(cache.get('a'), 'a')
+        self.assertIsNot(window['memcache.index'], index)
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """Tests for the `ResponseCache` class"""
+
+    def test_get_honours_ttl(self):
+        """Expired entries are not returned"""
+        cache = ResponseCache()
+        cache.add(('foo',), 'bar', ttl=60)
+        cache.add(('baz',), 'qux', ttl=-1)
+        self.assertEqual(cache.get(('foo',)), 'bar')
+        self.assertIsNone(cache.get(('baz',)))
+
+    def test_evicts_least_recently_used(self):
+        """The oldest entry is dropped once max_entries is exceeded"""
+        cache = ResponseCache(max_entries=2)
+        cache.add('a', 1, ttl=60)
+        cache.add('b', 2, ttl=60)
+        cache.get('a')
+        cache.add('c', 3, ttl=60)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+    def test_invalidate_by_predicate(self):
+        """Only matching entries are invalidated"""
+        cache = ResponseCache()
+        cache.add(('fetch_video_list', 'guid'), [], ttl=60)
+        cache.add(('fetch_metadata', 'guid'), {}, ttl=60)
+        cache.invalidate(lambda key: key[0] == 'fetch_video_list')
+        self.assertIsNone(cache.get(('fetch_video_list', 'guid')))
+        self.assertEqual(cache.get(('fetch_metadata', 'guid')), {})
+
+
+def show_metadata(show_id, title='Show'):
+    return {'video': {
+        'id': show_id,
+        'type': 'show',
+        'title': title,
+        'seasons': [{'id': show_id + 1, 'episodes': [
+            {'id': show_id + 2}, {'id': show_id + 3}]}]}}
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    """Tests for the `MetadataCache` class"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.fetched = []
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def fetch(self, video_id, profile):
+        self.fetched.append(video_id)
+        return show_metadata(int(video_id) - 2, title=str(len(self.fetched)))
+
+    def test_episodes_share_the_show_entry(self):
+        """All episodes of a cached show are served without a fetch"""
+        cache = MetadataCache(path=self.path, fetch=self.fetch)
+        cache.get('102')
+        self.assertEqual(cache.get('103'), show_metadata(100, title='1'))
+        self.assertEqual(cache.get(100)['video']['id'], 100)
+        self.assertEqual(self.fetched, ['102'])
+
+    def test_entries_persist(self):
+        """A new cache instance reads the entries from disk"""
+        MetadataCache(path=self.path, fetch=self.fetch).get('102')
+        cache = MetadataCache(path=self.path, fetch=self.fetch)
+        self.assertEqual(cache.get('103')['video']['title'], '1')
+        self.assertEqual(self.fetched, ['102'])
+
+    def test_stale_entries_are_revalidated(self):
+        """Stale entries are served while they are fetched again"""
+        cache = MetadataCache(path=self.path, fetch=self.fetch, ttl=-1)
+        cache.get('102')
+        self.assertEqual(cache.get('102')['video']['title'], '1')
+        for _ in range(100):
+            if len(self.fetched) == 2 and not cache._revalidating:
+                break
+            sleep(0.01)
+        cache.ttl = 60
+        self.assertEqual(cache.get('102')['video']['title'], '2')
+
+    def test_entries_are_kept_per_profile(self):
+        """A profile never gets the metadata fetched for another one"""
+        cache = MetadataCache(path=self.path, fetch=self.fetch)
+        cache.get('102', profile='A')
+        self.assertEqual(cache.get('103', profile='B')['video']['title'], '2')
+        self.assertEqual(cache.get('103', profile='A')['video']['title'], '1')
+        self.assertEqual(self.fetched, ['102', '103'])
+
+    def test_old_stale_entries_are_fetched_again(self):
+        """Entries stale for longer than `max_stale` are not served"""
+        cache = MetadataCache(
+            path=self.path, fetch=self.fetch, ttl=-1, max_stale=0)
+        cache.get('102')
+        self.assertEqual(cache.get('102')['video']['title'], '2')
+
+    def test_refresh_replaces_the_entry(self):
+        """A refreshed entry is served without another fetch"""
+        cache = MetadataCache(path=self.path, fetch=self.fetch)
+        cache.get('102', profile='A')
+        cache.refresh('102', profile='A')
+        self.assertEqual(cache.get('103', profile='A')['video']['title'], '2')
+        self.assertEqual(self.fetched, ['102', '102'])
+
+    def test_evicts_least_recently_used(self):
+        """Exceeding the size limit drops the least recently used entry"""
+        size = len(json.dumps(show_metadata(100), separators=(',', ':')))
+        cache = MetadataCache(
+            path=self.path, fetch=self.fetch, max_bytes=size * 2)
+        cache.get('102')
+        cache.get('202')
+        cache.get('102')
+        cache.get('302')
+        cache.get('102')
+        cache.get('202')
+        self.assertEqual(self.fetched, ['102', '202', '302', '202'])
+
+
+def manifest(expires, duration=1000 * 1000):
+    url = 'https://ipv4-c001.1.nflxvideo.net/range/?o=1&v=3&e={}&t=x'
+    return {
+        'duration': duration,
+        'links': {'license': {'href': '/license?licenseType=standard'}},
+        'playbackContextId': 'context',
+        'drmContextId': 'drm',
+        'video_tracks': [{'streams': [
+            {'urls': [{'url': url.format(int(expires))}]}]}],
+        'audio_tracks': []}
+
+
+class ManifestCacheTestCase(unittest.TestCase):
+    """Tests for the `ManifestCache` class"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_expiry_follows_urls_and_duration(self):
+        """Urls have to outlive the playback of the whole title"""
+        expires = time() + 7200
+        self.assertEqual(
+            manifest_expiry(manifest(expires, duration=1000 * 1000)),
+            int(expires) - 1000 - 600)
+        data = manifest(expires, duration=0)
+        data['expiration'] = int(time() + 3600) * 1000
+        self.assertEqual(
+            manifest_expiry(data), int(time() + 3600) - 600)
+
+    def test_key_covers_capabilities_and_esn(self):
+        """Different capabilities or ESNs don't share an entry"""
+        key = ManifestCache.key(80001, 'ESN', True, False, False, False, True)
+        self.assertNotEqual(key, ManifestCache.key(
+            80001, 'ESN', True, True, False, False, True))
+        self.assertNotEqual(key, ManifestCache.key(
+            80001, 'ESN2', True, False, False, False, True))
+
+    def test_expired_manifests_are_not_served(self):
+        """Manifests with (nearly) expired urls are neither added nor served"""
+        cache = ManifestCache()
+        self.assertFalse(cache.add('a', manifest(time() + 1000)))
+        self.assertTrue(cache.add('b', manifest(time() + 7200)))
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b')['playbackContextId'], 'context')
+
+    def test_entries_persist(self):
+        """A new cache instance reads the manifests from disk"""
+        ManifestCache(path=self.path).add('a', manifest(time() + 7200))
+        cache = ManifestCache(path=self.path)
+        self.assertEqual(cache.get('a')['drmContextId'], 'drm')
+        cache.clear()
+        self.assertIsNone(ManifestCache(path=self.path).get('a'))
+
+    def test_files_follow_the_entries(self):
+        """Evicted & expired manifests don't stay on disk"""
+        cache = ManifestCache(path=self.path, max_entries=2)
+        for key in ['a', 'b', 'c']:
+            cache.add(key, manifest(time() + 7200))
+        self.assertEqual(len(os.listdir(self.path)), 2)
+        self.assertIsNone(ManifestCache(path=self.path).get('a'))
+        with open(os.path.join(self.path, 'expired.json'), 'w') as expired:
+            json.dump({'key': 'd', 'manifest': {}, 'expires': time() - 1},
+                      expired)
+        cache = ManifestCache(path=self.path)
+        self.assertEqual(
+            sorted(os.listdir(self.path)),
+            sorted(os.path.basename(cache._filename(key)) for key in 'bc'))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Module: Concurrency
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `concurrency` module"""
+
+import threading
+import unittest
+from time import sleep, time
+from resources.lib.concurrency import (
+    RateLimiter, ReadWriteLock, ThreadPool, read_locked, write_locked)
+
+
+class LockedResource(object):
+    def __init__(self):
+        self.lock = ReadWriteLock()
+        self.count_lock = threading.Lock()
+        self.readers = 0
+        self.max_readers = 0
+        self.barrier = threading.Event()
+
+    @read_locked
+    def read(self):
+        with self.count_lock:
+            self.readers += 1
+            self.max_readers = max(self.max_readers, self.readers)
+        self.barrier.wait(1)
+        with self.count_lock:
+            self.readers -= 1
+
+    @write_locked
+    def write(self):
+        return self.readers
+
+
+class ConcurrencyTestCase(unittest.TestCase):
+    """Tests for the `concurrency` module"""
+
+    def test_readers_share_the_lock(self):
+        """Several readers may hold the lock at once"""
+        resource = LockedResource()
+        threads = [threading.Thread(target=resource.read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        # the readers are only released once all of them got the lock
+        for _ in range(100):
+            if resource.max_readers == len(threads):
+                break
+            sleep(0.005)
+        resource.barrier.set()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(resource.max_readers, 2)
+        self.assertEqual(resource.readers, 0)
+
+    def test_writer_excludes_readers(self):
+        """A writer never sees a reader inside the critical section"""
+        resource = LockedResource()
+        reader = threading.Thread(target=resource.read)
+        reader.start()
+        resource.barrier.set()
+        self.assertEqual(resource.write(), 0)
+        reader.join()
+
+    def test_thread_pool_runs_all_tasks(self):
+        """Every submitted task is executed"""
+        results = []
+        pool = ThreadPool(size=4)
+        for index in range(20):
+            pool.submit(results.append, index)
+        pool.join()
+        pool.stop()
+        self.assertEqual(sorted(results), list(range(20)))
+
+    def test_rate_limiter_spaces_out_calls(self):
+        """Calls from several threads start an interval apart"""
+        limiter = RateLimiter(interval=0.02)
+        starts = []
+        pool = ThreadPool(size=4)
+        for _ in range(6):
+            pool.submit(lambda: starts.append(limiter.wait() or time()))
+        pool.join()
+        pool.stop()
+        starts.sort()
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        self.assertGreaterEqual(min(gaps), 0.015)
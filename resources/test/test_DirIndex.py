@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Module: DirIndex
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `dirindex` module"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from resources.lib.dirindex import DirectoryIndex
+
+
+class FakeFolders(object):
+    def __init__(self):
+        self.mtimes = {'shows/': 1000, 'shows/A/': 1000}
+        self.listings = {'shows/': (['A'], []), 'shows/A/': ([], ['S01E01'])}
+        self.listed = []
+
+    def listdir(self, path):
+        self.listed.append(path)
+        return self.listings[path]
+
+    def mtime(self, path):
+        return self.mtimes[path]
+
+
+class DirIndexTestCase(unittest.TestCase):
+    """Tests for the `dirindex` module"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'index.ndb')
+        self.folders = FakeFolders()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def index(self):
+        return DirectoryIndex(filename=self.filename,
+                              listdir=self.folders.listdir,
+                              mtime=self.folders.mtime)
+
+    def test_unchanged_folders_are_not_listed_again(self):
+        """Only folders whose mtime changed are listed after a restart"""
+        index = self.index()
+        self.assertEqual(index.listdir('shows/'), (['A'], []))
+        self.assertEqual(index.listdir('shows/A/'), ([], ['S01E01']))
+        index.save()
+        self.folders.mtimes['shows/A/'] = 2000
+        self.folders.listings['shows/A/'] = ([], ['S01E01', 'S01E02'])
+        index = self.index()
+        self.assertEqual(index.listdir('shows/'), (['A'], []))
+        self.assertEqual(index.listdir('shows/A/'),
+                         ([], ['S01E01', 'S01E02']))
+        self.assertEqual(self.folders.listed,
+                         ['shows/', 'shows/A/', 'shows/A/'])
+
+    def test_recently_changed_folders_are_not_kept(self):
+        """Listings of folders changed within the mtime slack are dropped"""
+        self.folders.mtimes['shows/'] = 0
+        index = self.index()
+        index.listdir('shows/')
+        index.listdir('shows/')
+        self.assertEqual(self.folders.listed, ['shows/', 'shows/'])
+
+    def test_retain(self):
+        """Listings of removed folders are dropped"""
+        index = self.index()
+        index.listdir('shows/')
+        index.listdir('shows/A/')
+        index.retain(['shows/'])
+        index.save()
+        index = self.index()
+        index.listdir('shows/A/', revalidate=False)
+        index.listdir('shows/', revalidate=False)
+        self.assertEqual(self.folders.listed,
+                         ['shows/', 'shows/A/', 'shows/A/'])
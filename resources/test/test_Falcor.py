@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Module: Falcor
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `falcor` module"""
+
+import threading
+import unittest
+from time import sleep
+from resources.lib.falcor import (
+    GraphResponse, PathRequestCoalescer, collapse_paths,
+    encode_path_request, expand_keys, extract_paths)
+
+GRAPH = {
+    'lists': {
+        'A': {
+            '0': {'reference': ['videos', '1']},
+            '1': {'reference': ['videos', '2']}},
+        'B': {
+            '0': {'reference': ['videos', '3']}}},
+    'videos': {
+        '$size': 3,
+        '1': {'title': 'One', 'cast': {'0': ['person', '9']},
+              'queue': {'inQueue': True}},
+        '2': {'title': 'Two', 'queue': {'inQueue': False}},
+        '3': {'title': 'Three', 'queue': {'inQueue': False}}},
+    'person': {
+        '9': {'name': 'Someone'}}
+}
+LIST_A = [
+    ['lists', ['A'], {'from': 0, 'to': 1}, 'reference', ['title']],
+    ['lists', ['A'], {'from': 0, 'to': 1}, 'reference',
+     'cast', {'from': 0, 'to': 5}, ['name']]]
+LIST_B = [['lists', ['B'], {'from': 0, 'to': 1}, 'reference', ['title']]]
+
+
+class FalcorTestCase(unittest.TestCase):
+    """Tests for the `falcor` module"""
+
+    def test_expand_keys(self):
+        """Key sets & ranges are expanded to graph keys"""
+        self.assertEqual(
+            expand_keys(['a', {'from': 1, 'to': 3}, 7]),
+            ['a', '1', '2', '3', '7'])
+
+    def test_extract_paths_follows_references(self):
+        """Only the requested parts of the graph are extracted"""
+        graph = extract_paths(GRAPH, LIST_A)
+        self.assertEqual(sorted(graph['videos'].keys()), ['$size', '1', '2'])
+        self.assertEqual(graph['person']['9']['name'], 'Someone')
+        self.assertNotIn('B', graph['lists'])
+
+    def test_collapse_paths_merges_siblings(self):
+        """Paths that only differ in one key are sent as one path set"""
+        video = ['lists', ['A'], {'from': 0, 'to': 26}, 'reference']
+        self.assertEqual(
+            collapse_paths([
+                video + [['title', 'synopsis']],
+                video + ['cast', {'from': 0, 'to': 15}, ['id', 'name']],
+                video + ['creators', {'from': 0, 'to': 15}, ['id', 'name']],
+                video + ['genres', {'from': 0, 'to': 5}, ['id', 'name']]]),
+            [['lists', 'A', {'from': 0, 'to': 26}, 'reference',
+              ['title', 'synopsis']],
+             ['lists', 'A', {'from': 0, 'to': 26}, 'reference',
+              ['cast', 'creators'], {'from': 0, 'to': 15}, ['id', 'name']],
+             ['lists', 'A', {'from': 0, 'to': 26}, 'reference',
+              'genres', {'from': 0, 'to': 5}, ['id', 'name']]])
+
+    def test_collapse_paths_builds_ranges(self):
+        """Contiguous indices are merged into ranges"""
+        self.assertEqual(
+            collapse_paths([
+                ['videos', '1', 'title'],
+                ['videos', '2', 'title'],
+                ['videos', 3, 'title'],
+                ['videos', '9', 'title'],
+                ['videos', '4', 'queue']]),
+            [['videos', [{'from': 1, 'to': 3}, '9'], 'title'],
+             ['videos', '4', 'queue']])
+
+    def test_encode_path_request(self):
+        """The form body lists every path followed by the authURL"""
+        self.assertEqual(
+            encode_path_request([['videos', ['1', '2'], 'title']], 'auth'),
+            'path=["videos",["1","2"],"title"]&authURL=auth')
+
+    def test_coalescer_splits_merged_response(self):
+        """Concurrent requests are merged & every caller gets its part"""
+        sent = []
+
+        def send(paths):
+            sent.append(paths)
+            sleep(0.1)
+            return GraphResponse(extract_paths(GRAPH, paths))
+
+        coalescer = PathRequestCoalescer(send=send)
+        results = {}
+
+        def request(name, paths):
+            results[name] = coalescer.request(paths).json()['value']
+
+        first = threading.Thread(target=request, args=('a', LIST_A))
+        first.start()
+        sleep(0.02)
+        others = [
+            threading.Thread(target=request, args=('b', LIST_B)),
+            threading.Thread(target=request, args=('c', LIST_A[:1]))]
+        for thread in others:
+            thread.start()
+        for thread in [first] + others:
+            thread.join()
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(sorted(results['b']['videos'].keys()), ['$size', '3'])
+        self.assertEqual(
+            sorted(results['c']['videos'].keys()), ['$size', '1', '2'])
+        self.assertNotIn('person', results['c'])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Module: LibraryDB
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `librarydb` module"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from resources.lib.librarydb import LibraryDB
+
+
+class LibraryDBTestCase(unittest.TestCase):
+    """Tests for the `librarydb` module"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'lib.db')
+        self.db = LibraryDB(path=self.path)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.folder)
+
+    def test_shows(self):
+        """Shows, seasons & episodes can be added & removed"""
+        self.db.add_show(u'Caf\xe9', u'Caf\xe9 (alt)', 80057281)
+        self.db.add_season(u'Caf\xe9', 1)
+        self.db.add_season(u'Caf\xe9', 2)
+        for season, episode in [(1, 1), (1, 2), (2, 1)]:
+            self.db.add_episode(u'Caf\xe9'.encode('utf-8'), season, episode)
+        self.assertTrue(self.db.episode_exists(u'Caf\xe9', 1, 2))
+        self.assertFalse(self.db.episode_exists(u'Caf\xe9', 3, 1))
+        self.db.remove_season(u'Caf\xe9', 1)
+        self.assertEqual(self.db.get_show(u'Caf\xe9'), {
+            'alt_title': u'Caf\xe9 (alt)', 'netflix_id': '80057281',
+            'seasons': [2], 'episodes': ['S02E01']})
+        self.db.remove_show(u'Caf\xe9')
+        self.assertEqual(self.db.list_shows(), {})
+        self.assertFalse(self.db.episode_exists(u'Caf\xe9', 2, 1))
+
+    def test_batch_commits_once(self):
+        """Changes of a batch are only visible to others once committed"""
+        other = LibraryDB(path=self.path)
+        try:
+            with self.db.batch():
+                self.db.add_movie(u'Movie (2018)', u'Movie')
+                self.db.add_show(u'Show', u'Show')
+                self.assertFalse(other.movie_exists(u'Movie (2018)'))
+            self.assertTrue(other.movie_exists(u'Movie (2018)'))
+            self.assertTrue(other.show_exists(u'Show'))
+        finally:
+            other.close()
+
+    def test_batch_rolls_back_on_error(self):
+        """Nothing of a failed batch is stored"""
+        def failing_batch():
+            with self.db.batch():
+                self.db.add_show(u'Show', u'Show')
+                with self.db.batch():
+                    self.db.add_episode(u'Show', 1, 1)
+                raise ValueError()
+        self.assertRaises(ValueError, failing_batch)
+        self.assertFalse(self.db.show_exists(u'Show'))
+        self.db.add_show(u'Show', u'Show')
+        self.assertTrue(self.db.show_exists(u'Show'))
+
+    def test_import_dump(self):
+        """The contents of the pickled db are imported"""
+        self.db.import_dump(dump={
+            'movies': {u'Movie (2018)': {'alt_title': u'Movie'}},
+            'shows': {u'Show': {
+                'alt_title': u'Show', 'seasons': [1],
+                'episodes': ['S01E01', 'S01E02'],
+                'fingerprint': [1, 2, [[10, 2]]]}}
+        }, movies_label='movies', series_label='shows')
+        self.assertEqual(self.db.get_movie(u'Movie (2018)'),
+                         {'alt_title': u'Movie'})
+        self.assertEqual(self.db.list_shows(), {u'Show': {
+            'alt_title': u'Show', 'seasons': [1],
+            'episodes': ['S01E01', 'S01E02'],
+            'fingerprint': [1, 2, [[10, 2]]]}})
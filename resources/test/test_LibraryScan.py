@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Module: LibraryScan
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `libraryscan` module"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from resources.lib.dirindex import DirectoryIndex
+from resources.lib.librarydb import LibraryDB
+from resources.lib.libraryscan import update_from_exported
+
+
+class FakeFolders(object):
+    def __init__(self):
+        self.mtimes = {'movies/': 1000, 'movies/Movie/': 1000,
+                       'shows/': 1000, 'shows/Show/': 1000}
+        self.listings = {
+            'movies/': (['Movie'], []),
+            'movies/Movie/': ([], ['Movie (2018).strm']),
+            'shows/': (['Show'], []),
+            'shows/Show/': ([], ['S01E01.strm'])}
+        self.listed = []
+
+    def listdir(self, path):
+        self.listed.append(path)
+        return self.listings[path]
+
+    def mtime(self, path):
+        return self.mtimes[path]
+
+    def exists(self, path):
+        return path in self.listings
+
+
+class LibraryScanTestCase(unittest.TestCase):
+    """Tests for the `libraryscan` module"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.db = LibraryDB(path=os.path.join(self.folder, 'lib.db'))
+        self.folders = FakeFolders()
+        self.index = DirectoryIndex(
+            filename=os.path.join(self.folder, 'index.ndb'),
+            listdir=self.folders.listdir,
+            mtime=self.folders.mtime)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.folder)
+
+    def update(self):
+        update_from_exported(
+            db=self.db, index=self.index, movie_path='movies',
+            tvshow_path='shows', folder_path=lambda path: path + '/',
+            exists=self.folders.exists)
+
+    def test_exported_entries_are_added(self):
+        """Movies, shows & episodes of the folders end up in the db"""
+        self.update()
+        self.assertTrue(self.db.movie_exists(u'Movie (2018)'))
+        self.assertTrue(self.db.episode_exists(u'Show', 1, 1))
+
+    def test_changed_show_folders_are_rescanned(self):
+        """Episodes added to a known show are found, unchanged shows
+        are not listed again"""
+        self.update()
+        self.folders.listed = []
+        self.update()
+        self.assertNotIn('shows/Show/', self.folders.listed)
+        self.folders.listings['shows/Show/'] = (
+            [], ['S01E01.strm', 'S01E02.strm'])
+        self.folders.mtimes['shows/Show/'] = 2000
+        self.update()
+        self.assertIn('shows/Show/', self.folders.listed)
+        self.assertTrue(self.db.episode_exists(u'Show', 1, 2))
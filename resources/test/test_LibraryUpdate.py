@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Module: LibraryUpdate
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `libraryupdate` module"""
+
+import threading
+import unittest
+from resources.lib.libraryupdate import LibraryUpdater
+
+
+class SlowShows(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def update(self, title, fails=False):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        threading.Event().wait(0.02)
+        with self.lock:
+            self.running -= 1
+        if fails:
+            raise ValueError(title)
+        return title != 'empty'
+
+
+class LibraryUpdateTestCase(unittest.TestCase):
+    """Tests for the `libraryupdate` module"""
+
+    def test_concurrency_is_bounded(self):
+        """No more shows than allowed are updated at the same time"""
+        shows = SlowShows()
+        progress = []
+        updater = LibraryUpdater(
+            update_show=shows.update, concurrency=3, interval=0,
+            on_progress=lambda done, total, update: progress.append(
+                (done, total)))
+        updates = updater.run([(u'Show {}'.format(i),) for i in range(12)])
+        self.assertEqual(len(updates), 12)
+        self.assertTrue(1 < shows.max_running <= 3)
+        self.assertEqual(sorted(progress), [(i, 12) for i in range(1, 13)])
+
+    def test_failed_updates_are_reported(self):
+        """Errors & failed updates don't stop the others"""
+        updater = LibraryUpdater(
+            update_show=SlowShows().update, concurrency=2, interval=0)
+        updater.run([(u'ok',), (u'empty',), (u'broken', True)])
+        failed = dict((update.title, update.error)
+                      for update in updater.updates if not update.ok)
+        self.assertEqual(sorted(failed), [u'broken', u'empty'])
+        self.assertIn('ValueError', failed[u'broken'])
+        report = updater.report()
+        self.assertIn('3 shows (2 failed)', report[0])
+        self.assertEqual(len(report), 4)
+
+    def test_abort_skips_remaining_shows(self):
+        """Every update yields, an abort skips the shows not started yet"""
+        waits = []
+
+        def wait_for_abort(seconds):
+            waits.append(seconds)
+            return len(waits) == 2
+        updater = LibraryUpdater(
+            update_show=SlowShows().update, concurrency=1, interval=0,
+            wait_for_abort=wait_for_abort, pause=0.5)
+        updates = updater.run([(u'Show {}'.format(i),) for i in range(5)])
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(waits, [0.5, 0.5])
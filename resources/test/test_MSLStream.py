@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Module: MSLStream
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `mslstream` module"""
+
+import gzip
+import json
+import base64
+import hashlib
+import unittest
+from io import BytesIO
+from resources.lib.mslstream import MSLResponseDecoder, iter_objects
+
+
+def gzipped(data):
+    output = BytesIO()
+    with gzip.GzipFile(fileobj=output, mode='wb') as gzip_file:
+        gzip_file.write(data)
+    return output.getvalue()
+
+
+def sign(message):
+    return hashlib.sha256(b'key' + message).digest()
+
+
+def b64(data):
+    return base64.standard_b64encode(data).decode('ascii')
+
+
+def response(result, chunk_size=40, compress=True):
+    """Builds a chunked MSL response with a plaintext 'cipher'"""
+    header = {'headerdata': 'aGVhZGVy', 'signature': 'c2ln',
+              'mastertoken': {'tokendata': 'dG9rZW4=', 'signature': 'c2ln'}}
+    body = json.dumps({'result': result}).encode('utf-8')
+    chunks = [json.dumps(header)]
+    for offset in range(0, len(body), chunk_size):
+        data = body[offset:offset + chunk_size]
+        plaintext = {'messageid': 1, 'sequencenumber': len(chunks),
+                     'data': b64(gzipped(data) if compress else data)}
+        if compress:
+            plaintext['compressionalgo'] = 'GZIP'
+        envelope = json.dumps({
+            'iv': b64(b'iv'),
+            'ciphertext': b64(json.dumps(plaintext).encode('utf-8'))
+        }).encode('utf-8')
+        chunks.append(json.dumps(
+            {'payload': b64(envelope), 'signature': b64(sign(envelope))}))
+    return ''.join(chunks).encode('utf-8')
+
+
+def split(body, size):
+    return [body[offset:offset + size]
+            for offset in range(0, len(body), size)]
+
+
+class MSLStreamTestCase(unittest.TestCase):
+    """Tests for the `mslstream` module"""
+
+    def test_iter_objects_across_chunk_boundaries(self):
+        """Objects are split correctly wherever the chunks end"""
+        body = b'{"a": {"b": "}{\\""}}{"c": 1} {"d": "\\\\"}'
+        for size in range(1, len(body) + 1):
+            self.assertEqual(
+                [json.loads(obj.decode('utf-8'))
+                 for obj in iter_objects(split(body, size))],
+                [{'a': {'b': '}{"'}}, {'c': 1}, {'d': '\\'}])
+
+    def test_decodes_compressed_chunks(self):
+        """The payload chunks are decrypted, decompressed & joined"""
+        result = {'movieId': 80001, 'tracks': ['track'] * 50}
+        body = response(result)
+        for size in [7, 100, len(body)]:
+            decoder = MSLResponseDecoder(
+                decrypt=lambda iv, data: data,
+                verify=lambda message, signature: sign(message) == signature)
+            self.assertEqual(
+                decoder.decode(split(body, size)), {'result': result})
+
+    def test_decodes_uncompressed_chunks(self):
+        """Chunks without compression are used as they are"""
+        decoder = MSLResponseDecoder(decrypt=lambda iv, data: data)
+        self.assertEqual(
+            decoder.decode([response([1, 2, 3], compress=False)]),
+            {'result': [1, 2, 3]})
+
+    def test_invalid_signatures_are_rejected(self):
+        """A chunk with an invalid signature fails the response"""
+        decoder = MSLResponseDecoder(
+            decrypt=lambda iv, data: data,
+            verify=lambda message, signature: False)
+        self.assertRaises(ValueError, decoder.decode, [response([1])])
+
+    def test_error_responses_are_rejected(self):
+        """An error response is not decoded"""
+        decoder = MSLResponseDecoder(decrypt=lambda iv, data: data)
+        self.assertRaises(
+            ValueError, decoder.decode, [b'{"errordata": "ZXJyb3I="}'])
@@ -6,9 +6,55 @@
 
 """Tests for the `NetflixHttpRequestHandler` module"""
 
+import io
 import unittest
 import mock
 from resources.lib.NetflixHttpRequestHandler import NetflixHttpRequestHandler
 
+class BufferedHandler(NetflixHttpRequestHandler):
+    """Handler without a connection, writes to a buffer"""
+    def __init__(self):
+        self.wfile = io.BytesIO()
+
+
 class NetflixHttpRequestHandlerTestCase(unittest.TestCase):
-    pass
+
+    def test_write_chunked(self):
+        """Pieces are joined to chunks & terminated by an empty chunk"""
+        handler = BufferedHandler()
+        with mock.patch(
+                'resources.lib.NetflixHttpRequestHandler.CHUNK_SIZE', 4):
+            handler.write_chunked([b'{"a"', b': ', b'1}'])
+        self.assertEqual(
+            handler.wfile.getvalue(),
+            b'4\r\n{"a"\r\n4\r\n: 1}\r\n0\r\n\r\n')
+
+    def test_failed_method_is_answered(self):
+        """A method that raises is answered with an error"""
+        handler = BufferedHandler()
+        handler.path = '/?method=fetch_video_list'
+        handler.command = 'GET'
+        handler.request_version = 'HTTP/1.1'
+        handler.requestline = 'GET ' + handler.path + ' HTTP/1.1'
+        handler.request = None
+        handler.client_address = ('127.0.0.1', 0)
+        handler.server = mock.Mock()
+        handler.server.res_handler.fetch_video_list.side_effect = ValueError
+        handler.do_GET()
+        self.assertTrue(
+            handler.wfile.getvalue().startswith(b'HTTP/1.1 500'))
+        self.assertTrue(handler.server.handle_error.called)
+
+    def test_helpers_are_no_routes(self):
+        """Helpers of the sub ressource handler can't be called"""
+        handler = BufferedHandler()
+        handler.path = '/?method=_fetch_metadata'
+        handler.command = 'GET'
+        handler.request_version = 'HTTP/1.1'
+        handler.requestline = 'GET ' + handler.path + ' HTTP/1.1'
+        handler.client_address = ('127.0.0.1', 0)
+        handler.server = mock.Mock()
+        handler.do_GET()
+        self.assertTrue(
+            handler.wfile.getvalue().startswith(b'HTTP/1.1 404'))
+        self.assertFalse(handler.server.res_handler._fetch_metadata.called)
@@ -8,7 +8,58 @@
 
 import unittest
 import mock
+from resources.lib.cache import ResponseCache
+from resources.lib.concurrency import ReadWriteLock
 from resources.lib.NetflixHttpSubRessourceHandler import NetflixHttpSubRessourceHandler
 
+
+def handler(netflix_session):
+    """Returns a handler that skips the login"""
+    instance = NetflixHttpSubRessourceHandler.__new__(
+        NetflixHttpSubRessourceHandler)
+    instance.netflix_session = netflix_session
+    instance.lock = ReadWriteLock()
+    instance.response_cache = ResponseCache()
+    return instance
+
+
 class NetflixHttpSubRessourceHandlerTestCase(unittest.TestCase):
-    pass
+
+    def setUp(self):
+        self.netflix_session = mock.Mock()
+        self.netflix_session.user_data = {'guid': 'A'}
+        self.params = {'list_id': ['L']}
+
+    def test_empty_list_is_not_cached(self):
+        """An empty video list is fetched again"""
+        self.netflix_session.fetch_video_list.return_value = {'value': {}}
+        res_handler = handler(self.netflix_session)
+        self.assertEqual(res_handler.fetch_video_list(self.params), [])
+        res_handler.fetch_video_list(self.params)
+        self.assertEqual(self.netflix_session.fetch_video_list.call_count, 2)
+
+    def test_my_list_change_invalidates_afterwards(self):
+        """A list cached while my list is changed is dropped"""
+        self.netflix_session.fetch_video_list.return_value = {
+            'value': {'videos': {}}}
+        self.netflix_session.parse_video_list.return_value = {'1': {}}
+        res_handler = handler(self.netflix_session)
+
+        def add_to_list(video_id):
+            # a list request served while the change is in flight
+            res_handler.fetch_video_list(self.params)
+            return True
+
+        self.netflix_session.add_to_list.side_effect = add_to_list
+        res_handler.add_to_list({'video_id': ['1']})
+        res_handler.fetch_video_list(self.params)
+        self.assertEqual(self.netflix_session.fetch_video_list.call_count, 2)
+
+    def test_batch_only_calls_routes(self):
+        """Helpers of the handler can't be called through a batch"""
+        res_handler = handler(self.netflix_session)
+        res_handler._fetch_metadata = mock.Mock()
+        results = res_handler.batch({'calls': [
+            '[{"method": "_fetch_metadata"}, {"method": "prefetch_login"}]']})
+        self.assertEqual([result['code'] for result in results], [404, 404])
+        self.assertFalse(res_handler._fetch_metadata.called)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Module: PageData
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `pagedata` module"""
+
+import unittest
+from resources.lib.pagedata import decode_js_object, extract_page_data
+
+PAGE = (
+    b'<html><head><script>window.netflix = window.netflix || {} ;'
+    b'netflix.notification = {"constants":{"sessionLength":30}};</script>'
+    b'</head><body><script>netflix.reactContext = {"models":{"userInfo":'
+    b'{"data":{"name":"A\\x20B","authURL":"abc\\x2Fdef="}}}} ;\n</script>'
+    b'<script>netflix.falcorCache = {"profiles":{"GUID":{"summary":'
+    b'{"firstName":"Caf\xc3\xa9"}}}};</script></body></html>')
+
+
+class PageDataTestCase(unittest.TestCase):
+    """Tests for the `pagedata` module"""
+
+    def test_extracts_all_objects_in_one_pass(self):
+        """Every requested object is parsed, others are skipped"""
+        data = extract_page_data(PAGE, ['reactContext', 'falcorCache'])
+        self.assertEqual(sorted(data.keys()), ['falcorCache', 'reactContext'])
+        self.assertEqual(
+            data['reactContext']['models']['userInfo']['data'],
+            {'name': 'A B', 'authURL': 'abc/def='})
+        self.assertEqual(
+            data['falcorCache']['profiles']['GUID']['summary']['firstName'],
+            u'Caf\xe9')
+
+    def test_missing_objects_are_left_out(self):
+        """Names that are not assigned in the page are not returned"""
+        self.assertEqual(extract_page_data(PAGE, ['models']), {})
+
+    def test_decode_js_object_escapes(self):
+        """Javascript only escapes are translated, JSON escapes are kept"""
+        self.assertEqual(
+            decode_js_object(
+                u'{"a":"\\x41\\\'","b":"\\\\x41","c":"\\"\\u00e9","d":"\\s"}'),
+            {'a': u"A'", 'b': u'\\x41', 'c': u'"\xe9', 'd': u'\\s'})
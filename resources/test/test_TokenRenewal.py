@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Module: TokenRenewal
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `tokenrenewal` module"""
+
+import threading
+import unittest
+from resources.lib.tokenrenewal import MasterTokenRenewal
+
+
+class MockCommon(object):
+    def log(self, msg):
+        pass
+
+
+class MockMSL(object):
+    def __init__(self, due):
+        self.due = due
+        self.margins = []
+        self.handshakes = threading.Event()
+
+    def master_token_renewal_due(self, margin):
+        self.margins.append(margin)
+        return self.due
+
+    def perform_key_handshake(self):
+        self.handshakes.set()
+
+
+class MasterTokenRenewalTestCase(unittest.TestCase):
+    """Tests for the `MasterTokenRenewal` class"""
+
+    def test_renews_due_tokens_only(self):
+        """The handshake is only performed if the token is due"""
+        msl = MockMSL(due=False)
+        renewal = MasterTokenRenewal(MockCommon(), msl, margin=3600)
+        self.assertFalse(renewal.renew())
+        msl.due = True
+        self.assertTrue(renewal.renew())
+        self.assertTrue(msl.handshakes.is_set())
+        self.assertEqual(msl.margins, [3600, 3600])
+
+    def test_idle_checks_run_in_background(self):
+        """An idle check renews the token on the worker thread"""
+        msl = MockMSL(due=True)
+        renewal = MasterTokenRenewal(MockCommon(), msl, interval=3600)
+        renewal.start()
+        renewal.on_idle()
+        self.assertTrue(msl.handshakes.wait(5))
+        renewal.on_idle()
+        renewal.stop()
+        self.assertEqual(len(msl.margins), 1)
+
+    def test_stop_before_start(self):
+        """A worker that was never started can be stopped"""
+        MasterTokenRenewal(MockCommon(), MockMSL(due=False)).stop()
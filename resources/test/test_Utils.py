@@ -8,7 +8,7 @@
 
 import unittest
 import mock
-from resources.lib.utils import get_user_agent, noop, uniq_id, get_class_methods, __get_mac_address as gma
+from resources.lib.utils import get_user_agent, noop, uniq_id, get_class_methods, find_next_episode, __get_mac_address as gma
 from mocks.MinimalClassMocks import MockClass
 from mocks.LoggerMocks import TestLoggerWithArgs, TestLoggerWithCredentialArgs, TestLoggerWithNoArgs
 
@@ -135,3 +135,15 @@ class UtilsTestCase(unittest.TestCase):
         self.assertEqual(
             first=get_class_methods(class_item=MockClass),
             second=['bar', 'foo', '__init__'])
+
+    def test_find_next_episode(self):
+        """The next episode continues with the next season"""
+        seasons = [
+            {'seq': 2, 'episodes': [{'id': 21, 'seq': 1}]},
+            {'seq': 1, 'episodes': [{'id': 12, 'seq': 2},
+                                    {'id': 11, 'seq': 1}]}]
+        self.assertEqual(
+            first=find_next_episode('11', seasons)['id'], second=12)
+        self.assertEqual(
+            first=find_next_episode('12', seasons)['id'], second=21)
+        self.assertEqual(first=find_next_episode('21', seasons), second={})
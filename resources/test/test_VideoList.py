@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Module: VideoList
+# Created on: 18.10.2026
+# License: MIT https://goo.gl/5bMj3H
+
+"""Tests for the `videolist` module"""
+
+import json
+import unittest
+from collections import OrderedDict
+from resources.lib.videolist import (
+    VideoList, VideoListEntry, iter_response_body)
+
+
+def entry(video_id):
+    return VideoListEntry(
+        id=video_id,
+        title=u'Caf\xe9 {}'.format(video_id),
+        cast=['A', 'B'],
+        boxarts={'small': 'https://art/{}.jpg'.format(video_id)})
+
+
+class VideoListTestCase(unittest.TestCase):
+    """Tests for the `videolist` module"""
+
+    def test_entry_dict_access(self):
+        """Entries can be read like the former dict entries"""
+        video = entry('1')
+        self.assertEqual(video['title'], u'Caf\xe9 1')
+        self.assertIsNone(video['year'])
+        self.assertEqual(video.get('boxarts', {}).get('small'),
+                         'https://art/1.jpg')
+        self.assertIsNone(video.get('unknown'))
+        self.assertRaises(KeyError, lambda: video['unknown'])
+        self.assertRaises(TypeError, VideoListEntry, unknown=1)
+
+    def test_entry_json_is_memoized(self):
+        """An entry is encoded only once"""
+        video = entry('1')
+        self.assertIs(video.to_json(), video.to_json())
+        self.assertEqual(json.loads(video.to_json()), video.as_dict())
+
+    def test_response_body(self):
+        """The pieces form the same document as encoding it at once"""
+        video_list = VideoList((video_id, entry(video_id))
+                               for video_id in ['3', '1', '2'])
+        for result in [video_list, VideoList(), [video_list], {'a': 1}]:
+            body = b''.join(iter_response_body('fetch', result))
+            expected = json.loads(json.dumps(
+                {'method': 'fetch', 'result': result},
+                default=lambda value: value.as_dict()))
+            self.assertEqual(json.loads(body.decode()), expected)
+        body = b''.join(iter_response_body('fetch', video_list))
+        decoded = json.loads(body.decode(), object_pairs_hook=OrderedDict)
+        self.assertEqual(list(decoded['result'].keys()), ['3', '1', '2'])
@@ -17,10 +17,13 @@ import xbmc
 from resources.lib.NetflixCommon import NetflixCommon
 from resources.lib.MSLHttpRequestHandler import MSLTCPServer
 from resources.lib.NetflixHttpRequestHandler import NetflixTCPServer
+from resources.lib.prewarm import Prewarmer
+from resources.lib.tokenrenewal import MasterTokenRenewal
 from resources.lib.playback import PlaybackController
 from resources.lib.playback.bookmarks import BookmarkManager
 from resources.lib.playback.stream_continuity import StreamContinuityManager
 from resources.lib.playback.section_skipping import SectionSkipper
+from resources.lib.playback.prefetch import ManifestPrefetcher
 
 
 def select_unused_port():
@@ -106,6 +109,18 @@ class NetflixService(object):
         self.ns_thread = threading.Thread(
             target=self.ns_server.serve_forever)
 
+        # renew the MSL master token before it expires
+        self.token_renewal = MasterTokenRenewal(
+            nx_common=self.nx_common,
+            msl_handler=self.msl_server.msl_handler)
+
+        # preload the home screen lists into the service cache
+        self.prewarmer = None
+        if self.nx_common.get_setting('prewarm_lists') != 'false':
+            self.prewarmer = Prewarmer(
+                nx_common=self.nx_common,
+                res_handler=self.ns_server.res_handler)
+
     def _start_servers(self):
         self.msl_server.server_activate()
         self.msl_server.timeout = 1
@@ -121,7 +136,18 @@ class NetflixService(object):
         self.ns_thread.start()
         self.nx_common.log(msg='[NS] Thread started')
 
+        self.token_renewal.start()
+
+        if self.prewarmer is not None:
+            self.prewarmer.start()
+
     def _shutdown(self):
+        if self.prewarmer is not None:
+            self.prewarmer.stop()
+            self.prewarmer = None
+
+        self.token_renewal.stop()
+
         # MSL service shutdown sequence
         self.msl_server.server_close()
         self.msl_server.shutdown()
@@ -174,7 +200,8 @@ class NetflixService(object):
         controller.action_managers = [
             BookmarkManager(self.nx_common),
             SectionSkipper(self.nx_common),
-            StreamContinuityManager(self.nx_common)
+            StreamContinuityManager(self.nx_common),
+            ManifestPrefetcher(self.nx_common, self.msl_server.msl_handler)
         ]
         player = xbmc.Player()
         while not controller.abortRequested():
@@ -186,6 +213,10 @@ class NetflixService(object):
                     controller.on_playback_tick()
                 if self.library_update_scheduled() and self._is_idle():
                     self.update_library()
+                if self.prewarmer is not None and self._is_idle():
+                    self.prewarmer.on_idle()
+                if not player.isPlaying() and self._is_idle():
+                    self.token_renewal.on_idle()
             except RuntimeError as exc:
                 self.nx_common.log(
                     'RuntimeError in main loop: {}'.format(exc), xbmc.LOGERROR)